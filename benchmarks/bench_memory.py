@@ -0,0 +1,120 @@
+"""Measure peak memory of feature assembly relative to the input frame.
+
+Usage::
+
+    python benchmarks/bench_memory.py --rows 20000 --steps
+
+A cleaned frame is built from the bundled sample resampled to ``--rows`` rows
+and written to a temporary Parquet file. Each measurement then runs in a fresh
+interpreter: it loads the frame and records the peak of Python/NumPy
+allocations (``tracemalloc``) plus Arrow-backed string buffers (the pyarrow
+memory pool) while the step runs. Ideally the peak stays close to the size of
+the columns the step adds.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.skillra_pda import cleaning, features, io  # noqa: E402
+
+SAMPLE_FILE = ROOT / "data" / "samples" / "hh_sample_300.csv"
+MB = 1024 * 1024
+
+
+def make_clean_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    sample = io.load_raw(SAMPLE_FILE)
+    df = sample.iloc[rng.integers(0, len(sample), rows)].reset_index(drop=True)
+    df["vacancy_id"] = np.arange(rows)
+    df = cleaning.handle_missingness(df)
+    df = cleaning.parse_dates(df)
+    return cleaning.salary_prepare(df)
+
+
+def _frame_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / MB
+
+
+# the steps of features.assemble_features, in order
+STEPS = [(step.name, step.func) for step in features.FEATURE_STEPS]
+
+
+_POOLS: list = []
+
+
+def _peak_mb(func, df: pd.DataFrame):
+    import pyarrow as pa
+
+    # a proxy pool counts only the Arrow buffers allocated while func runs; it
+    # must outlive those buffers, hence the module-level reference
+    pool = pa.proxy_memory_pool(pa.default_memory_pool())
+    _POOLS.append(pool)
+    pa.set_memory_pool(pool)
+    tracemalloc.start()
+    result = func(df)
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, (python_peak + pool.max_memory()) / MB
+
+
+def measure(path: str, step: str | None) -> dict:
+    df = pd.read_parquet(path)
+    if step is None:
+        result, peak = _peak_mb(features.assemble_features, df)
+        new_cols = result.columns.difference(df.columns)
+        return {"frame_mb": _frame_mb(df), "new_columns_mb": _frame_mb(result[new_cols]), "peak_mb": peak}
+    for name, func in STEPS:
+        if name == step:
+            return {"peak_mb": _peak_mb(func, df)[1]}
+        df = func(df)
+    raise KeyError(step)
+
+
+def _run(path: Path, step: str | None = None) -> dict:
+    command = [sys.executable, __file__, "--measure", str(path)] + (["--step", step] if step else [])
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--measure", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--step", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--steps", action="store_true", help="Also report the peak of every feature step.")
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.step)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "clean.parquet"
+        make_clean_frame(args.rows).to_parquet(path)
+        report = _run(path)
+        steps = {name: _run(path, name)["peak_mb"] for name, _ in STEPS} if args.steps else {}
+
+    print(f"rows:                 {args.rows}")
+    print(f"input frame:          {report['frame_mb']:8.1f} MB")
+    print(f"new feature columns:  {report['new_columns_mb']:8.1f} MB")
+    print(f"peak during assembly: {report['peak_mb']:8.1f} MB")
+    print(f"peak / input frame:   {report['peak_mb'] / report['frame_mb']:8.2f}")
+    for name, peak in steps.items():
+        print(f"  {name:<22} {peak:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
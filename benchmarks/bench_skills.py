@@ -0,0 +1,111 @@
+"""Benchmark skill-flag analyses on the bit-packed ``SkillMatrix``.
+
+Usage::
+
+    python benchmarks/bench_skills.py --rows 1000000
+
+The feature table of the bundled sample is resampled to ``--rows`` rows
+(skill flags and segment keys only). Every case computes the same table from
+pandas boolean columns (``fillna(False).astype(bool)`` as before) and from
+the packed matrix, checks that they agree and prints both timings. The
+matrix is built once and shared by the cases, as an analysis notebook would.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.skillra_pda import cleaning, eda, features, io  # noqa: E402
+from src.skillra_pda.skill_matrix import SkillMatrix  # noqa: E402
+
+SAMPLE_FILE = ROOT / "data" / "samples" / "hh_sample_300.csv"
+MB = 1024 * 1024
+SEGMENT_COLUMNS = ["primary_role", "grade_final", "city_tier"]
+
+
+def make_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Skill flags and segment keys of the sample features resampled to ``rows`` rows."""
+
+    df = io.load_raw(SAMPLE_FILE)
+    df = cleaning.salary_prepare(cleaning.parse_dates(cleaning.handle_missingness(df)))
+    feats = features.assemble_features(df)
+    feats = feats[SEGMENT_COLUMNS + eda.hard_skill_columns(feats)]
+    rng = np.random.default_rng(seed)
+    return feats.iloc[rng.integers(0, len(feats), rows)].reset_index(drop=True)
+
+
+def _dense(df: pd.DataFrame, skills: list) -> pd.DataFrame:
+    return df[skills].fillna(False).astype(bool)
+
+
+Case = Tuple[Callable[[pd.DataFrame, list], pd.DataFrame], Callable[[pd.DataFrame, SkillMatrix], pd.DataFrame]]
+
+CASES: Dict[str, Case] = {
+    "counts": (
+        lambda df, skills: _dense(df, skills).sum(),
+        lambda df, matrix: matrix.counts(),
+    ),
+    "segment_shares": (
+        lambda df, skills: _dense(df[df["primary_role"] == "data"], skills).mean(),
+        lambda df, matrix: matrix.shares(rows=(df["primary_role"] == "data").to_numpy()),
+    ),
+    "share_by_grade": (
+        lambda df, skills: pd.concat([df["grade_final"], _dense(df, skills)], axis=1)
+        .groupby("grade_final")[skills]
+        .mean()
+        .T,
+        lambda df, matrix: eda.skill_share_by_grade(df, matrix.columns, "grade_final", skill_matrix=matrix),
+    ),
+    "segment_counts": (
+        lambda df, skills: pd.concat([df[SEGMENT_COLUMNS], _dense(df, skills)], axis=1)
+        .groupby(SEGMENT_COLUMNS, observed=True)[skills]
+        .sum()
+        .to_numpy(),
+        lambda df, matrix: matrix.group_counts(df.groupby(SEGMENT_COLUMNS, observed=True).ngroup().to_numpy()),
+    ),
+    "cooccurrence": (
+        lambda df, skills: (lambda d: d.T.dot(d))(_dense(df, skills).astype(np.int64)),
+        lambda df, matrix: matrix.cooccurrence(),
+    ),
+}
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES), default=None)
+    args = parser.parse_args(argv)
+
+    df = make_frame(args.rows)
+    skills = [col for col in df.columns if col not in SEGMENT_COLUMNS]
+    matrix, build = _timed(SkillMatrix.from_frame, df, skills)
+    flag_mb = df[skills].memory_usage(index=False).sum() / MB
+    print(f"{len(skills)} flags x {args.rows} rows: columns {flag_mb:.1f} MB, packed {matrix.nbytes / MB:.1f} MB")
+    print(f"matrix built in {build:.3f} s")
+    print(f"{'case':<28} {'pandas s':>9} {'packed s':>9} {'speedup':>8}")
+    for name in args.only or list(CASES):
+        reference, packed = CASES[name]
+        expected, slow = _timed(reference, df, skills)
+        result, fast = _timed(packed, df, matrix)
+        np.testing.assert_allclose(np.asarray(result, dtype=float), np.asarray(expected, dtype=float))
+        print(f"{name:<28} {slow:9.3f} {fast:9.3f} {slow / fast:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
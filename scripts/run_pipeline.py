@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 """Run the end-to-end data cleaning and feature engineering pipeline."""
+import argparse
 from pathlib import Path
 import sys
 
@@ -8,34 +9,93 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from src.skillra_pda import cleaning, config, features, io, market  # noqa: E402
+from src.skillra_pda import config  # noqa: E402
+from src.skillra_pda.pipeline import Pipeline, default_stages, format_records  # noqa: E402
+from src.skillra_pda.stage_cache import StageCache  # noqa: E402
 
 
-def main() -> None:
-    """Load raw data, clean it, engineer features, and persist outputs."""
-    config.ensure_directories()
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Clean the raw CSV out-of-core in chunks of this many rows.",
+    )
+    parser.add_argument(
+        "--partitioned",
+        action="store_true",
+        help="Also write features as a dataset partitioned by scrape date and city tier.",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Compute features only for vacancies missing from the existing feature table.",
+    )
+    parser.add_argument(
+        "--feature-workers",
+        type=int,
+        default=1,
+        help="Worker processes for feature assembly on row partitions.",
+    )
+    parser.add_argument(
+        "--reports",
+        action="store_true",
+        help="Also build EDA summary tables and report figures.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Recompute every stage even if its inputs, code and parameters are unchanged.",
+    )
+    parser.add_argument("--only", nargs="+", default=None, help="Run only these stages.")
+    parser.add_argument("--from", dest="start", default=None, help="Run this stage and everything after it.")
+    parser.add_argument("--until", default=None, help="Run this stage and everything it depends on.")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help=(
+            "Worker processes for independent stages (1 runs everything in this process; "
+            "a stage that is the only one ready always runs in this process)."
+        ),
+    )
+    return parser.parse_args(argv)
 
-    raw_path = Path(config.RAW_DATA_FILE)
-    clean_path = Path(config.CLEAN_DATA_FILE)
-    feature_path = Path(config.FEATURE_DATA_FILE)
-    market_view_path = Path(config.PROCESSED_DATA_DIR) / "market_view.parquet"
 
-    df_raw = io.load_raw(raw_path)
-    df_clean = cleaning.handle_missingness(df_raw)
-    df_clean = cleaning.parse_dates(df_clean)
-    df_clean = cleaning.salary_prepare(df_clean)
-    df_clean = cleaning.deduplicate(df_clean)
-    io.save_processed(df_clean, clean_path)
+def main(argv: list[str] | None = None) -> None:
+    """Load raw data, clean it, engineer features, and persist outputs.
 
-    df_features = features.assemble_features(df_clean.copy())
-    io.save_processed(df_features, feature_path)
+    Stages run in dependency order, independent ones in parallel. Each stage
+    is skipped when the hash of its input files, code and parameters matches
+    the previous run and its outputs still exist.
+    """
+    args = parse_args(argv)
+    config.ensure_directories()
 
-    market_view = market.build_market_view(df_features.copy())
-    io.save_processed(market_view, market_view_path)
+    stages = default_stages(
+        chunksize=args.chunksize,
+        partitioned=args.partitioned,
+        reports=args.reports,
+        incremental=args.incremental,
+        feature_workers=args.feature_workers,
+    )
+    pipeline = Pipeline(stages)
+    cache = StageCache(config.STAGE_CACHE_DIR, enabled=not args.no_cache)
+    records = pipeline.run(
+        only=args.only,
+        start=args.start,
+        until=args.until,
+        cache=cache,
+        max_workers=args.jobs,
+        log_path=config.RUN_LOG_FILE,
+    )
 
-    print(f"Saved clean dataset to {clean_path}")
-    print(f"Saved feature dataset to {feature_path}")
-    print(f"Saved market view to {market_view_path}")
+    print(format_records(records))
+    for record in records:
+        for output in pipeline.stages[record.stage].outputs:
+            print(f"{record.stage}: {output}")
+    print(f"Run log appended to {config.RUN_LOG_FILE}")
 
 
 if __name__ == "__main__":
@@ -1,8 +1,34 @@
 """Skillra HSE Python for Data Analysis utilities."""
 
 # Re-export commonly used modules and helpers to simplify notebook imports.
-from . import cleaning, config, eda, features, io, market, personas, viz  # noqa: F401
-from .cleaning import ensure_salary_gross_boolean, summarize_data_health  # noqa: F401
+from . import (  # noqa: F401
+    associations,
+    chunked,
+    cleaning,
+    config,
+    eda,
+    features,
+    id_index,
+    io,
+    key_skills,
+    lookup,
+    market,
+    parallel_features,
+    personas,
+    pipeline,
+    premium,
+    schema,
+    sketch,
+    skill_matrix,
+    stage_cache,
+    viz,
+)
+from .cleaning import (  # noqa: F401
+    ColumnProfile,
+    ensure_salary_gross_boolean,
+    profile_columns,
+    summarize_data_health,
+)
 from .eda import (  # noqa: F401
     benefits_summary_by_company,
     benefits_summary_by_grade,
@@ -42,15 +68,29 @@ from .personas import (  # noqa: F401
 from .viz import salary_by_domain_plot, skill_heatmap  # noqa: F401
 
 __all__ = [
+    "associations",
+    "chunked",
     "cleaning",
     "config",
     "eda",
     "features",
+    "id_index",
     "io",
+    "key_skills",
+    "lookup",
     "market",
+    "parallel_features",
     "personas",
+    "pipeline",
+    "premium",
+    "schema",
+    "sketch",
+    "skill_matrix",
+    "stage_cache",
     "viz",
+    "ColumnProfile",
     "ensure_salary_gross_boolean",
+    "profile_columns",
     "summarize_data_health",
     "junior_friendly_share",
     "junior_friendly_share_by_segment",
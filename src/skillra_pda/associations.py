@@ -0,0 +1,251 @@
+"""Skill co-occurrence and association rules on the packed skill matrix.
+
+``skill_pairs`` answers "vacancies asking for Airflow also ask for Spark in
+70% of cases": the flag × flag co-occurrence counts (``X^T X`` of the flag
+matrix, computed as popcounts of ``flag_a & flag_b``) turned into support,
+confidence, lift and Jaccard for every ordered pair. ``skill_rules`` mines
+bundles of up to ``max_len`` skills level by level (Apriori): a bundle is
+counted only if all its sub-bundles are frequent, by one AND of the bundle's
+bitset with every candidate flag. Both accept ``by`` to repeat the analysis
+inside every segment, e.g. ``by="primary_role"``.
+"""
+from __future__ import annotations
+
+from itertools import combinations
+from math import ceil
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .eda import hard_skill_columns
+from .skill_matrix import SkillMatrix, _popcount
+
+PAIR_COLUMNS = [
+    "antecedent",
+    "consequent",
+    "n_antecedent",
+    "n_consequent",
+    "n_both",
+    "support",
+    "confidence",
+    "lift",
+    "jaccard",
+]
+RULE_COLUMNS = ["antecedent", "consequent", "size", "n_antecedent", "n_rule", "support", "confidence", "lift"]
+
+
+def pair_table(matrix: SkillMatrix, min_count: int = 1) -> pd.DataFrame:
+    """Pair metrics of every ordered flag pair seen together at least ``min_count`` times."""
+
+    n_rows = len(matrix)
+    both = matrix.cooccurrence().to_numpy()
+    single = np.diag(both)
+    first, second = np.nonzero((both >= max(min_count, 1)) & ~np.eye(len(single), dtype=bool))
+    n_both = both[first, second]
+    names = np.array(matrix.columns, dtype=object)
+    table = pd.DataFrame(
+        {
+            "antecedent": names[first],
+            "consequent": names[second],
+            "n_antecedent": single[first],
+            "n_consequent": single[second],
+            "n_both": n_both,
+        }
+    )
+    table["support"] = n_both / n_rows
+    table["confidence"] = n_both / single[first]
+    table["lift"] = n_both * n_rows / (single[first] * single[second])
+    table["jaccard"] = n_both / (single[first] + single[second] - n_both)
+    return table.sort_values(["n_both", "confidence"], ascending=False, ignore_index=True)
+
+
+def frequent_itemsets(matrix: SkillMatrix, min_count: int, max_len: int = 3) -> Dict[Tuple[int, ...], int]:
+    """Row counts of all flag bundles (as column positions) with at least ``min_count`` rows."""
+
+    min_count = max(min_count, 1)
+    counts = matrix.counts().to_numpy()
+    found: Dict[Tuple[int, ...], int] = {
+        (i,): int(counts[i]) for i in np.flatnonzero(counts >= min_count)
+    }
+    level = {itemset: matrix.bits[itemset[0]] for itemset in found}
+    for size in range(2, max_len + 1):
+        next_level = {}
+        for itemset, words in level.items():
+            # Apriori pruning: every sub-bundle of a frequent bundle is frequent
+            candidates = [
+                c
+                for c in range(itemset[-1] + 1, len(matrix.columns))
+                if all(sub in found for sub in combinations(itemset + (c,), size - 1))
+            ]
+            if not candidates:
+                continue
+            together = _popcount(matrix.bits[candidates] & words).sum(axis=1, dtype=np.int64)
+            for c, n in zip(candidates, together):
+                if n >= min_count:
+                    found[itemset + (c,)] = int(n)
+                    next_level[itemset + (c,)] = words & matrix.bits[c]
+        if not next_level:
+            break
+        level = next_level
+    return found
+
+
+def rule_table(
+    matrix: SkillMatrix, min_support: float = 0.02, min_confidence: float = 0.5, max_len: int = 3
+) -> pd.DataFrame:
+    """Rules ``bundle -> skill`` from bundles of 2..``max_len`` flags."""
+
+    n_rows = len(matrix)
+    if not n_rows:
+        return pd.DataFrame(columns=RULE_COLUMNS)
+    # the epsilon keeps float noise (0.07 * 100 == 7.000000000000001) from raising the count by one
+    itemsets = frequent_itemsets(matrix, ceil(min_support * n_rows - 1e-9), max_len)
+    single = {itemset[0]: n for itemset, n in itemsets.items() if len(itemset) == 1}
+    records: List[dict] = []
+    for itemset, n_rule in itemsets.items():
+        if len(itemset) < 2:
+            continue
+        for consequent in itemset:
+            antecedent = tuple(i for i in itemset if i != consequent)
+            n_antecedent = itemsets[antecedent]
+            confidence = n_rule / n_antecedent
+            if confidence < min_confidence:
+                continue
+            records.append(
+                {
+                    "antecedent": tuple(matrix.columns[i] for i in antecedent),
+                    "consequent": matrix.columns[consequent],
+                    "size": len(itemset),
+                    "n_antecedent": n_antecedent,
+                    "n_rule": n_rule,
+                    "support": n_rule / n_rows,
+                    "confidence": confidence,
+                    "lift": confidence * n_rows / single[consequent],
+                }
+            )
+    if not records:
+        return pd.DataFrame(columns=RULE_COLUMNS)
+    return pd.DataFrame(records, columns=RULE_COLUMNS).sort_values(
+        ["confidence", "n_rule"], ascending=False, ignore_index=True
+    )
+
+
+def _segments(
+    df: pd.DataFrame, matrix: SkillMatrix, by: Union[str, Sequence[str]], min_rows: int
+) -> Iterable[Tuple[dict, SkillMatrix]]:
+    by = [by] if isinstance(by, str) else list(by)
+    missing = [col for col in by if col not in df.columns]
+    if missing:
+        raise ValueError(f"expected segment columns {missing}")
+    grouped = df.groupby(by, observed=True)
+    codes = grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+    keys = grouped.size().index
+    for key, part in zip(keys, matrix.split(codes, len(keys))):
+        if len(part) < min_rows:
+            continue
+        key = key if isinstance(key, tuple) else (key,)
+        yield dict(zip(by, key)), part
+
+
+def _run(
+    df: pd.DataFrame,
+    skill_cols: Optional[Sequence[str]],
+    skill_matrix: Optional[SkillMatrix],
+    by: Union[str, Sequence[str], None],
+    min_rows: int,
+    build,
+    result_columns: List[str],
+) -> pd.DataFrame:
+    columns = hard_skill_columns(df) if skill_cols is None else [col for col in skill_cols if col in df.columns]
+    matrix = SkillMatrix.for_frame(df, columns, skill_matrix)
+    if by is None:
+        return build(matrix)
+    tables = []
+    for segment, part in _segments(df, matrix, by, min_rows):
+        table = build(part)
+        if table.empty:
+            continue
+        for position, (col, value) in enumerate(segment.items()):
+            table.insert(position, col, value)
+        tables.append(table)
+    if not tables:
+        return pd.DataFrame(columns=[*([by] if isinstance(by, str) else by), *result_columns])
+    return pd.concat(tables, ignore_index=True)
+
+
+def skill_pairs(
+    df: pd.DataFrame,
+    skill_cols: Optional[Sequence[str]] = None,
+    by: Union[str, Sequence[str], None] = None,
+    min_count: int = 1,
+    min_rows: int = 30,
+    skill_matrix: Optional[SkillMatrix] = None,
+) -> pd.DataFrame:
+    """Co-occurrence metrics for every ordered pair of skills.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Feature table.
+    skill_cols : Sequence[str], optional
+        Flags to pair; ``eda.hard_skill_columns(df)`` by default.
+    by : str or Sequence[str], optional
+        Segment columns; metrics are computed inside every segment with at
+        least ``min_rows`` vacancies and the segment keys lead the table.
+    min_count : int, optional
+        Minimum number of vacancies carrying both skills.
+    skill_matrix : SkillMatrix, optional
+        Flags of ``df`` packed beforehand.
+
+    Returns
+    -------
+    pandas.DataFrame
+        ``antecedent``, ``consequent``, ``n_antecedent``, ``n_consequent``,
+        ``n_both``, ``support`` (share of vacancies with both),
+        ``confidence`` (share of ``antecedent`` vacancies that also ask for
+        ``consequent``), ``lift`` and ``jaccard``.
+    """
+
+    return _run(df, skill_cols, skill_matrix, by, min_rows, lambda matrix: pair_table(matrix, min_count), PAIR_COLUMNS)
+
+
+def skill_rules(
+    df: pd.DataFrame,
+    skill_cols: Optional[Sequence[str]] = None,
+    by: Union[str, Sequence[str], None] = None,
+    min_support: float = 0.02,
+    min_confidence: float = 0.5,
+    max_len: int = 3,
+    min_rows: int = 30,
+    skill_matrix: Optional[SkillMatrix] = None,
+) -> pd.DataFrame:
+    """Association rules ``skill bundle -> skill`` above support and confidence thresholds.
+
+    ``min_support`` is the share of vacancies (of the segment with ``by``)
+    carrying the whole bundle; ``antecedent`` holds the bundle without the
+    consequent as a tuple. Other parameters as in :func:`skill_pairs`.
+    """
+
+    if max_len < 2:
+        raise ValueError("max_len must be at least 2")
+    return _run(
+        df,
+        skill_cols,
+        skill_matrix,
+        by,
+        min_rows,
+        lambda matrix: rule_table(matrix, min_support, min_confidence, max_len),
+        RULE_COLUMNS,
+    )
+
+
+__all__ = [
+    "PAIR_COLUMNS",
+    "RULE_COLUMNS",
+    "frequent_itemsets",
+    "pair_table",
+    "rule_table",
+    "skill_pairs",
+    "skill_rules",
+]
@@ -0,0 +1,257 @@
+"""Out-of-core cleaning for raw CSVs that do not fit in memory.
+
+The in-memory path (``io.load_raw`` → ``cleaning.handle_missingness`` → …)
+holds several copies of the raw frame at once. Here the raw CSV is streamed
+twice in fixed-size chunks:
+
+1. a scan pass that only collects what needs the whole file — merged column
+   profiles (drop threshold, boolean-likeness, dtypes), a salary quantile
+   sketch for the caps and the latest scrape per vacancy for deduplication;
+2. a cleaning pass that applies the row-local steps to each chunk with those
+   global decisions fixed and appends the result as Parquet row groups.
+
+Peak memory is bounded by the chunk size plus a few small per-row arrays.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from . import cleaning
+from .sketch import KLLSketch
+
+PathLike = Union[str, Path]
+
+DEFAULT_CHUNKSIZE = 50_000
+
+
+@dataclass
+class ChunkedCleaningPlan:
+    """Global decisions collected by the scan pass of chunked cleaning."""
+
+    profiles: Dict[str, cleaning.ColumnProfile]
+    dtypes: Dict[str, str]
+    dropped_cols: List[str]
+    salary_caps: Tuple[float, float] | None
+    latest_scrape: pd.Series | None
+    n_rows: int = 0
+    non_rub_rows: int = 0
+
+
+def _iter_chunks(
+    path: PathLike, chunksize: int, dtype: Dict[str, str] | None = None
+) -> Iterator[pd.DataFrame]:
+    yield from pd.read_csv(Path(path), chunksize=chunksize, dtype=dtype, low_memory=False)
+
+
+def _scrape_times(chunk: pd.DataFrame) -> pd.Series:
+    return cleaning.to_utc_naive(chunk["scraped_at_utc"])
+
+
+def _rub_salary(chunk: pd.DataFrame) -> pd.Series:
+    salary = pd.to_numeric(chunk["salary_mid"], errors="coerce")
+    if "currency" not in chunk.columns:
+        return salary.iloc[0:0]
+    return salary[chunk["currency"].eq("RUB").fillna(False).to_numpy(dtype=bool)]
+
+
+def scan_raw(
+    path: PathLike,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    drop_threshold: float = 0.95,
+    id_col: str = "vacancy_id",
+    salary_method: str = "sketch",
+) -> ChunkedCleaningPlan:
+    """Stream the raw CSV once and collect the global cleaning decisions.
+
+    With ``salary_method="sketch"`` salary caps come from a KLL sketch merged
+    across chunks; ``"exact"`` keeps every RUB salary in memory instead.
+    """
+
+    profiles: Dict[str, cleaning.ColumnProfile] = {}
+    salary_sketch = KLLSketch()
+    salary_parts: List[np.ndarray] = []
+    latest_parts: List[pd.Series] = []
+    n_rows = 0
+    non_rub_rows = 0
+
+    for chunk in _iter_chunks(path, chunksize):
+        n_rows += len(chunk)
+        for col, profile in cleaning.profile_columns(chunk).items():
+            profiles[col] = profiles[col].merge(profile) if col in profiles else profile
+
+        if "currency" in chunk.columns:
+            non_rub_rows += int(chunk["currency"].fillna("").ne("RUB").sum())
+        if "salary_mid" in chunk.columns:
+            rub_salary = _rub_salary(chunk).dropna().to_numpy(dtype="float64")
+            if salary_method == "sketch":
+                salary_sketch.update(rub_salary)
+            else:
+                salary_parts.append(rub_salary)
+
+        if id_col in chunk.columns:
+            if "scraped_at_utc" in chunk.columns:
+                scraped = _scrape_times(chunk)
+            else:
+                scraped = pd.Series(pd.NaT, index=chunk.index, dtype="datetime64[ns]")
+            latest_parts.append(scraped.groupby(chunk[id_col]).max())
+
+    # one reduction over the per-chunk maxima keeps the scan linear in the number of chunks
+    latest = pd.concat(latest_parts).groupby(level=0).max() if latest_parts else None
+
+    # markers become NaN before the drop decision, exactly as in handle_missingness
+    drop_profiles = {col: profile.markers_as_null() for col, profile in profiles.items()}
+    dropped_cols = [col for col, profile in drop_profiles.items() if profile.null_share >= drop_threshold]
+
+    caps = None
+    if "salary_mid" in profiles and "salary_mid" not in dropped_cols:
+        if salary_method == "sketch":
+            caps = cleaning.salary_caps(salary_sketch)
+        elif salary_parts:
+            caps = cleaning.salary_caps(pd.Series(np.concatenate(salary_parts)))
+
+    # Pin dtypes so that chunks missing values or non-null values read alike
+    dtypes: Dict[str, str] = {}
+    for col, profile in profiles.items():
+        if profile.kind == "empty":
+            continue
+        if profile.dtype == "bool":
+            if profile.has_nulls:
+                dtypes[col] = "object"
+        elif profile.dtype.startswith("int") and profile.has_nulls:
+            dtypes[col] = "float64"
+        else:
+            dtypes[col] = profile.dtype
+    return ChunkedCleaningPlan(
+        profiles=drop_profiles,
+        dtypes=dtypes,
+        dropped_cols=dropped_cols,
+        salary_caps=caps,
+        latest_scrape=latest,
+        n_rows=n_rows,
+        non_rub_rows=non_rub_rows,
+    )
+
+
+def clean_chunk(
+    chunk: pd.DataFrame, plan: ChunkedCleaningPlan, id_col: str = "vacancy_id"
+) -> pd.DataFrame:
+    """Apply the row-local cleaning steps to one chunk using global decisions."""
+
+    chunk, _ = cleaning.standardize_unknown_markers(chunk)
+    chunk = chunk.drop(columns=[col for col in plan.dropped_cols if col in chunk.columns])
+    chunk, _ = cleaning._coerce_boolean_like_columns(chunk, profiles=dict(plan.profiles))
+    chunk, _ = cleaning._fill_categorical_missing(chunk, fill_map=cleaning.CATEGORICAL_IMPUTE_MAP)
+    chunk, _ = cleaning._fill_numeric_missing(chunk, fill_map=cleaning.NUMERIC_IMPUTE_RULES)
+    chunk = cleaning.parse_dates(chunk)
+    chunk = cleaning.salary_prepare(chunk, caps=plan.salary_caps)
+
+    if plan.latest_scrape is not None and id_col in chunk.columns and "scraped_at_utc" in chunk.columns:
+        latest = chunk[id_col].map(plan.latest_scrape)
+        keep = chunk["scraped_at_utc"].eq(latest) | latest.isna()
+        chunk = chunk[keep.to_numpy(dtype=bool)]
+    return cleaning.ensure_salary_gross_boolean(chunk)
+
+
+def _arrow_schema(table: "pa.Table", plan: ChunkedCleaningPlan) -> "pa.Schema":
+    """Replace null-typed fields of the first chunk with the planned types."""
+
+    import pyarrow as pa
+
+    fields = []
+    for arrow_field in table.schema:
+        if pa.types.is_null(arrow_field.type):
+            profile = plan.profiles.get(arrow_field.name)
+            is_numeric = profile is not None and profile.kind == "numeric"
+            arrow_type = pa.float64() if is_numeric else pa.string()
+            arrow_field = arrow_field.with_type(arrow_type)
+        fields.append(arrow_field)
+    return pa.schema(fields, metadata=table.schema.metadata)
+
+
+def clean_csv_chunked(
+    raw_path: PathLike,
+    output_path: PathLike,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    drop_threshold: float = 0.95,
+    id_col: str = "vacancy_id",
+    salary_method: str = "sketch",
+) -> Dict[str, object]:
+    """Clean a raw CSV chunk by chunk and write the result as Parquet row groups.
+
+    Equivalent to ``handle_missingness`` → ``parse_dates`` → ``salary_prepare``
+    → ``deduplicate`` on the full file, except that rows keep their file order
+    instead of being sorted by ``scraped_at_utc`` and, with the default
+    ``salary_method="sketch"``, salary caps are KLL estimates.
+
+    Returns
+    -------
+    Dict[str, object]
+        Cleaning metrics mirroring the ``attrs`` set by the in-memory steps.
+    """
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    plan = scan_raw(
+        raw_path,
+        chunksize=chunksize,
+        drop_threshold=drop_threshold,
+        id_col=id_col,
+        salary_method=salary_method,
+    )
+    output = Path(output_path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    writer: pq.ParquetWriter | None = None
+    schema: pa.Schema | None = None
+    # one flag per known vacancy id instead of a Python set of emitted ids
+    emitted = np.zeros(len(plan.latest_scrape) if plan.latest_scrape is not None else 0, dtype=bool)
+    bool_like_cols: List[str] = []
+    rows_written = 0
+    try:
+        for chunk in _iter_chunks(raw_path, chunksize, dtype=plan.dtypes):
+            cleaned = clean_chunk(chunk, plan, id_col=id_col)
+            if plan.latest_scrape is not None and id_col in cleaned.columns:
+                positions = plan.latest_scrape.index.get_indexer(cleaned[id_col])
+                known = positions >= 0
+                first = ~cleaned[id_col].duplicated().to_numpy()
+                first[known] &= ~emitted[positions[known]]
+                cleaned = cleaned[first]
+                emitted[positions[known & first]] = True
+            if not bool_like_cols:
+                bool_like_cols = [col for col in cleaned.columns if str(cleaned[col].dtype) == "boolean"]
+
+            table = pa.Table.from_pandas(cleaned, preserve_index=False)
+            if schema is None:
+                schema = _arrow_schema(table, plan)
+                writer = pq.ParquetWriter(output, schema)
+            table = pa.Table.from_pandas(cleaned, schema=schema, preserve_index=False)
+            writer.write_table(table)
+            rows_written += len(cleaned)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return {
+        "rows_read": plan.n_rows,
+        "rows_written": rows_written,
+        "deduplicated_rows": plan.n_rows - rows_written,
+        "dropped_cols": plan.dropped_cols,
+        "bool_like_cols": bool_like_cols,
+        "salary_caps": plan.salary_caps,
+        "non_rub_share": plan.non_rub_rows / plan.n_rows if plan.n_rows else 0.0,
+    }
+
+
+__all__ = [
+    "DEFAULT_CHUNKSIZE",
+    "ChunkedCleaningPlan",
+    "scan_raw",
+    "clean_chunk",
+    "clean_csv_chunked",
+]
@@ -1,11 +1,17 @@
 """Data cleaning helpers for the Skillra PDA project."""
 from __future__ import annotations
 
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 from typing import Dict, Iterable, List, Tuple
 
 import numpy as np
 import pandas as pd
 
+from .schema import DATETIME_COLUMNS
+from .sketch import KLLSketch, sketch_series
+
 PREFIX_GROUPS = ["is_", "has_", "skill_", "benefit_", "soft_", "domain_", "role_"]
 
 # Declarative missingness handling rules
@@ -83,6 +89,12 @@ BOOL_TRUE_MARKERS = {True, 1, "1", "true", "yes"}
 BOOL_FALSE_MARKERS = {False, 0, "0", "false", "no"}
 BOOLEAN_MARKERS = BOOL_TRUE_MARKERS | BOOL_FALSE_MARKERS | BOOL_NULL_MARKERS
 
+# Values (after strip/lower for strings) that make a column boolean-like
+BOOL_LIKE_VALUES = BOOLEAN_MARKERS | {True, False, 0, 1}
+
+# Distinct values kept in a ColumnProfile; wider columns only keep counts
+PROFILE_UNIQUE_CAP = 64
+
 
 def _normalize_bool_like(value, null_lower: set) -> object:
     """Normalize a single value to True/False/pd.NA if it is boolean-like.
@@ -172,23 +184,260 @@ def is_boolean_like_series(series: pd.Series, null_markers: Iterable[str] | None
     return True
 
 
+def _is_object_like(dtype_str: str) -> bool:
+    return dtype_str == "object" or dtype_str.startswith("category")
+
+
+@dataclass(frozen=True)
+class ColumnProfile:
+    """Per-column statistics computed in a single scan and shared by cleaning steps.
+
+    Attributes
+    ----------
+    name : str
+        Column name.
+    dtype : str
+        String representation of the column dtype at profiling time.
+    n_rows : int
+        Number of rows in the column.
+    null_count : int
+        Number of null values (``NaN``/``None``/``pd.NA``).
+    marker_count : int
+        Number of textual unknown markers (object/category columns only).
+    n_unique : int
+        Number of distinct non-null values.
+    uniques : tuple | None
+        Distinct non-null values, or ``None`` when ``n_unique`` exceeds the cap.
+    marker_values : tuple
+        Distinct raw values recognized as unknown markers.
+    bool_like : bool
+        Whether all non-null values are boolean-like markers.
+    kind : str
+        Inferred kind: ``empty``, ``boolean``, ``bool_like``, ``numeric``,
+        ``datetime``, ``categorical`` or ``text``.
+    """
+
+    name: str
+    dtype: str
+    n_rows: int
+    null_count: int
+    marker_count: int
+    n_unique: int
+    uniques: Tuple[object, ...] | None
+    marker_values: Tuple[object, ...]
+    bool_like: bool
+    kind: str
+
+    @property
+    def null_share(self) -> float:
+        return self.null_count / self.n_rows if self.n_rows else 0.0
+
+    @property
+    def marker_share(self) -> float:
+        return self.marker_count / self.n_rows if self.n_rows else 0.0
+
+    @property
+    def has_nulls(self) -> bool:
+        return self.null_count > 0
+
+    def markers_as_null(self) -> "ColumnProfile":
+        """Return the profile after unknown markers were replaced by ``pd.NA``."""
+
+        if not self.marker_count:
+            return self
+        uniques = self.uniques
+        if uniques is not None:
+            uniques = tuple(u for u in uniques if u not in self.marker_values)
+        null_count = self.null_count + self.marker_count
+        return replace(
+            self,
+            null_count=null_count,
+            marker_count=0,
+            n_unique=self.n_unique - len(self.marker_values),
+            uniques=uniques,
+            marker_values=(),
+            kind=_infer_kind(self.dtype, null_count, self.n_rows, self.bool_like),
+        )
+
+    def merge(self, other: "ColumnProfile", unique_cap: int = PROFILE_UNIQUE_CAP) -> "ColumnProfile":
+        """Combine profiles of the same column computed on disjoint row chunks.
+
+        ``n_unique`` stays exact while the merged distinct values fit into
+        ``unique_cap``; beyond that it is a lower bound.
+        """
+
+        uniques: Tuple[object, ...] | None = None
+        if self.uniques is not None and other.uniques is not None:
+            seen = dict.fromkeys(self.uniques)
+            seen.update(dict.fromkeys(other.uniques))
+            if len(seen) <= unique_cap:
+                uniques = tuple(seen)
+        n_unique = len(uniques) if uniques is not None else max(self.n_unique, other.n_unique, unique_cap + 1)
+
+        if self.kind == "empty":
+            dtype_str = other.dtype
+        elif other.kind == "empty" or self.dtype == other.dtype:
+            dtype_str = self.dtype
+        elif self.kind == other.kind == "numeric":
+            dtype_str = "float64"
+        else:
+            dtype_str = "object"
+
+        n_rows = self.n_rows + other.n_rows
+        null_count = self.null_count + other.null_count
+        bool_like = self.bool_like and other.bool_like
+        return ColumnProfile(
+            name=self.name,
+            dtype=dtype_str,
+            n_rows=n_rows,
+            null_count=null_count,
+            marker_count=self.marker_count + other.marker_count,
+            n_unique=n_unique,
+            uniques=uniques,
+            marker_values=tuple(dict.fromkeys(self.marker_values + other.marker_values)),
+            bool_like=bool_like,
+            kind=_infer_kind(dtype_str, null_count, n_rows, bool_like),
+        )
+
+
+def _infer_kind(dtype_str: str, null_count: int, n_rows: int, bool_like: bool) -> str:
+    if null_count == n_rows:
+        return "empty"
+    if dtype_str in {"bool", "boolean"}:
+        return "boolean"
+    if bool_like:
+        return "bool_like"
+    if dtype_str.startswith("category"):
+        return "categorical"
+    if dtype_str.startswith("datetime"):
+        return "datetime"
+    if dtype_str.startswith(("int", "uint", "float", "Int", "UInt", "Float")):
+        return "numeric"
+    return "text"
+
+
+def profile_column(
+    series: pd.Series,
+    unique_cap: int = PROFILE_UNIQUE_CAP,
+    markers: Iterable[str] | None = None,
+) -> ColumnProfile:
+    """Profile a single column with one hashing pass over its values.
+
+    Null counts, distinct values, unknown-marker counts and boolean-likeness
+    are all derived from ``pd.factorize`` codes, so each value is touched once
+    and the per-value Python work is limited to distinct values.
+    """
+
+    dtype_str = str(series.dtype)
+    markers_set = {m.strip().lower() for m in (markers or UNKNOWN_MARKERS)}
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    values = list(uniques)
+    n_rows = len(series)
+    null_count = int((codes < 0).sum())
+
+    marker_count = 0
+    marker_values: Tuple[object, ...] = ()
+    if _is_object_like(dtype_str) and values:
+        marker_idx = [
+            i for i, val in enumerate(values) if isinstance(val, str) and val.strip().lower() in markers_set
+        ]
+        if marker_idx:
+            counts = np.bincount(codes[codes >= 0], minlength=len(values))
+            marker_count = int(counts[marker_idx].sum())
+            marker_values = tuple(values[i] for i in marker_idx)
+
+    bool_like = True
+    for val in values:
+        normalized = val.strip().lower() if isinstance(val, str) else val
+        if normalized not in BOOL_LIKE_VALUES:
+            bool_like = False
+            break
+
+    return ColumnProfile(
+        name=str(series.name),
+        dtype=dtype_str,
+        n_rows=n_rows,
+        null_count=null_count,
+        marker_count=marker_count,
+        n_unique=len(values),
+        uniques=tuple(values) if len(values) <= unique_cap else None,
+        marker_values=marker_values,
+        bool_like=bool_like,
+        kind=_infer_kind(dtype_str, null_count, n_rows, bool_like),
+    )
+
+
+def profile_columns(
+    df: pd.DataFrame,
+    columns: Iterable[str] | None = None,
+    unique_cap: int = PROFILE_UNIQUE_CAP,
+    n_jobs: int | None = None,
+) -> Dict[str, ColumnProfile]:
+    """Profile dataframe columns once so cleaning steps do not rescan the data.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Dataframe to profile.
+    columns : Iterable[str] | None, optional
+        Subset of columns to profile. Defaults to all columns.
+    unique_cap : int, optional
+        Maximum number of distinct values stored per column.
+    n_jobs : int | None, optional
+        Number of worker threads. ``None`` or ``1`` profiles sequentially.
+
+    Returns
+    -------
+    Dict[str, ColumnProfile]
+        Profiles keyed by column name, in column order.
+    """
+
+    cols = list(df.columns if columns is None else columns)
+    if n_jobs is None or n_jobs <= 1 or len(cols) < 2:
+        return {col: profile_column(df[col], unique_cap=unique_cap) for col in cols}
+
+    with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+        results = pool.map(lambda col: profile_column(df[col], unique_cap=unique_cap), cols)
+        return dict(zip(cols, results))
+
+
+def _resolve_profiles(
+    df: pd.DataFrame, profiles: Dict[str, ColumnProfile] | None
+) -> Dict[str, ColumnProfile]:
+    """Return profiles for every column of ``df``, profiling only missing ones."""
+
+    if profiles is None:
+        return profile_columns(df)
+    missing = [col for col in df.columns if col not in profiles]
+    if missing:
+        profiles.update(profile_columns(df, columns=missing))
+    return profiles
+
+
 def _drop_mostly_missing_columns(
-    df: pd.DataFrame, threshold: float = 0.95
+    df: pd.DataFrame,
+    threshold: float = 0.95,
+    profiles: Dict[str, ColumnProfile] | None = None,
 ) -> Tuple[pd.DataFrame, List[str]]:
     """Drop columns whose missingness exceeds the threshold."""
 
-    missing_share = df.isna().mean()
-    to_drop = missing_share[missing_share >= threshold].index.tolist()
+    profiles = _resolve_profiles(df, profiles)
+    to_drop = [col for col in df.columns if profiles[col].null_share >= threshold]
     if to_drop:
         df = df.drop(columns=to_drop)
     return df, to_drop
 
 
-def _coerce_boolean_like_columns(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str]]:
-    """Coerce boolean-like columns (including salary_gross and prefixed bools)."""
+def _coerce_boolean_like_columns(
+    df: pd.DataFrame, profiles: Dict[str, ColumnProfile] | None = None
+) -> Tuple[pd.DataFrame, List[str]]:
+    """Coerce boolean-like columns (including salary_gross and prefixed bools).
+
+    Profiles of coerced columns are refreshed in place when ``profiles`` is given.
+    """
 
+    profiles = _resolve_profiles(df, profiles)
     bool_like_cols: List[str] = []
-    allowed_values = BOOLEAN_MARKERS | {True, False, 0, 1}
     replace_map = {
         "true": True,
         "1": True,
@@ -208,15 +457,12 @@ def _coerce_boolean_like_columns(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[s
         prefix_candidate = any(col.startswith(prefix) for prefix in PREFIX_GROUPS)
         force = prefix_candidate or col == "salary_gross" or dtype_str in {"bool", "boolean"}
 
-        uniques = series.dropna().unique()
-        normalized_uniques = set()
-        for val in uniques:
-            if isinstance(val, str):
-                normalized_uniques.add(val.strip().lower())
-            else:
-                normalized_uniques.add(val)
+        if dtype_str == "boolean":
+            # already typed at load time, nothing to coerce
+            bool_like_cols.append(col)
+            continue
 
-        subset_bool_like = all(u in allowed_values for u in normalized_uniques) or not normalized_uniques
+        subset_bool_like = profiles[col].bool_like
         if not (subset_bool_like or force):
             continue
 
@@ -238,13 +484,16 @@ def _coerce_boolean_like_columns(df: pd.DataFrame) -> Tuple[pd.DataFrame, List[s
             continue
 
         df[col] = coerced.astype("boolean")
+        profiles[col] = profile_column(df[col])
         bool_like_cols.append(col)
 
     return df, bool_like_cols
 
 
 def _fill_categorical_missing(
-    df: pd.DataFrame, fill_map: Dict[str, str] | None = None
+    df: pd.DataFrame,
+    fill_map: Dict[str, str] | None = None,
+    profiles: Dict[str, ColumnProfile] | None = None,
 ) -> Tuple[pd.DataFrame, List[str]]:
     """Fill missing values in selected categorical/object columns."""
 
@@ -259,15 +508,23 @@ def _fill_categorical_missing(
         dtype_str = str(df[col].dtype)
         if dtype_str != "object" and not dtype_str.startswith("category"):
             continue
-        if df[col].isna().any():
-            df[col] = df[col].fillna(fill_value)
+        has_nulls = profiles[col].has_nulls if profiles and col in profiles else df[col].isna().any()
+        if has_nulls:
+            series = df[col]
+            if dtype_str.startswith("category") and fill_value not in series.cat.categories:
+                series = series.cat.add_categories([fill_value])
+            df[col] = series.fillna(fill_value)
+            if profiles is not None:
+                profiles[col] = profile_column(df[col])
             filled_cols.append(col)
 
     return df, filled_cols
 
 
 def standardize_unknown_markers(
-    df: pd.DataFrame, markers: Iterable[str] | None = None
+    df: pd.DataFrame,
+    markers: Iterable[str] | None = None,
+    profiles: Dict[str, ColumnProfile] | None = None,
 ) -> Tuple[pd.DataFrame, List[str]]:
     """Replace textual unknown markers with ``pd.NA`` for string-like columns.
 
@@ -278,6 +535,9 @@ def standardize_unknown_markers(
     markers : Iterable[str] | None
         Collection of textual markers representing unknown values. Defaults to
         ``UNKNOWN_MARKERS``.
+    profiles : Dict[str, ColumnProfile] | None
+        Precomputed column profiles. With default markers, columns without
+        markers are skipped and profiles of affected columns are updated in place.
 
     Returns
     -------
@@ -292,21 +552,29 @@ def standardize_unknown_markers(
     def is_marker(val: object) -> bool:
         return isinstance(val, str) and val.strip().lower() in markers_set
 
+    use_profiles = profiles is not None and markers is None
+
     for col in df.columns:
         dtype_str = str(df[col].dtype)
         if dtype_str != "object" and not dtype_str.startswith("category"):
             continue
+        if use_profiles and col in profiles and not profiles[col].marker_count:
+            continue
         series = df[col]
         mask = series.map(is_marker)
         if mask.any():
             df[col] = series.mask(mask, pd.NA)
+            if use_profiles and col in profiles:
+                profiles[col] = profiles[col].markers_as_null()
             affected.append(col)
 
     return df, affected
 
 
 def _fill_numeric_missing(
-    df: pd.DataFrame, fill_map: Dict[str, float | int] | None = None
+    df: pd.DataFrame,
+    fill_map: Dict[str, float | int] | None = None,
+    profiles: Dict[str, ColumnProfile] | None = None,
 ) -> Tuple[pd.DataFrame, List[str]]:
     """Fill missing numeric columns according to explicit rules."""
 
@@ -323,10 +591,15 @@ def _fill_numeric_missing(
         elif col.endswith("_count"):
             fill_value = 0
 
-        if fill_value is None or not df[col].isna().any():
+        if fill_value is None:
+            continue
+        has_nulls = profiles[col].has_nulls if profiles and col in profiles else df[col].isna().any()
+        if not has_nulls:
             continue
 
         df[col] = df[col].fillna(fill_value)
+        if profiles is not None:
+            profiles[col] = profile_column(df[col])
         filled_cols.append(col)
     return df, filled_cols
 
@@ -406,34 +679,104 @@ def detect_column_groups(df: pd.DataFrame) -> Dict[str, List[str]]:
     return groups
 
 
+_ZONE_OFFSET = re.compile(r"(Z|[+-]\d\d(:?\d\d)?)$")
+
+
+def _iso_timestamps(values: pd.Series) -> pd.Series | None:
+    """Parse ISO 8601 text with Arrow's cast kernel, ``None`` for anything else.
+
+    Strings with a zone offset are converted to UTC, strings without one are
+    taken as UTC. The first non-null value decides which of the two forms the
+    column uses (a cast that trips over an unexpected offset is slow to fail);
+    mixed or non-ISO text is left to ``pd.to_datetime``.
+    """
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    try:
+        array = pa.array(values, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, UnicodeEncodeError):
+        return None
+    if not (pa.types.is_string(array.type) or pa.types.is_large_string(array.type)):
+        return None
+    # the resolution pd.to_datetime picks; nanosecond fractions fail the
+    # microsecond cast and take the fallback, as pandas 3 would switch to ns
+    unit = "us" if int(pd.__version__.split(".")[0]) >= 3 else "ns"
+    first = pc.index(array.is_valid(), True).as_py()
+    # the time part starts after the 10-character date, whose dashes are not offsets
+    zoned = first >= 0 and _ZONE_OFFSET.search(array[first].as_py()[10:]) is not None
+    try:
+        parsed = array.cast(pa.timestamp(unit, tz="UTC" if zoned else None))
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return None
+    naive = parsed.cast(pa.timestamp(unit)).to_numpy(zero_copy_only=False)
+    return pd.Series(naive, index=values.index, name=values.name)
+
+
+def to_utc_naive(values: pd.Series) -> pd.Series:
+    """Timestamps as tz-naive UTC ``datetime64``; unparseable values become ``NaT``.
+
+    Columns that already hold datetimes are used as they are (tz-aware ones
+    are converted to UTC), so calling this on the output of
+    :func:`parse_dates` costs nothing. ISO 8601 text, the format of the raw
+    CSV, goes through Arrow in one vectorized pass; other values fall back to
+    ``pd.to_datetime(errors="coerce", utc=True)``.
+    """
+
+    if not isinstance(values, pd.Series):
+        values = pd.Series(values)
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        return values.dt.tz_convert(None)
+    if pd.api.types.is_datetime64_dtype(values.dtype):
+        return values
+    parsed = _iso_timestamps(values)
+    if parsed is None:
+        parsed = pd.to_datetime(values, errors="coerce", utc=True).dt.tz_convert(None)
+    return parsed
+
+
 def parse_dates(df: pd.DataFrame) -> pd.DataFrame:
-    """Parse timestamp-like columns into datetimes."""
-    date_cols = ["published_at_iso", "scraped_at_utc"]
-    for col in date_cols:
+    """Parse the ``DATETIME_COLUMNS`` into tz-naive UTC datetimes.
+
+    Adds ``vacancy_age_days`` when both columns are present. Columns that are
+    already ``datetime64`` are kept as they are.
+    """
+    for col in DATETIME_COLUMNS:
         if col in df.columns:
-            # align on UTC to avoid tz-naive/aware subtraction issues
-            df[col] = pd.to_datetime(df[col], errors="coerce", utc=True)
+            df[col] = to_utc_naive(df[col])
 
     if "published_at_iso" in df.columns and "scraped_at_utc" in df.columns:
         df["vacancy_age_days"] = (df["scraped_at_utc"] - df["published_at_iso"]).dt.days
-        # store tz-naive versions for downstream use
-        df["published_at_iso"] = df["published_at_iso"].dt.tz_convert(None)
-        df["scraped_at_utc"] = df["scraped_at_utc"].dt.tz_convert(None)
     return df
 
 
-def handle_missingness(df: pd.DataFrame, drop_threshold: float = 0.95) -> pd.DataFrame:
-    """Handle missing values using declarative sub-steps."""
+def handle_missingness(
+    df: pd.DataFrame,
+    drop_threshold: float = 0.95,
+    profiles: Dict[str, ColumnProfile] | None = None,
+    n_jobs: int | None = None,
+) -> pd.DataFrame:
+    """Handle missing values using declarative sub-steps.
+
+    Columns are profiled once up front (optionally in ``n_jobs`` threads) and the
+    profiles are kept in sync by each sub-step instead of rescanning the data.
+    """
 
     df = df.copy()
+    profiles = dict(profiles) if profiles is not None else profile_columns(df, n_jobs=n_jobs)
 
-    df, normalized_unknown_cols = standardize_unknown_markers(df)
-    df, dropped_cols = _drop_mostly_missing_columns(df, threshold=drop_threshold)
-    df, bool_like_cols = _coerce_boolean_like_columns(df)
+    df, normalized_unknown_cols = standardize_unknown_markers(df, profiles=profiles)
+    df, dropped_cols = _drop_mostly_missing_columns(
+        df, threshold=drop_threshold, profiles=profiles
+    )
+    df, bool_like_cols = _coerce_boolean_like_columns(df, profiles=profiles)
     df, filled_categorical_cols = _fill_categorical_missing(
-        df, fill_map=CATEGORICAL_IMPUTE_MAP
+        df, fill_map=CATEGORICAL_IMPUTE_MAP, profiles=profiles
+    )
+    df, filled_numeric_cols = _fill_numeric_missing(
+        df, fill_map=NUMERIC_IMPUTE_RULES, profiles=profiles
     )
-    df, filled_numeric_cols = _fill_numeric_missing(df, fill_map=NUMERIC_IMPUTE_RULES)
 
     df.attrs["normalized_unknown_cols"] = normalized_unknown_cols
     df.attrs["dropped_cols"] = dropped_cols
@@ -473,7 +816,11 @@ def ensure_salary_gross_boolean(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def summarize_data_health(df: pd.DataFrame, prefix: str = "") -> pd.DataFrame:
+def summarize_data_health(
+    df: pd.DataFrame,
+    prefix: str = "",
+    profiles: Dict[str, ColumnProfile] | None = None,
+) -> pd.DataFrame:
     """Summarize data health: dtype, NaN share, unknown markers, comments.
 
     Parameters
@@ -482,6 +829,8 @@ def summarize_data_health(df: pd.DataFrame, prefix: str = "") -> pd.DataFrame:
         Dataframe to summarize.
     prefix : str, optional
         Optional prefix for column names in the report.
+    profiles : Dict[str, ColumnProfile] | None, optional
+        Precomputed column profiles; missing ones are computed on the fly.
 
     Returns
     -------
@@ -489,20 +838,14 @@ def summarize_data_health(df: pd.DataFrame, prefix: str = "") -> pd.DataFrame:
         Table with columns: column, dtype, share_nan, share_unknown_marker, comment.
     """
 
-    markers_set = {m.strip().lower() for m in UNKNOWN_MARKERS}
+    profiles = _resolve_profiles(df, dict(profiles) if profiles is not None else None)
     records: List[Dict[str, object]] = []
 
     for col in df.columns:
-        series = df[col]
-        dtype_str = str(series.dtype)
-        nan_share = float(series.isna().mean())
-
-        marker_share = 0.0
-        if dtype_str == "object" or dtype_str.startswith("category"):
-            marker_mask = series.apply(
-                lambda v: isinstance(v, str) and v.strip().lower() in markers_set
-            )
-            marker_share = float(marker_mask.mean())
+        profile = profiles[col]
+        dtype_str = str(df[col].dtype)
+        nan_share = float(profile.null_share)
+        marker_share = float(profile.marker_share)
 
         comment_parts: List[str] = []
         base_comment = KEY_COLUMN_COMMENTS.get(col)
@@ -527,8 +870,54 @@ def summarize_data_health(df: pd.DataFrame, prefix: str = "") -> pd.DataFrame:
     return pd.DataFrame(records)
 
 
-def salary_prepare(df: pd.DataFrame) -> pd.DataFrame:
-    """Create salary helper columns and cap outliers for RUB."""
+SALARY_CAP_QUANTILES = (0.01, 0.99)
+
+
+def salary_caps(
+    salary: pd.Series | KLLSketch, method: str = "exact"
+) -> Tuple[float, float] | None:
+    """Return the (1%, 99%) quantiles used to cap RUB salaries.
+
+    Parameters
+    ----------
+    salary : pd.Series | KLLSketch
+        Salary values, or an already built (possibly merged) sketch.
+    method : str, optional
+        ``"exact"`` for ``Series.quantile`` or ``"sketch"`` for a KLL sketch
+        estimate with bounded rank error. Ignored when a sketch is passed.
+    """
+
+    lower_q, upper_q = SALARY_CAP_QUANTILES
+    if isinstance(salary, KLLSketch) or method == "sketch":
+        sketch = salary if isinstance(salary, KLLSketch) else sketch_series(salary)
+        if not sketch.n:
+            return None
+        lower, upper = sketch.quantiles([lower_q, upper_q])
+        return float(lower), float(upper)
+    if method != "exact":
+        raise ValueError(f"unknown quantile method: {method}")
+    if not salary.notna().any():
+        return None
+    return salary.quantile(lower_q), salary.quantile(upper_q)
+
+
+def salary_prepare(
+    df: pd.DataFrame,
+    caps: Tuple[float, float] | None = None,
+    method: str = "exact",
+) -> pd.DataFrame:
+    """Create salary helper columns and cap outliers for RUB.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Dataframe with ``salary_mid`` and ``currency`` columns.
+    caps : Tuple[float, float] | None, optional
+        Precomputed (lower, upper) caps, e.g. from a full-file pass in chunked
+        cleaning. By default caps are the 1%/99% quantiles of this frame.
+    method : str, optional
+        Quantile method used when ``caps`` is not given, see ``salary_caps``.
+    """
     if "salary_mid" in df.columns:
         currency_series = df.get("currency")
         mask = currency_series == "RUB" if currency_series is not None else False
@@ -540,9 +929,10 @@ def salary_prepare(df: pd.DataFrame) -> pd.DataFrame:
 
     df["salary_known"] = df["salary_mid_rub"].notna()
 
-    if df["salary_mid_rub"].notna().any():
-        lower = df["salary_mid_rub"].quantile(0.01)
-        upper = df["salary_mid_rub"].quantile(0.99)
+    if caps is None:
+        caps = salary_caps(df["salary_mid_rub"], method=method)
+    if caps is not None and df["salary_mid_rub"].notna().any():
+        lower, upper = caps
         df["salary_mid_rub_capped"] = df["salary_mid_rub"].clip(lower=lower, upper=upper)
     else:
         df["salary_mid_rub_capped"] = df["salary_mid_rub"]
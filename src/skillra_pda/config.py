@@ -20,6 +20,13 @@ NOTEBOOK_REPORTS_DIR = REPORTS_DIR / "notebooks"
 RAW_DATA_FILE = RAW_DATA_DIR / "hh_moscow_it_2025_11_30.csv"
 CLEAN_DATA_FILE = PROCESSED_DATA_DIR / "hh_clean.parquet"
 FEATURE_DATA_FILE = PROCESSED_DATA_DIR / "hh_features.parquet"
+FEATURE_TEXT_FILE = PROCESSED_DATA_DIR / "hh_features_text.parquet"
+FEATURE_CACHE_FILE = PROCESSED_DATA_DIR / "hh_features.arrow"
+FEATURE_DATASET_DIR = PROCESSED_DATA_DIR / "hh_features"
+KEY_SKILLS_FILE = PROCESSED_DATA_DIR / "hh_key_skills.npz"
+STAGE_CACHE_DIR = PROCESSED_DATA_DIR / ".stage_cache"
+VACANCY_INDEX_FILE = PROCESSED_DATA_DIR / "vacancy_index.sqlite"
+RUN_LOG_FILE = REPORTS_DIR / "pipeline_runs.jsonl"
 
 
 def ensure_directories() -> None:
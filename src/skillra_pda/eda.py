@@ -3,8 +3,12 @@ from __future__ import annotations
 
 from typing import Iterable, List
 
+import numpy as np
 import pandas as pd
 
+from .lookup import UniqueMapper
+from .skill_matrix import SkillMatrix
+
 
 def missing_share(df: pd.DataFrame, top_n: int = 20) -> pd.Series:
     """Return top missing shares."""
@@ -135,6 +139,9 @@ def _normalize_english_level(level: str | None, required: bool | None) -> str:
     return mapping.get(level_normalized, "no_english")
 
 
+_english_level_mapper = UniqueMapper(_normalize_english_level)
+
+
 def english_requirement_stats(df: pd.DataFrame, salary_col: str = "salary_mid_rub_capped") -> pd.DataFrame:
     """Bucket English requirements and summarize vacancy counts/share/salary."""
 
@@ -144,16 +151,11 @@ def english_requirement_stats(df: pd.DataFrame, salary_col: str = "salary_mid_ru
     if salary_col not in df.columns:
         raise KeyError(f"english_requirement_stats: expected column {salary_col}")
 
-    required = df.get("lang_english_required")
-    level = df.get("lang_english_level")
+    missing = pd.Series(None, index=df.index, dtype=object)
     temp = df.copy()
-    temp["english_level"] = [
-        _normalize_english_level(lvl, req)
-        for lvl, req in zip(
-            level if level is not None else [None] * len(df),
-            required if required is not None else [None] * len(df),
-        )
-    ]
+    temp["english_level"] = _english_level_mapper(
+        df.get("lang_english_level", missing), df.get("lang_english_required", missing)
+    )
 
     grouped = (
         temp.groupby("english_level")[salary_col]
@@ -280,6 +282,7 @@ def skill_share_by_grade(
     df: pd.DataFrame,
     skill_cols: list[str] | None = None,
     grade_col: str = "grade",
+    skill_matrix: SkillMatrix | None = None,
 ) -> pd.DataFrame:
     """Compute share of vacancies with each skill across grades."""
 
@@ -291,11 +294,15 @@ def skill_share_by_grade(
     if not available:
         return pd.DataFrame()
 
-    subset = df[[grade_col] + available].copy()
-    subset[available] = subset[available].fillna(False).astype(bool)
-    pivot = subset.groupby(grade_col)[available].mean().T
-    pivot.index.name = "skill"
-    return pivot
+    matrix = SkillMatrix.for_frame(df, available, skill_matrix)
+    codes, grades = pd.factorize(df[grade_col], sort=True)
+    sizes = np.bincount(codes[codes >= 0], minlength=len(grades))
+    shares = matrix.group_counts(codes, len(grades)) / sizes[:, None]
+    return pd.DataFrame(
+        shares.T,
+        index=pd.Index(available, name="skill"),
+        columns=pd.Index(grades, name=grade_col),
+    )
 
 
 def junior_friendly_share(df: pd.DataFrame, group_col: str = "primary_role") -> pd.DataFrame:
@@ -498,8 +505,11 @@ def junior_friendly_share_by_segment(df: pd.DataFrame) -> pd.DataFrame:
 def _normalize_education_level(level: str | None, required: bool | None, technical: bool | None) -> str:
     """Map education markers to coarse buckets."""
 
-    if level:
+    if not pd.isna(level) and level:
         level = str(level).strip().lower()
+    # nullable boolean flags yield pd.NA, which has no truth value
+    required = False if pd.isna(required) else required
+    technical = False if pd.isna(technical) else technical
 
     if level == "master_or_higher":
         return "master_phd"
@@ -513,6 +523,9 @@ def _normalize_education_level(level: str | None, required: bool | None, technic
     return "no_degree_required"
 
 
+_education_level_mapper = UniqueMapper(_normalize_education_level)
+
+
 def education_requirement_stats(df: pd.DataFrame, salary_col: str = "salary_mid_rub_capped") -> pd.DataFrame:
     """Bucket education requirements with counts, share and salary medians."""
 
@@ -522,18 +535,11 @@ def education_requirement_stats(df: pd.DataFrame, salary_col: str = "salary_mid_
     if salary_col not in df.columns:
         raise KeyError(f"education_requirement_stats: expected column {salary_col}")
 
-    required = df.get("edu_required")
-    level = df.get("edu_level")
-    technical = df.get("edu_technical")
+    missing = pd.Series(None, index=df.index, dtype=object)
     temp = df.copy()
-    temp["education_level"] = [
-        _normalize_education_level(lvl, req, tech)
-        for lvl, req, tech in zip(
-            level if level is not None else [None] * len(df),
-            required if required is not None else [None] * len(df),
-            technical if technical is not None else [None] * len(df),
-        )
-    ]
+    temp["education_level"] = _education_level_mapper(
+        df.get("edu_level", missing), df.get("edu_required", missing), df.get("edu_technical", missing)
+    )
 
     grouped = (
         temp.groupby("education_level")[salary_col]
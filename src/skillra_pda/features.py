@@ -1,12 +1,20 @@
 """Feature engineering utilities aligned with the project plan."""
 from __future__ import annotations
 
-from typing import Dict, Iterable, List
+import hashlib
+import inspect
+import sys
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 
-from .cleaning import detect_column_groups
+from . import premium
+from .cleaning import detect_column_groups, to_utc_naive
+from .lookup import UniqueMapper
+from .skill_matrix import SkillMatrix
+from .sketch import KLLSketch, sketch_series
 
 
 CITY_MILLION_PLUS = {
@@ -77,22 +85,30 @@ ML_STACK_SKILLS = [
 ]
 
 
-def _experience_to_grade(years: float | None, no_experience_flag: bool | None, raw: str | None) -> str:
-    """Infer grade bucket from experience markers."""
+def _copy_on_write_enabled() -> bool:
+    return int(pd.__version__.split(".")[0]) >= 3 or pd.get_option("mode.copy_on_write") is True
 
-    if isinstance(no_experience_flag, (bool, np.bool_)) and no_experience_flag:
-        return "intern"
 
-    if years is not None and not pd.isna(years):
-        if years < 1:
-            return "intern"
-        if years < 3:
-            return "junior"
-        if years < 5:
-            return "middle"
-        if years < 8:
-            return "senior"
-        return "lead"
+def derived_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Copy of ``df`` that feature helpers can add columns to.
+
+    Under copy-on-write (pandas >= 3, or ``mode.copy_on_write`` in pandas 2)
+    a shallow copy suffices: existing columns stay shared with the caller's
+    frame until one of them is overwritten. Without it a deep copy keeps the
+    caller's frame safe from in-place writes.
+    """
+
+    return df.copy(deep=not _copy_on_write_enabled())
+
+
+# relative move of a salary bucket boundary that triggers re-bucketing in update_features
+SALARY_EDGE_TOLERANCE = 0.05
+
+EXPERIENCE_YEAR_GRADES = [(1, "intern"), (3, "junior"), (5, "middle"), (8, "senior")]
+
+
+def _experience_text_to_grade(raw: str | None) -> str:
+    """Grade from the raw hh.ru experience label when no year bounds are known."""
 
     if isinstance(raw, str):
         raw_lower = raw.lower()
@@ -108,10 +124,37 @@ def _experience_to_grade(years: float | None, no_experience_flag: bool | None, r
     return "unknown"
 
 
+def _experience_to_grade(years: float | None, no_experience_flag: bool | None, raw: str | None) -> str:
+    """Infer grade bucket from experience markers."""
+
+    if isinstance(no_experience_flag, (bool, np.bool_)) and no_experience_flag:
+        return "intern"
+
+    if years is not None and not pd.isna(years):
+        for upper, grade in EXPERIENCE_YEAR_GRADES:
+            if years < upper:
+                return grade
+        return "lead"
+
+    return _experience_text_to_grade(raw)
+
+
+def _true_flag_mask(flag: pd.Series) -> np.ndarray:
+    """Rows where ``flag`` holds an actual ``True`` (not a truthy string or number)."""
+
+    if pd.api.types.is_bool_dtype(flag.dtype):
+        return flag.fillna(False).to_numpy(dtype=bool)
+    if flag.dtype != object:
+        return np.zeros(len(flag), dtype=bool)
+    codes, uniques = pd.factorize(flag)
+    is_true = np.array([isinstance(v, (bool, np.bool_)) and bool(v) for v in uniques] + [False], dtype=bool)
+    return is_true[codes]
+
+
 def add_grade_from_experience(df: pd.DataFrame) -> pd.DataFrame:
     """Derive grade_from_experience using exp_min/max and raw markers."""
 
-    df = df.copy()
+    df = derived_frame(df)
     min_years = pd.to_numeric(df.get("exp_min_years"), errors="coerce") if "exp_min_years" in df else None
     max_years = pd.to_numeric(df.get("exp_max_years"), errors="coerce") if "exp_max_years" in df else None
     base_years = None
@@ -122,39 +165,46 @@ def add_grade_from_experience(df: pd.DataFrame) -> pd.DataFrame:
     elif max_years is not None:
         base_years = max_years
     else:
-        base_years = pd.Series(pd.NA, index=df.index)
-
-    exp_flag = df.get("exp_is_no_experience") if "exp_is_no_experience" in df else None
-    raw_exp = df.get("experience") if "experience" in df else None
+        base_years = pd.Series(np.nan, index=df.index)
+    years = base_years.to_numpy(dtype=float, na_value=np.nan)
+
+    # work on positions in `labels`; the text fallback is evaluated once per distinct label
+    labels = np.array([grade for _, grade in EXPERIENCE_YEAR_GRADES] + ["lead", "unknown"], dtype=object)
+    label_pos = {label: pos for pos, label in enumerate(labels)}
+    if "experience" in df:
+        text_codes, text_values = pd.factorize(df["experience"])
+        text_pos = np.array([label_pos[_experience_text_to_grade(v)] for v in text_values] + [label_pos["unknown"]])
+        fallback = text_pos[text_codes]
+    else:
+        fallback = np.full(len(df), label_pos["unknown"])
+    thresholds = np.array([upper for upper, _ in EXPERIENCE_YEAR_GRADES], dtype=float)
+    codes = np.where(np.isnan(years), fallback, np.searchsorted(thresholds, years, side="right"))
+    if "exp_is_no_experience" in df:
+        codes[_true_flag_mask(df["exp_is_no_experience"])] = label_pos["intern"]
 
-    df["grade_from_experience"] = [
-        _experience_to_grade(
-            float(years) if years is not None and not pd.isna(years) else None,
-            exp_flag.iloc[i] if exp_flag is not None else None,
-            raw_exp.iloc[i] if raw_exp is not None else None,
-        )
-        for i, years in enumerate(base_years)
-    ]
+    df["grade_from_experience"] = labels[codes]
     return df
 
 
 def add_time_features(df: pd.DataFrame, date_col: str = "published_at_iso") -> pd.DataFrame:
-    """Add weekday/month/is_weekend flags from the publication date and vacancy age."""
-    if date_col in df.columns:
-        dt = pd.to_datetime(df[date_col], errors="coerce")
-        df["published_weekday"] = dt.dt.weekday
-        df["published_month"] = dt.dt.month
-        df["is_weekend_post"] = dt.dt.weekday.isin([5, 6])
+    """Add weekday/month/is_weekend flags from the publication date and vacancy age.
+
+    Datetime columns (the output of ``cleaning.parse_dates``) are used as
+    they are; raw text is parsed once per column with ``cleaning.to_utc_naive``.
+    """
+    published = to_utc_naive(df[date_col]) if date_col in df.columns else None
+    if published is not None:
+        df["published_weekday"] = published.dt.weekday
+        df["published_month"] = published.dt.month
+        df["is_weekend_post"] = published.dt.weekday.isin([5, 6])
     else:
         # Keep downstream expectations stable even if the source column was dropped upstream.
         df["published_weekday"] = pd.NA
         df["published_month"] = pd.NA
         df["is_weekend_post"] = pd.NA
 
-    if "scraped_at_utc" in df.columns and date_col in df.columns:
-        scraped = pd.to_datetime(df["scraped_at_utc"], errors="coerce", utc=True).dt.tz_convert(None)
-        published = pd.to_datetime(df[date_col], errors="coerce", utc=True).dt.tz_convert(None)
-        df["vacancy_age_days"] = (scraped - published).dt.days
+    if "scraped_at_utc" in df.columns and published is not None:
+        df["vacancy_age_days"] = (to_utc_naive(df["scraped_at_utc"]) - published).dt.days
     else:
         df["vacancy_age_days"] = pd.NA
     return df
@@ -175,48 +225,49 @@ def _city_to_tier(city: str | float) -> str:
     return "Other RU"
 
 
+_city_tier_mapper = UniqueMapper(_city_to_tier)
+
+
 def add_city_tier(df: pd.DataFrame, city_col: str = "city") -> pd.DataFrame:
     """Map raw cities into simplified buckets for analysis."""
     if city_col in df.columns:
-        df["city_tier"] = df[city_col].apply(_city_to_tier)
+        df["city_tier"] = _city_tier_mapper(df[city_col])
     else:
         df["city_tier"] = "unknown"
     return df
 
 
+WORK_MODES = ["remote", "hybrid", "office", "field"]
+
+
 def add_work_mode(df: pd.DataFrame) -> pd.DataFrame:
     """Create normalized work mode prioritizing explicit work_format, then remote/hybrid flags."""
 
-    def decide(row: dict) -> str:
-        work_format = row.get("work_format")
-        if isinstance(work_format, str) and work_format in {"remote", "hybrid", "office", "field"}:
-            return work_format
-        remote_flag = row.get("is_remote")
-        hybrid_flag = row.get("is_hybrid")
-        if isinstance(remote_flag, (bool, np.bool_)) and remote_flag:
-            return "remote"
-        if isinstance(hybrid_flag, (bool, np.bool_)) and hybrid_flag:
-            return "hybrid"
-        return "unknown"
-
-    df = df.copy()
-    df["work_mode"] = [
-        decide(
-            {
-                "is_remote": df.get("is_remote").iloc[i] if "is_remote" in df else None,
-                "is_hybrid": df.get("is_hybrid").iloc[i] if "is_hybrid" in df else None,
-                "work_format": df.get("work_format").iloc[i] if "work_format" in df else None,
-            }
-        )
-        for i in range(len(df))
-    ]
+    df = derived_frame(df)
+    labels = np.array(WORK_MODES + ["unknown"], dtype=object)
+    unknown = len(WORK_MODES)
+    conditions, choices = [], []
+    if "work_format" in df:
+        format_codes, format_values = pd.factorize(df["work_format"])
+        format_pos = np.array(
+            [WORK_MODES.index(v) if isinstance(v, str) and v in WORK_MODES else unknown for v in format_values]
+            + [unknown]
+        )[format_codes]
+        conditions.append(format_pos != unknown)
+        choices.append(format_pos)
+    for flag_col, mode in [("is_remote", "remote"), ("is_hybrid", "hybrid")]:
+        if flag_col in df:
+            conditions.append(_true_flag_mask(df[flag_col]))
+            choices.append(WORK_MODES.index(mode))
+    codes = np.select(conditions, choices, default=unknown) if conditions else np.full(len(df), unknown)
+    df["work_mode"] = labels[codes]
     return df
 
 
 def add_experience_flags(df: pd.DataFrame) -> pd.DataFrame:
     """Mark junior-friendly vacancies and their complement (battle experience)."""
 
-    df = df.copy()
+    df = derived_frame(df)
     junior_flags = [
         df[col].fillna(False)
         for col in ["is_for_juniors", "allows_students", "exp_is_no_experience"]
@@ -229,6 +280,26 @@ def add_experience_flags(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def _all_boolean(df: pd.DataFrame, cols: List[str]) -> bool:
+    return all(df[col].dtype == bool or isinstance(df[col].dtype, pd.BooleanDtype) for col in cols)
+
+
+def _row_sum(df: pd.DataFrame, cols: List[str]) -> pd.Series:
+    """``df[cols].sum(axis=1)`` accumulated column by column.
+
+    Boolean flags are added into one integer array instead of first being
+    gathered into a rows x columns block; other dtypes use pandas as is.
+    """
+
+    if not _all_boolean(df, cols):
+        return df[cols].sum(axis=1)
+    total = np.zeros(len(df), dtype=np.int64)
+    for col in cols:
+        total += df[col].to_numpy(dtype=np.int64, na_value=0)
+    nullable = any(isinstance(df[col].dtype, pd.BooleanDtype) for col in cols)
+    return pd.Series(total, index=df.index, dtype="Int64" if nullable else np.int64)
+
+
 def add_boolean_counts(df: pd.DataFrame, groups: Dict[str, List[str]] | None = None) -> pd.DataFrame:
     """Aggregate boolean prefix groups into compact counters."""
     if groups is None:
@@ -245,18 +316,20 @@ def add_boolean_counts(df: pd.DataFrame, groups: Dict[str, List[str]] | None = N
     for prefix, target_col in mapping.items():
         cols = groups.get(prefix, [])
         if cols:
-            df[target_col] = df[cols].sum(axis=1)
+            df[target_col] = _row_sum(df, cols)
     return df
 
 
 def add_stack_aggregates(df: pd.DataFrame) -> pd.DataFrame:
     """Aggregate core data, ML stack, and overall tech stack sizes."""
 
-    df = df.copy()
+    df = derived_frame(df)
 
     def _count_true(columns: List[str]) -> pd.Series:
         if not columns:
             return pd.Series(0, index=df.index)
+        if _all_boolean(df, columns):
+            return _row_sum(df, columns).astype(int)
         return (
             df[columns]
             .fillna(False)
@@ -284,46 +357,125 @@ def add_skill_stack_counts(df: pd.DataFrame, groups: Dict[str, List[str]] | None
 def add_primary_role(df: pd.DataFrame, role_prefix: str = "role_") -> pd.DataFrame:
     """Collapse multiple role flags into a single prioritized primary role."""
     role_cols = [col for col in df.columns if col.startswith(role_prefix)]
-    df = df.copy()
-    primary_role = []
-    for _, row in df[role_cols].iterrows():
-        chosen = "other"
-        for col in PRIMARY_ROLE_PRIORITY:
-            if col in row and row[col]:
-                chosen = col.replace(role_prefix, "")
-                break
-        primary_role.append(chosen)
-    df["primary_role"] = pd.Categorical(primary_role)
+    ordered = [col for col in PRIMARY_ROLE_PRIORITY if col in role_cols]
+    df = derived_frame(df)
+    labels = np.array([col.replace(role_prefix, "") for col in ordered] + ["other"], dtype=object)
+    if ordered:
+        # first True column in priority order wins; rows without any role fall through to "other"
+        flags = np.column_stack([df[col].to_numpy(dtype=bool, na_value=False) for col in ordered])
+        codes = np.where(flags.any(axis=1), flags.argmax(axis=1), len(ordered))
+    else:
+        codes = np.full(len(df), len(ordered))
+    used = np.unique(codes)
+    order = np.argsort(labels[used])
+    remap = np.empty(len(labels), dtype=np.int64)
+    remap[used[order]] = np.arange(len(used))
+    df["primary_role"] = pd.Categorical.from_codes(remap[codes], categories=pd.Index(list(labels[used][order])))
     return df
 
 
+def salary_bucket_edges(salary: pd.Series | KLLSketch, n_bins: int, method: str = "exact") -> np.ndarray:
+    """Return inner quantile boundaries for ``n_bins`` salary buckets.
+
+    The outer edges are open (``-inf``/``inf``) so that the boundaries can be
+    reused for rows outside the range they were estimated on. ``method`` is
+    ``"exact"`` (``Series.quantile``) or ``"sketch"`` (KLL sketch estimate);
+    an already built (e.g. merged) sketch can be passed instead of salaries.
+    """
+
+    probs = np.linspace(0, 1, n_bins + 1)
+    if isinstance(salary, KLLSketch):
+        edges = salary.quantiles(probs)
+    elif method == "sketch":
+        edges = sketch_series(salary).quantiles(probs)
+    elif method == "exact":
+        edges = salary.dropna().quantile(probs).to_numpy(dtype="float64", copy=True)
+    else:
+        raise ValueError(f"unknown quantile method: {method}")
+    edges[0], edges[-1] = -np.inf, np.inf
+    return edges
+
+
 def add_salary_bucket(
-    df: pd.DataFrame, salary_col: str = "salary_mid_rub_capped", labels: List[str] | None = None
+    df: pd.DataFrame,
+    salary_col: str = "salary_mid_rub_capped",
+    labels: List[str] | None = None,
+    method: str = "exact",
+    bins: Iterable[float] | None = None,
 ) -> pd.DataFrame:
-    """Create quantile-based salary buckets for downstream analysis."""
+    """Create quantile-based salary buckets for downstream analysis.
+
+    By default buckets come from an exact ``qcut``. With ``method="sketch"``
+    the boundaries are estimated from a KLL sketch, and precomputed ``bins``
+    (e.g. from ``salary_bucket_edges`` on a merged sketch) are applied as is.
+    """
     if labels is None:
         labels = ["low", "mid", "high"]
 
-    df = df.copy()
+    df = derived_frame(df)
     if salary_col not in df.columns:
         df[salary_col] = np.nan
 
     valid = df[salary_col].dropna()
-    if len(valid) >= len(labels):
-        df.loc[valid.index, "salary_bucket"] = pd.qcut(valid, q=len(labels), labels=labels, duplicates="drop")
+    if bins is None and method != "exact" and len(valid) >= len(labels):
+        bins = salary_bucket_edges(valid, len(labels), method=method)
+    if bins is not None:
+        bins = list(bins)
+        df["salary_bucket"] = pd.cut(
+            df[salary_col], bins=bins, labels=labels, include_lowest=True, duplicates="drop"
+        )
+    elif len(valid) >= len(labels):
+        buckets, bins = pd.qcut(valid, q=len(labels), labels=labels, duplicates="drop", retbins=True)
+        df.loc[valid.index, "salary_bucket"] = buckets
     else:
         df["salary_bucket"] = np.nan
+    # inner boundaries, reused by update_features for newly scraped rows
+    df.attrs["salary_bucket_edges"] = [float(edge) for edge in bins[1:-1]] if bins is not None else None
     return df
 
 
+# everything str.split() splits on (the code points where str.isspace() is
+# true), as an RE2 character class; tests/test_features.py checks the list
+_WHITESPACE_CLASS = (
+    r"\x{9}-\x{d}\x{1c}-\x{20}\x{85}\x{a0}\x{1680}\x{2000}-\x{200a}"
+    r"\x{2028}\x{2029}\x{202f}\x{205f}\x{3000}"
+)
+_WORD_PATTERN = f"[^{_WHITESPACE_CLASS}]+"
+
+
+def _text_counts(text: pd.Series) -> Tuple[pd.Series, pd.Series] | None:
+    """Characters and whitespace-separated words per value; missing values count as empty.
+
+    The same numbers as ``str.len()`` and ``str.split().str.len()`` on
+    ``text.fillna("")``, but computed by Arrow kernels (``utf8_length`` and a
+    regex match count) without building a list of tokens per row. Returns
+    ``None`` if ``text`` holds values other than strings.
+    """
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    try:
+        values = pa.array(text, type=pa.large_string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, UnicodeEncodeError):
+        return None
+    chars = pc.fill_null(pc.utf8_length(values), 0)
+    words = pc.fill_null(pc.count_substring_regex(values, _WORD_PATTERN), 0)
+    return tuple(
+        pd.Series(counts.to_numpy(zero_copy_only=False).astype(np.int64), index=text.index) for counts in (chars, words)
+    )
+
+
 def add_structured_text_features(df: pd.DataFrame) -> pd.DataFrame:
     """Add targeted text features focused on the main description field."""
 
-    df = df.copy()
+    df = derived_frame(df)
     if "description" in df.columns:
-        desc = df["description"].fillna("")
-        df["description_len_chars"] = desc.str.len()
-        df["description_len_words"] = desc.str.split().str.len()
+        counts = _text_counts(df["description"])
+        if counts is None:
+            desc = df["description"].fillna("")
+            counts = desc.str.len(), desc.str.split().str.len()
+        df["description_len_chars"], df["description_len_words"] = counts
 
     for col, target in [
         ("requirements", "requirements_count"),
@@ -332,7 +484,8 @@ def add_structured_text_features(df: pd.DataFrame) -> pd.DataFrame:
         ("optional_skills", "optional_skills_count"),
     ]:
         if col in df.columns:
-            df[target] = df[col].fillna("").str.split().str.len()
+            counts = _text_counts(df[col])
+            df[target] = df[col].fillna("").str.split().str.len() if counts is None else counts[1]
     return df
 
 
@@ -341,31 +494,52 @@ def compute_skill_premium(
     skill_cols: Iterable[str],
     salary_col: str = "salary_mid_rub_capped",
     min_count: int = 30,
+    skill_matrix: SkillMatrix | None = None,
+    n_boot: int = premium.DEFAULT_N_BOOT,
+    ci: float = premium.DEFAULT_CI,
+    seed: int | None = 0,
 ) -> pd.DataFrame:
-    """Estimate salary premium for skills vs salary column."""
-    records = []
-    for col in skill_cols:
-        if col not in df.columns:
-            continue
-        has_skill = df[col].fillna(False).astype(bool)
-        count_with_skill = int(has_skill.sum())
-        if count_with_skill < min_count:
-            continue
-        median_with = df.loc[has_skill, salary_col].median()
-        median_without = df.loc[~has_skill, salary_col].median()
-        premium_abs = median_with - median_without
-        premium_pct = premium_abs / median_without if median_without else np.nan
-        records.append(
-            {
-                "skill": col,
-                "median_with": median_with,
-                "median_without": median_without,
-                "premium_abs": premium_abs,
-                "premium_pct": premium_pct,
-                "count_with_skill": count_with_skill,
-            }
-        )
-    return pd.DataFrame(records).sort_values(by="premium_pct", ascending=False)
+    """Estimate salary premium for skills vs salary column.
+
+    Medians of all skills come from one sorted salary array, and
+    ``premium_abs_ci_*`` / ``premium_pct_ci_*`` hold bootstrap percentile
+    intervals (``n_boot=0`` drops them); see :mod:`skillra_pda.premium`.
+    ``skill_matrix`` may hold the flags of ``df`` packed beforehand so that
+    several analyses of one frame convert them only once.
+    """
+    columns = [col for col in skill_cols if col in df.columns]
+    matrix = SkillMatrix.for_frame(df, columns, skill_matrix)
+    table = premium.skill_premium(df[salary_col], matrix, min_count=min_count, n_boot=n_boot, ci=ci, seed=seed)
+    return table.sort_values(by="premium_pct", ascending=False)
+
+
+def compute_stratified_skill_premium(
+    df: pd.DataFrame,
+    skill_cols: Iterable[str],
+    strata: Sequence[str] = ("primary_role", "grade_final", "city_tier"),
+    salary_col: str = "salary_mid_rub_capped",
+    min_count: int = 30,
+    min_cell_count: int = 5,
+    skill_matrix: SkillMatrix | None = None,
+) -> pd.DataFrame:
+    """Estimate skill premiums within role × grade × city segments.
+
+    The raw premium of ``compute_skill_premium`` also reflects where a skill
+    is asked for (e.g. senior Moscow roles). Here medians with and without
+    the skill are compared inside every ``strata`` cell and cell premiums
+    are averaged, weighted by the vacancies with the skill; see
+    ``premium.stratified_skill_premium``.
+    """
+    missing = [col for col in [*strata, salary_col] if col not in df.columns]
+    if missing:
+        raise ValueError(f"expected columns {missing} for compute_stratified_skill_premium")
+    columns = [col for col in skill_cols if col in df.columns]
+    matrix = SkillMatrix.for_frame(df, columns, skill_matrix)
+    cells = df.groupby(list(strata), observed=True, sort=False).ngroup().fillna(-1).to_numpy(dtype=np.int64)
+    table = premium.stratified_skill_premium(
+        df[salary_col], matrix, cells, min_count=min_count, min_cell_count=min_cell_count
+    )
+    return table.sort_values(by="premium_pct", ascending=False)
 
 
 def ensure_expected_feature_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -395,21 +569,423 @@ def ensure_expected_feature_columns(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def assemble_features(df: pd.DataFrame) -> pd.DataFrame:
-    """Convenience pipeline for feature dataframe."""
-    grouped = detect_column_groups(df)
-    df = add_time_features(df)
-    df = add_city_tier(df)
-    df = add_work_mode(df)
-    df = add_boolean_counts(df, groups=grouped)
-    df = add_stack_aggregates(df)
-    df = add_experience_flags(df)
-    df = add_grade_from_experience(df)
+def add_grade_final(df: pd.DataFrame) -> pd.DataFrame:
+    """Take the grade from the vacancy where known, the experience-based one otherwise."""
     if "grade" in df.columns:
         df["grade_final"] = df["grade"].where(df["grade"] != "unknown", df["grade_from_experience"])
     else:
         df["grade_final"] = df["grade_from_experience"]
-    df = add_primary_role(df)
-    df = add_salary_bucket(df)
-    df = add_structured_text_features(df)
-    return ensure_expected_feature_columns(df)
+    return df
+
+
+def _add_boolean_counts_step(df: pd.DataFrame) -> pd.DataFrame:
+    # counters already stored on df (e.g. role_count) share the prefixes they count
+    groups = {
+        prefix: [col for col in cols if col not in _STEPS_BY_OUTPUT]
+        for prefix, cols in detect_column_groups(df).items()
+    }
+    return add_boolean_counts(df, groups=groups)
+
+
+@dataclass(frozen=True)
+class FeatureStep:
+    """One registered feature builder: ``func(df)`` reads ``inputs`` and adds ``outputs``.
+
+    ``inputs`` are column names or prefixes ending in ``*`` (``"role_*"``);
+    a prefix never matches a column registered as another step's output.
+    ``options`` name keyword arguments of ``func`` that :func:`compute`
+    forwards. A ``row_local`` step computes every row from that row alone,
+    so it can run on row partitions (see ``parallel_features``).
+    """
+
+    name: str
+    func: Callable[..., pd.DataFrame]
+    inputs: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+    options: Tuple[str, ...] = ()
+    row_local: bool = True
+
+    def upstream(self) -> List["FeatureStep"]:
+        """Registered steps whose outputs this step reads."""
+
+        return [_STEPS_BY_OUTPUT[col] for col in self.inputs if col in _STEPS_BY_OUTPUT]
+
+    def input_columns(self, columns: Iterable[str]) -> List[str]:
+        """Columns among ``columns`` that this step reads, with prefixes expanded."""
+
+        columns = list(columns)
+        found: List[str] = []
+        for pattern in self.inputs:
+            if pattern.endswith("*"):
+                found += [
+                    col for col in columns if col.startswith(pattern[:-1]) and col not in _STEPS_BY_OUTPUT
+                ]
+            elif pattern in columns:
+                found.append(pattern)
+        return found
+
+    def run(self, df: pd.DataFrame, options: Dict[str, object] | None = None) -> pd.DataFrame:
+        """Apply ``func`` to ``df`` with the entries of ``options`` it accepts."""
+
+        options = options or {}
+        return self.func(df, **{key: options[key] for key in self.options if key in options})
+
+
+# Registered feature steps in dependency order: a step only reads outputs of
+# the steps above it. assemble_features runs all of them in this order.
+FEATURE_STEPS: List[FeatureStep] = [
+    FeatureStep(
+        "time_features",
+        add_time_features,
+        inputs=("published_at_iso", "scraped_at_utc"),
+        outputs=("published_weekday", "published_month", "is_weekend_post", "vacancy_age_days"),
+    ),
+    FeatureStep("city_tier", add_city_tier, inputs=("city",), outputs=("city_tier",)),
+    FeatureStep("work_mode", add_work_mode, inputs=("work_format", "is_remote", "is_hybrid"), outputs=("work_mode",)),
+    FeatureStep(
+        "boolean_counts",
+        _add_boolean_counts_step,
+        inputs=("benefit_*", "soft_*", "has_*", "skill_*", "role_*"),
+        outputs=("benefits_count", "soft_skills_count", "hard_stack_count", "skills_count", "role_count"),
+    ),
+    FeatureStep(
+        "stack_aggregates",
+        add_stack_aggregates,
+        inputs=("has_*", "skill_*"),
+        outputs=("core_data_skills_count", "ml_stack_count", "tech_stack_size"),
+    ),
+    FeatureStep(
+        "experience_flags",
+        add_experience_flags,
+        inputs=("is_for_juniors", "allows_students", "exp_is_no_experience"),
+        outputs=("is_junior_friendly", "battle_experience"),
+    ),
+    FeatureStep(
+        "grade_from_experience",
+        add_grade_from_experience,
+        inputs=("exp_min_years", "exp_max_years", "experience", "exp_is_no_experience"),
+        outputs=("grade_from_experience",),
+    ),
+    FeatureStep("grade_final", add_grade_final, inputs=("grade", "grade_from_experience"), outputs=("grade_final",)),
+    FeatureStep("primary_role", add_primary_role, inputs=("role_*",), outputs=("primary_role",)),
+    FeatureStep(
+        "salary_bucket",
+        add_salary_bucket,
+        inputs=("salary_mid_rub_capped",),
+        outputs=("salary_bucket",),
+        options=("bins",),
+        row_local=False,
+    ),
+    FeatureStep(
+        "text_features",
+        add_structured_text_features,
+        inputs=("description", "requirements", "responsibilities", "must_have_skills", "optional_skills"),
+        outputs=(
+            "description_len_chars",
+            "description_len_words",
+            "requirements_count",
+            "responsibilities_count",
+            "must_have_skills_count",
+            "optional_skills_count",
+        ),
+    ),
+]
+
+_STEPS_BY_NAME = {step.name: step for step in FEATURE_STEPS}
+_STEPS_BY_OUTPUT = {col: step for step in FEATURE_STEPS for col in step.outputs}
+
+# Columns written by assemble_features. Some (e.g. skills_count, tech_stack_size)
+# also exist in the raw export and are overwritten.
+DERIVED_FEATURE_COLUMNS = [col for step in FEATURE_STEPS for col in step.outputs]
+
+# df.attrs key of the input fingerprints recorded by compute
+FINGERPRINT_ATTR = "feature_fingerprints"
+
+
+def _resolve(features: Iterable[str] | str | None) -> List[FeatureStep]:
+    """Steps producing ``features`` plus the steps they read from, in registry order."""
+
+    if features is None:
+        return list(FEATURE_STEPS)
+    if isinstance(features, str):
+        features = [features]
+    pending = []
+    for feature in features:
+        step = _STEPS_BY_NAME.get(feature) or _STEPS_BY_OUTPUT.get(feature)
+        if step is None:
+            raise KeyError(f"unknown feature: {feature}")
+        pending.append(step)
+    needed = set()
+    while pending:
+        step = pending.pop()
+        if step.name not in needed:
+            needed.add(step.name)
+            pending.extend(step.upstream())
+    return [step for step in FEATURE_STEPS if step.name in needed]
+
+
+def _column_digest(series: pd.Series) -> bytes:
+    """Content hash of one column.
+
+    NumPy-backed columns are hashed as raw bytes and everything else through
+    its Arrow buffers, which avoids hashing long strings value by value.
+    """
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        digest = hashlib.sha256(series.cat.codes.to_numpy().view(np.uint8))
+        digest.update(_column_digest(pd.Series(series.cat.categories)))
+        return digest.digest()
+    if isinstance(series.dtype, np.dtype) and series.dtype != object:
+        return hashlib.sha256(np.ascontiguousarray(series.to_numpy()).view(np.uint8)).digest()
+
+    import pyarrow as pa
+
+    try:
+        values = pa.array(series, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):  # mixed-type object column
+        hashed = pd.util.hash_pandas_object(series, index=False).to_numpy()
+        return hashlib.sha256(hashed.view(np.uint8)).digest()
+    digest = hashlib.sha256(str(values.type).encode())
+    for chunk in values.chunks if isinstance(values, pa.ChunkedArray) else [values]:
+        digest.update(f"{chunk.offset}:{len(chunk)}".encode())
+        for buffer in chunk.buffers():
+            if buffer is not None:
+                digest.update(buffer)
+    return digest.digest()
+
+
+def _fingerprint(df: pd.DataFrame, step: FeatureStep, options: Dict[str, object], source: str) -> str:
+    """Hash of the step's input columns, options and of this module's source."""
+
+    digest = hashlib.sha256(f"{source}:{step.name}".encode())
+    for col in step.input_columns(df.columns):
+        digest.update(col.encode())
+        digest.update(_column_digest(df[col]))
+    for key in step.options:
+        digest.update(f"{key}={options.get(key)!r}".encode())
+    return digest.hexdigest()[:16]
+
+
+def _check_options(options: Dict[str, object]) -> None:
+    known = {key for step in FEATURE_STEPS for key in step.options}
+    unknown = sorted(set(options) - known)
+    if unknown:
+        raise ValueError(f"unknown feature options: {unknown}")
+
+
+def stale_features(df: pd.DataFrame, features: Iterable[str] | str | None = None, **options: object) -> List[str]:
+    """Names of the steps :func:`compute` would rerun for ``features``.
+
+    A step is stale when it has no fingerprint in ``df.attrs`` (never
+    computed, or ``df`` came from elsewhere), when a column it wrote is gone,
+    when its input columns, options or this module's source changed since it
+    ran, or when a step it reads from is stale. Inputs are compared by
+    content and storage, so equal values stored differently (e.g. after a
+    Parquet round trip) count as changed.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Frame returned by :func:`compute`, possibly edited since.
+    features : Iterable[str] or str, optional
+        Feature columns or step names as in :func:`compute`; all steps by default.
+    **options
+        Step options as in :func:`compute`.
+
+    Returns
+    -------
+    List[str]
+        Step names in registry order.
+    """
+
+    _check_options(options)
+    recorded = df.attrs.get(FINGERPRINT_ATTR, {})
+    source = features_source_hash()
+    stale: List[str] = []
+    for step in _resolve(features):
+        entry = recorded.get(step.name)
+        if (
+            entry is None
+            or any(col not in df.columns for col in entry["outputs"])
+            or any(upstream.name in stale for upstream in step.upstream())
+            or entry["fingerprint"] != _fingerprint(df, step, options, source)
+        ):
+            stale.append(step.name)
+    return stale
+
+
+def compute(
+    df: pd.DataFrame, features: Iterable[str] | str | None = None, reuse: bool = True, **options: object
+) -> pd.DataFrame:
+    """Compute the requested features and only the steps they depend on.
+
+    ``compute(df, ["primary_role", "tech_stack_size"])`` runs the
+    ``primary_role`` and ``stack_aggregates`` steps and nothing else. Every
+    step that runs records a fingerprint of its inputs in
+    ``attrs["feature_fingerprints"]``; with ``reuse`` a step whose outputs
+    are still present and whose fingerprint matches is skipped, so after an
+    edit of a few input columns only the affected steps run again (see
+    :func:`stale_features`).
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Clean frame, possibly with features from an earlier ``compute``.
+        Left unchanged.
+    features : Iterable[str] or str, optional
+        Feature columns (``DERIVED_FEATURE_COLUMNS``) or step names
+        (``FEATURE_STEPS``); all steps by default.
+    reuse : bool, optional
+        Skip up-to-date steps; ``False`` reruns every requested step.
+    **options
+        Step options, e.g. ``bins`` for the ``salary_bucket`` step.
+
+    Returns
+    -------
+    pandas.DataFrame
+        ``df`` with the feature columns added; ``attrs["feature_report"]``
+        lists the ``computed`` and ``reused`` steps.
+    """
+
+    _check_options(options)
+    steps = _resolve(features)
+    df = derived_frame(df)
+    recorded = dict(df.attrs.get(FINGERPRINT_ATTR, {}))
+    source = features_source_hash()
+    report: Dict[str, List[str]] = {"computed": [], "reused": []}
+    for step in steps:
+        entry = recorded.get(step.name)
+        if (
+            reuse
+            and entry is not None
+            and all(col in df.columns for col in entry["outputs"])
+            and entry["fingerprint"] == _fingerprint(df, step, options, source)
+        ):
+            report["reused"].append(step.name)
+            continue
+        df = step.run(df, options)
+        # taken after the step: add_salary_bucket creates a missing salary column
+        recorded[step.name] = {
+            "fingerprint": _fingerprint(df, step, options, source),
+            "outputs": [col for col in step.outputs if col in df.columns],
+        }
+        report["computed"].append(step.name)
+    df.attrs[FINGERPRINT_ATTR] = recorded
+    df.attrs["feature_report"] = report
+    return df
+
+
+def assemble_features(df: pd.DataFrame, salary_bins: Iterable[float] | None = None) -> pd.DataFrame:
+    """Convenience pipeline for feature dataframe.
+
+    Runs every step of ``FEATURE_STEPS`` (see :func:`compute`) and backfills
+    missing columns. The input frame is left unchanged. Under copy-on-write
+    the result shares the input's columns, so peak memory is about one frame
+    plus the new feature columns. ``salary_bins`` are passed to
+    ``add_salary_bucket`` instead of estimating quantiles on ``df``.
+    """
+    df = compute(df, reuse=False, bins=salary_bins)
+    df = ensure_expected_feature_columns(df)
+    df.attrs["features_source"] = features_source_hash()
+    return df
+
+
+def features_source_hash() -> str:
+    """Fingerprint of this module, stored with computed features to detect stale stores."""
+
+    return hashlib.sha256(inspect.getsource(sys.modules[__name__]).encode()).hexdigest()[:16]
+
+
+def _salary_edge_shift(old: Sequence[float], new: Sequence[float]) -> float:
+    """Largest relative move of the inner salary bucket boundaries."""
+
+    old_edges, new_edges = np.asarray(old, dtype=float), np.asarray(new, dtype=float)
+    if old_edges.shape != new_edges.shape:
+        return np.inf
+    if not len(old_edges):
+        return 0.0
+    return float(np.max(np.abs(new_edges - old_edges) / np.maximum(np.abs(old_edges), 1.0)))
+
+
+def update_features(
+    df: pd.DataFrame,
+    existing: pd.DataFrame | None,
+    id_col: str = "vacancy_id",
+    salary_col: str = "salary_mid_rub_capped",
+    tolerance: float = SALARY_EDGE_TOLERANCE,
+) -> pd.DataFrame:
+    """Incrementally extend a feature table with newly scraped vacancies.
+
+    Row-local features (time, city tier, work mode, counts, grade, primary
+    role, text stats) are computed only for rows of ``df`` whose ``id_col`` is
+    missing from ``existing``; for the other rows the stored feature columns
+    are joined to the current clean columns, so a re-scraped vacancy keeps its
+    stored features. Salary bucket boundaries are re-estimated on the salaries
+    of ``df``; the stored boundaries are kept unless one of them moved by more
+    than ``tolerance`` (relative), and the buckets of all rows are then
+    reassigned with the chosen boundaries. A store written by a different
+    version of this module, or without ``id_col``, is ignored and everything
+    is recomputed.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Full clean dataset.
+    existing : pd.DataFrame or None
+        Previously computed features, e.g. ``io.load_processed`` of the
+        feature store.
+
+    Returns
+    -------
+    pd.DataFrame
+        Features for every row of ``df`` in the same order, with
+        ``attrs["incremental_report"]`` describing what was recomputed.
+    """
+
+    n_bins = 3
+    salaries = pd.to_numeric(df[salary_col], errors="coerce").dropna() if salary_col in df.columns else []
+    if (
+        existing is None
+        or id_col not in existing.columns
+        or existing.attrs.get("features_source") != features_source_hash()
+        or len(salaries) < n_bins
+    ):
+        result = assemble_features(df)
+        result.attrs["incremental_report"] = {"new_rows": len(df), "reused_rows": 0, "rebucketed": True}
+        return result
+    if df[id_col].duplicated().any() or existing[id_col].duplicated().any():
+        raise ValueError(f"update_features: {id_col} must be unique")
+
+    new_edges = list(salary_bucket_edges(salaries, n_bins)[1:-1])
+    old_edges = existing.attrs.get("salary_bucket_edges")
+    shift = np.inf if old_edges is None else _salary_edge_shift(old_edges, new_edges)
+    rebucket = shift > tolerance
+    edges = new_edges if rebucket else list(old_edges)
+    bins = [-np.inf, *edges, np.inf]
+
+    known = df[id_col].isin(existing[id_col]).to_numpy()
+    computed = assemble_features(df[~known], salary_bins=bins)
+    derived = [col for col in computed.columns if col in DERIVED_FEATURE_COLUMNS and col != "salary_bucket"]
+    missing = [col for col in derived if col not in existing.columns]
+    if missing:
+        raise KeyError(f"update_features: stored features lack columns {missing}")
+    reused = df[known].drop(columns=derived, errors="ignore").merge(
+        existing[[id_col, *derived]], on=id_col, how="left"
+    )
+
+    result = pd.concat([reused, computed.drop(columns="salary_bucket")], ignore_index=True)
+    result = result.iloc[pd.Index(result[id_col]).get_indexer(df[id_col])]
+    result.index = df.index
+    result = add_salary_bucket(result, salary_col=salary_col, bins=bins)[list(computed.columns)]
+
+    result.attrs = {
+        "features_source": features_source_hash(),
+        "salary_bucket_edges": [float(edge) for edge in edges],
+        "incremental_report": {
+            "new_rows": int((~known).sum()),
+            "reused_rows": int(known.sum()),
+            "salary_edge_shift": shift,
+            "rebucketed": bool(rebucket),
+        },
+    }
+    return result
@@ -0,0 +1,158 @@
+"""Persistent vacancy-id index for deduplication across daily snapshots.
+
+``cleaning.deduplicate`` only sees one in-memory frame. ``VacancyIndex`` keeps
+the latest ``scraped_at_utc`` per ``vacancy_id`` in a SQLite table keyed by the
+id, so a new batch is deduplicated against the whole history with one indexed
+lookup per batch row instead of reloading previous snapshots.
+"""
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, Union
+
+import numpy as np
+import pandas as pd
+
+from .cleaning import deduplicate, to_utc_naive
+
+PathLike = Union[str, Path]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vacancy_latest (
+    vacancy_id TEXT PRIMARY KEY,
+    scraped_at INTEGER
+) WITHOUT ROWID
+"""
+
+
+def _normalize_ids(ids: pd.Series) -> list:
+    """Render ids as stable text keys (``123`` and ``123.0`` map to ``"123"``)."""
+
+    ids = pd.Series(ids)
+    if pd.api.types.is_float_dtype(ids):
+        ids = ids.astype("Int64")
+    return ids.astype("string").astype(object).where(ids.notna(), None).tolist()
+
+
+def _to_epoch_ns(values: pd.Series) -> pd.arrays.IntegerArray:
+    """Convert timestamps to nullable int64 nanoseconds since the epoch."""
+
+    scraped = to_utc_naive(pd.Series(values))
+    ns = scraped.astype("datetime64[ns]").to_numpy().view("int64")
+    return pd.arrays.IntegerArray(ns.copy(), scraped.isna().to_numpy())
+
+
+class VacancyIndex:
+    """SQLite-backed map ``vacancy_id -> latest scraped_at_utc``.
+
+    Parameters
+    ----------
+    path : PathLike
+        Database file. Parent directories are created automatically; use
+        ``":memory:"`` for a throwaway index.
+    """
+
+    def __init__(self, path: PathLike) -> None:
+        self.path = path
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def __enter__(self) -> "VacancyIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __len__(self) -> int:
+        return int(self._conn.execute("SELECT COUNT(*) FROM vacancy_latest").fetchone()[0])
+
+    def _lookup(self, keys: list) -> Dict[str, int | None]:
+        """Return ``{key: scraped_at_ns}`` for indexed keys only."""
+
+        self._conn.execute("DROP TABLE IF EXISTS temp.batch_ids")
+        self._conn.execute("CREATE TEMP TABLE batch_ids (vacancy_id TEXT PRIMARY KEY)")
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO temp.batch_ids VALUES (?)", ((key,) for key in keys if key is not None)
+        )
+        rows = self._conn.execute(
+            "SELECT v.vacancy_id, v.scraped_at FROM temp.batch_ids b "
+            "JOIN vacancy_latest v ON v.vacancy_id = b.vacancy_id"
+        ).fetchall()
+        return dict(rows)
+
+    def latest(self, ids: pd.Series) -> pd.Series:
+        """Return stored latest scrape timestamps for ``ids`` (NaT when unknown)."""
+
+        keys = _normalize_ids(ids)
+        stored = self._lookup(keys)
+        values = pd.array([stored.get(key) for key in keys], dtype="Int64")
+        return pd.Series(pd.to_datetime(values, unit="ns"), index=pd.Index(keys, name="vacancy_id"))
+
+    def update(self, df: pd.DataFrame, id_col: str = "vacancy_id", ts_col: str = "scraped_at_utc") -> None:
+        """Record batch rows, keeping the newest timestamp per id."""
+
+        keys = _normalize_ids(df[id_col])
+        if ts_col in df.columns:
+            scraped_ns = [None if pd.isna(v) else int(v) for v in _to_epoch_ns(df[ts_col])]
+        else:
+            scraped_ns = [None] * len(keys)
+        self._conn.executemany(
+            "INSERT INTO vacancy_latest (vacancy_id, scraped_at) VALUES (?, ?) "
+            "ON CONFLICT(vacancy_id) DO UPDATE SET scraped_at = excluded.scraped_at "
+            "WHERE vacancy_latest.scraped_at IS NULL OR excluded.scraped_at > vacancy_latest.scraped_at",
+            ((key, ts) for key, ts in zip(keys, scraped_ns) if key is not None),
+        )
+        self._conn.commit()
+
+
+def deduplicate_against_index(
+    df: pd.DataFrame,
+    index: VacancyIndex,
+    id_col: str = "vacancy_id",
+    update: bool = True,
+) -> pd.DataFrame:
+    """Deduplicate a batch against itself and against all indexed history.
+
+    Within the batch the latest scrape per id is kept (``cleaning.deduplicate``
+    semantics). A remaining row survives only if its id is new or its
+    ``scraped_at_utc`` is strictly newer than the indexed one, so re-ingesting
+    an old snapshot yields no rows. With ``update=True`` the surviving rows
+    are recorded in the index.
+
+    Rows dropped against history are counted in ``attrs["history_duplicate_rows"]``.
+    """
+
+    if id_col not in df.columns:
+        return df
+
+    batch = deduplicate(df, id_col=id_col)
+    within_batch = int(batch.attrs.get("deduplicated_rows", 0))
+    keys = _normalize_ids(batch[id_col])
+    stored = index._lookup(keys)
+
+    known = np.fromiter((key in stored for key in keys), dtype=bool, count=len(keys))
+    stored_ns = pd.array([stored.get(key) for key in keys], dtype="Int64")
+    if "scraped_at_utc" in batch.columns:
+        batch_ns = _to_epoch_ns(batch["scraped_at_utc"])
+    else:
+        batch_ns = pd.array([None] * len(keys), dtype="Int64")
+
+    newer = (batch_ns > stored_ns).fillna(False) | (~batch_ns.isna() & stored_ns.isna())
+    keep = ~known | np.asarray(newer, dtype=bool)
+
+    result = batch[keep]
+    if update:
+        index.update(result, id_col=id_col)
+    result.attrs["deduplicated_rows"] = within_batch
+    result.attrs["history_duplicate_rows"] = int((~keep).sum())
+    return result
+
+
+__all__ = ["VacancyIndex", "deduplicate_against_index"]
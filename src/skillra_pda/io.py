@@ -1,34 +1,113 @@
 """Input/output helpers for the Skillra PDA project."""
+from __future__ import annotations
+
+import json
 from pathlib import Path
-from typing import Union
+from typing import Any, Dict, List, Sequence, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
-from .cleaning import BOOLEAN_MARKERS, ensure_salary_gross_boolean
+from .cleaning import ColumnProfile, ensure_salary_gross_boolean, profile_column, profile_columns, to_utc_naive
+from .schema import RAW_SCHEMA, arrow_column_types
 
 PathLike = Union[str, Path]
+# pyarrow.dataset expression or pyarrow.parquet DNF filters
+Filters = Union[Any, List[tuple], List[List[tuple]]]
+
+DEFAULT_ROW_GROUP_SIZE = 100_000
+PARTITION_COLS_KEY = b"skillra_partition_cols"
+
+# Strings with at most this share of distinct values become categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
 
+# Group keys that save_processed/load_processed leave as text. grade_final is
+# built with Series.where from grade and grade_from_experience (a categorical
+# rejects values outside its categories), and the eda/market summaries group
+# by pairs of these keys, where categoricals would add unobserved combinations.
+TEXT_KEY_COLUMNS = ["grade", "grade_from_experience", "grade_final", "city", "city_tier", "work_mode"]
 
-def load_raw(path: PathLike) -> pd.DataFrame:
-    """Load the raw CSV dataset with safe defaults.
+# Wide free-text fields kept out of the analytic table
+TEXT_COLUMNS = [
+    "title",
+    "description",
+    "skills",
+    "address",
+    "metro_primary",
+    "schedule",
+    "work_format_raw",
+    "published_at_raw",
+    "vacancy_code",
+    "vacancy_url",
+    "employer_url",
+]
+
+
+def load_raw(
+    path: PathLike,
+    schema: Dict[str, str] | None = RAW_SCHEMA,
+    use_threads: bool = True,
+) -> pd.DataFrame:
+    """Load the raw CSV dataset with declared column types.
 
     Parameters
     ----------
     path : PathLike
         Path to the raw CSV file.
+    schema : Dict[str, str] | None, optional
+        Logical column types (see ``schema.RAW_SCHEMA``) applied by the pyarrow
+        CSV reader, so booleans load as ``boolean``, enumerations as
+        ``category`` and counters as integers. Columns missing from the schema
+        are inferred. ``None`` falls back to ``pd.read_csv`` type inference.
+    use_threads : bool, optional
+        Parse the file in multiple threads.
 
     Returns
     -------
     pd.DataFrame
     """
     csv_path = Path(path)
-    return pd.read_csv(csv_path, low_memory=False)
+    if schema is None:
+        return pd.read_csv(csv_path, low_memory=False)
+
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
 
+    convert_options = pacsv.ConvertOptions(
+        column_types=arrow_column_types(schema),
+        strings_can_be_null=True,
+        true_values=["True", "true", "TRUE", "1"],
+        false_values=["False", "false", "FALSE", "0"],
+    )
+    try:
+        table = pacsv.read_csv(
+            csv_path,
+            read_options=pacsv.ReadOptions(use_threads=use_threads),
+            parse_options=pacsv.ParseOptions(newlines_in_values=True),
+            convert_options=convert_options,
+        )
+    except pa.ArrowInvalid as exc:
+        raise ValueError(f"{csv_path} does not match the declared raw schema: {exc}") from exc
 
-def _coerce_boollike_object_columns(df: pd.DataFrame) -> pd.DataFrame:
+    df = table.to_pandas(types_mapper={pa.bool_(): pd.BooleanDtype()}.get)
+    for col, kind in schema.items():
+        if kind == "int" and col in df.columns and df[col].notna().all():
+            values = df[col].to_numpy()
+            if np.array_equal(values, np.trunc(values)):
+                df[col] = values.astype("int64")
+    # keep pandas' names for unnamed columns (e.g. a saved index)
+    df.columns = [name or f"Unnamed: {i}" for i, name in enumerate(df.columns)]
+    return df
+
+
+def _coerce_boollike_object_columns(
+    df: pd.DataFrame, profiles: Dict[str, ColumnProfile] | None = None
+) -> pd.DataFrame:
     """Sanitize nearly-boolean object columns before persistence."""
 
-    allowed = BOOLEAN_MARKERS | {True, False, 0, 1, "true", "false", "yes", "no"}
+    if profiles is None:
+        object_cols = [col for col in df.columns if str(df[col].dtype) == "object"]
+        profiles = profile_columns(df, columns=object_cols)
     replace_map = {
         "true": True,
         "false": False,
@@ -51,9 +130,8 @@ def _coerce_boollike_object_columns(df: pd.DataFrame) -> pd.DataFrame:
         if dtype_str != "object":
             continue
 
-        uniques = set(series.dropna().unique().tolist())
-        normalized = {u.strip().lower() if isinstance(u, str) else u for u in uniques}
-        if normalized and not normalized.issubset(allowed):
+        profile = profiles.get(col) or profile_column(series)
+        if not profile.bool_like:
             continue
 
         def _convert(val: object) -> object:
@@ -74,19 +152,394 @@ def _coerce_boollike_object_columns(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def save_processed(df: pd.DataFrame, path: PathLike) -> None:
+def _is_string_dtype(dtype_str: str) -> bool:
+    return dtype_str in {"object", "str", "string"} or dtype_str.startswith("string")
+
+
+def optimize_dtypes(
+    df: pd.DataFrame,
+    max_unique_ratio: float = CATEGORY_MAX_UNIQUE_RATIO,
+    keep: Sequence[str] | None = None,
+    verbose: bool = False,
+) -> pd.DataFrame:
+    """Shrink a processed dataframe to compact dtypes.
+
+    * nullable ``boolean`` columns without missing values become numpy ``bool``;
+    * integer columns (and float ``*_count`` columns holding whole numbers) are
+      downcast to the smallest integer type, nullable when values are missing;
+    * string columns whose distinct values are at most ``max_unique_ratio`` of
+      the rows become ``category``.
+
+    Columns in ``keep`` and id-like columns (``*_id``) are left untouched.
+    Memory before/after is stored in ``attrs["memory_report"]`` and printed
+    with ``verbose=True``.
+    """
+    keep_cols = set(keep or ())
+    before = int(df.memory_usage(deep=True).sum())
+    result = df.copy(deep=False)
+    converted: Dict[str, Tuple[str, str]] = {}
+
+    for col in result.columns:
+        if col in keep_cols or str(col).endswith("_id"):
+            continue
+        series = result[col]
+        dtype_str = str(series.dtype)
+        new_series = None
+
+        if dtype_str == "boolean":
+            if not series.hasnans:
+                new_series = series.astype(bool)
+        elif pd.api.types.is_integer_dtype(series.dtype):
+            if not series.hasnans:
+                series = series.astype(series.dtype.numpy_dtype) if dtype_str[0] == "I" else series
+            new_series = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series.dtype) and str(col).endswith("_count"):
+            values = series.dropna()
+            if values.eq(values.round()).all():
+                integer_dtype = "Int64" if series.hasnans else "int64"
+                new_series = pd.to_numeric(series.astype(integer_dtype), downcast="integer")
+        elif _is_string_dtype(dtype_str) and len(series):
+            if series.nunique() <= max_unique_ratio * len(series):
+                new_series = series.astype("category")
+
+        if new_series is not None and str(new_series.dtype) != dtype_str:
+            result[col] = new_series
+            converted[col] = (dtype_str, str(new_series.dtype))
+
+    after = int(result.memory_usage(deep=True).sum())
+    # attrs are deep-copied by every pandas operation, so keep the report small
+    result.attrs["memory_report"] = {
+        "before_mb": before / 2**20,
+        "after_mb": after / 2**20,
+        "converted_cols": len(converted),
+    }
+    if verbose:
+        print(
+            f"optimize_dtypes: {before / 2**20:.1f} MB -> {after / 2**20:.1f} MB "
+            f"({len(converted)} columns converted)"
+        )
+    return result
+
+
+def split_text_columns(
+    df: pd.DataFrame,
+    text_columns: Sequence[str] | None = None,
+    id_col: str = "vacancy_id",
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Split a dataframe into a narrow analytic table and a text table.
+
+    Both tables keep ``id_col``; the text table is sorted by it so that id
+    lookups can skip row groups.
+    """
+    text_cols = [col for col in (TEXT_COLUMNS if text_columns is None else text_columns) if col in df.columns]
+    if id_col not in df.columns:
+        raise KeyError(f"expected column {id_col} to key the text table")
+    if df[id_col].duplicated().any():
+        raise ValueError(f"{id_col} must be unique to split text columns")
+    analytic = df.drop(columns=text_cols)
+    text = df[[id_col, *text_cols]].sort_values(id_col)
+    return analytic, text
+
+
+def save_processed(
+    df: pd.DataFrame,
+    path: PathLike,
+    text_path: PathLike | None = None,
+    text_columns: Sequence[str] | None = None,
+    id_col: str = "vacancy_id",
+    optimize: bool = True,
+    keep: Sequence[str] | None = TEXT_KEY_COLUMNS,
+    verbose: bool = False,
+) -> None:
     """Save a processed dataframe to CSV or Parquet.
 
     The parent directory is created automatically. Format is inferred from the
     file suffix: `.parquet` → Parquet, otherwise CSV.
+
+    With ``text_path`` the wide free-text columns (``TEXT_COLUMNS`` by default)
+    go to a separate table keyed by ``id_col`` and ``path`` receives only the
+    narrow analytic columns; ``load_processed(..., text_path=...)`` joins them
+    back on demand.
+
+    With ``optimize=True`` the frame is first shrunk by ``optimize_dtypes``
+    (``verbose`` prints its memory report). Columns in ``keep`` — by default
+    the group keys of ``TEXT_KEY_COLUMNS`` (``grade``, ``grade_from_experience``,
+    ``grade_final``, ``city``, ``city_tier``, ``work_mode``) — keep their dtype,
+    as do id-like ``*_id`` columns.
     """
     output_path = Path(path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     df_to_save = ensure_salary_gross_boolean(df.copy())
     df_to_save = _coerce_boollike_object_columns(df_to_save)
+    if optimize:
+        df_to_save = optimize_dtypes(df_to_save, keep=keep, verbose=verbose)
+        df_to_save.attrs.pop("memory_report", None)
+
+    if text_path is not None:
+        df_to_save, text = split_text_columns(df_to_save, text_columns=text_columns, id_col=id_col)
+        Path(text_path).parent.mkdir(parents=True, exist_ok=True)
+        text.to_parquet(text_path, index=False)
 
     if output_path.suffix.lower() == ".parquet":
         df_to_save.to_parquet(output_path, index=False)
     else:
         df_to_save.to_csv(output_path, index=False)
+
+
+def _default_partition_cols(df: pd.DataFrame) -> List[str]:
+    return ["scrape_date", "city_tier" if "city_tier" in df.columns else "search_area_id"]
+
+
+def save_partitioned(
+    df: pd.DataFrame,
+    path: PathLike,
+    partition_cols: Sequence[str] | None = None,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    text_path: PathLike | None = None,
+    text_columns: Sequence[str] | None = None,
+    id_col: str = "vacancy_id",
+) -> None:
+    """Save a processed dataframe as a hive-partitioned Parquet dataset.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Dataframe to save. Rows are grouped by partition, so the original row
+        order is not preserved.
+    path : PathLike
+        Dataset directory. Partition files written earlier under the same
+        directory are overwritten, other partitions are kept.
+    partition_cols : Sequence[str] | None, optional
+        Partition keys. Defaults to ``scrape_date`` (derived from
+        ``scraped_at_utc`` when missing) plus ``city_tier`` for feature tables
+        or ``search_area_id`` for clean tables.
+    row_group_size : int, optional
+        Maximum rows per row group; smaller groups give finer min/max
+        statistics for filters on non-partition columns.
+    text_path, text_columns, id_col
+        Split free-text columns into a separate table, see ``save_processed``.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    dataset_dir = Path(path)
+    dataset_dir.mkdir(parents=True, exist_ok=True)
+
+    df_to_save = ensure_salary_gross_boolean(df.copy())
+    df_to_save = _coerce_boollike_object_columns(df_to_save)
+    if text_path is not None:
+        df_to_save, text = split_text_columns(df_to_save, text_columns=text_columns, id_col=id_col)
+        Path(text_path).parent.mkdir(parents=True, exist_ok=True)
+        text.to_parquet(text_path, index=False)
+    partition_cols = list(partition_cols) if partition_cols is not None else _default_partition_cols(df_to_save)
+    if "scrape_date" in partition_cols and "scrape_date" not in df_to_save.columns:
+        if "scraped_at_utc" not in df_to_save.columns:
+            raise KeyError("scrape_date partitioning requires a scraped_at_utc column")
+        scraped = to_utc_naive(df_to_save["scraped_at_utc"])
+        df_to_save["scrape_date"] = scraped.dt.strftime("%Y-%m-%d")
+    missing = [col for col in partition_cols if col not in df_to_save.columns]
+    if missing:
+        raise KeyError(f"partition columns not found: {missing}")
+
+    table = pa.Table.from_pandas(df_to_save, preserve_index=False)
+    partition_fields = []
+    for col in partition_cols:
+        arrow_field = table.schema.field(col)
+        if pa.types.is_dictionary(arrow_field.type):
+            arrow_field = arrow_field.with_type(arrow_field.type.value_type)
+        partition_fields.append(arrow_field)
+    partition_schema = pa.schema(partition_fields)
+    table = table.cast(
+        pa.schema(
+            [partition_schema.field(f.name) if f.name in partition_cols else f for f in table.schema],
+            metadata=table.schema.metadata,
+        )
+    )
+
+    ds.write_dataset(
+        table,
+        dataset_dir,
+        format="parquet",
+        partitioning=ds.partitioning(partition_schema, flavor="hive"),
+        basename_template="part-{i}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        max_rows_per_group=row_group_size,
+        min_rows_per_group=min(row_group_size, len(table)) or 1,
+    )
+    # full schema (partition keys included) so loads restore the original dtypes
+    metadata = {**(table.schema.metadata or {}), PARTITION_COLS_KEY: json.dumps(partition_cols).encode()}
+    pq.write_metadata(table.schema.with_metadata(metadata), dataset_dir / "_common_metadata")
+
+
+def _open_dataset(source: Path) -> "ds.Dataset":
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    if not source.exists():
+        raise FileNotFoundError(source)
+    schema = None
+    partitioning = None
+    metadata_path = source / "_common_metadata"
+    if source.is_dir() and metadata_path.exists():
+        schema = pq.read_schema(metadata_path)
+        partition_cols = json.loads(schema.metadata[PARTITION_COLS_KEY])
+        partitioning = ds.partitioning(pa.schema([schema.field(col) for col in partition_cols]), flavor="hive")
+    elif source.is_dir():
+        partitioning = "hive"
+    return ds.dataset(source, format="parquet", schema=schema, partitioning=partitioning)
+
+
+def load_processed(
+    path: PathLike,
+    filters: Filters | None = None,
+    columns: Sequence[str] | None = None,
+    text_path: PathLike | None = None,
+    id_col: str = "vacancy_id",
+    optimize: bool = True,
+    keep: Sequence[str] | None = TEXT_KEY_COLUMNS,
+) -> pd.DataFrame:
+    """Load a processed Parquet file or partitioned dataset, reading only what is needed.
+
+    Parameters
+    ----------
+    path : PathLike
+        A ``.parquet`` file written by ``save_processed`` or a dataset
+        directory written by ``save_partitioned``.
+    filters : Filters | None, optional
+        Row predicate as a ``pyarrow.dataset`` expression or in the
+        ``pyarrow.parquet`` DNF form, e.g.
+        ``[("city_tier", "==", "Moscow"), ("scrape_date", ">=", "2025-11-01")]``.
+        Conditions on partition keys prune whole directories; conditions on
+        other columns skip row groups whose min/max statistics cannot match.
+        Filters apply to the analytic table only.
+    columns : Sequence[str] | None, optional
+        Columns to read. Defaults to all columns of the analytic table.
+    text_path : PathLike | None, optional
+        Text table written by ``save_processed(..., text_path=...)``. Text
+        columns listed in ``columns`` (all of them when ``columns`` is None)
+        are read for the selected ids only and joined on ``id_col``. The text
+        table is not touched when no text column is requested.
+    optimize : bool, optional
+        Apply ``optimize_dtypes`` to the loaded frame (text columns excluded).
+    keep : Sequence[str] | None, optional
+        Columns ``optimize_dtypes`` leaves untouched; the group keys of
+        ``TEXT_KEY_COLUMNS`` by default, as in ``save_processed``.
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+
+    dataset = _open_dataset(Path(path))
+    if filters is not None and not isinstance(filters, ds.Expression):
+        filters = pq.filters_to_expression(filters)
+
+    requested = list(columns) if columns is not None else None
+    text_cols: List[str] = []
+    if text_path is not None:
+        text_names = pq.read_schema(Path(text_path)).names
+        if requested is None:
+            text_cols = [col for col in text_names if col != id_col]
+        else:
+            text_cols = [col for col in requested if col not in dataset.schema.names and col in text_names]
+
+    read_cols = requested
+    if requested is not None and text_cols:
+        read_cols = [col for col in requested if col not in text_cols]
+        if id_col not in read_cols:
+            read_cols.append(id_col)
+    df = dataset.to_table(columns=read_cols, filter=filters).to_pandas()
+    if optimize:
+        df = optimize_dtypes(df, keep=keep)
+    if not text_cols:
+        return df
+
+    ids = df[id_col].dropna().unique().tolist()
+    text = pd.read_parquet(text_path, columns=[id_col, *text_cols], filters=[(id_col, "in", ids)])
+    attrs = df.attrs
+    df = df.merge(text, on=id_col, how="left")
+    df.attrs = attrs
+    return df[requested] if requested is not None else df
+
+
+def _uses_string_dtype() -> bool:
+    try:
+        return bool(pd.get_option("future.infer_string"))
+    except KeyError:  # pandas < 2.1 has no string inference
+        return False
+
+
+def write_feature_cache(df: pd.DataFrame, path: PathLike) -> None:
+    """Write a dataframe as an uncompressed Arrow IPC (Feather v2) file.
+
+    Uncompressed buffers can be memory-mapped by ``read_feature_cache`` without
+    decoding, so every process that opens the file shares the OS page cache
+    instead of holding a private copy.
+    """
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    cache_path = Path(path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # write to a sibling file and rename so readers never map a partial file
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    tmp_path.replace(cache_path)
+
+
+def read_feature_cache(
+    path: PathLike, columns: Sequence[str] | None = None, as_table: bool = False
+) -> pd.DataFrame | "pa.Table":
+    """Open a feature cache written by ``write_feature_cache`` memory-mapped.
+
+    Parameters
+    ----------
+    path : PathLike
+        Arrow IPC file.
+    columns : Sequence[str] | None, optional
+        Columns to materialize; others are never paged in.
+    as_table : bool, optional
+        Return the ``pyarrow.Table`` whose buffers point straight into the
+        mapping (zero-copy). By default the table is converted to pandas;
+        numeric columns without nulls stay views of the mapping, other columns
+        (nullable, boolean, text) are materialized by pandas.
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(str(Path(path)), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select(list(columns))
+    if as_table:
+        return table
+    df = table.to_pandas(split_blocks=True)
+    if not _uses_string_dtype():
+        # pyarrow maps text to the ``str`` dtype on pandas >= 3 even with
+        # ``future.infer_string`` off; return object columns like pd.read_parquet
+        for col, dtype in df.dtypes.items():
+            if isinstance(dtype, pd.StringDtype) and dtype.na_value is np.nan:
+                df[col] = pd.Series(table.column(col).to_numpy(zero_copy_only=False), index=df.index, dtype=object)
+    return df
+
+
+def load_features_cached(
+    path: PathLike,
+    cache_path: PathLike,
+    columns: Sequence[str] | None = None,
+) -> pd.DataFrame:
+    """Load features through the memory-mapped cache, rebuilding it when stale.
+
+    The cache is (re)written from ``path`` when it is missing or older than
+    ``path``; otherwise the Parquet file is not read at all.
+    """
+    source = Path(path)
+    cache = Path(cache_path)
+    if not cache.exists() or cache.stat().st_mtime < source.stat().st_mtime:
+        write_feature_cache(pd.read_parquet(source), cache)
+    return read_feature_cache(cache, columns=columns)
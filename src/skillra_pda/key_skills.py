@@ -0,0 +1,225 @@
+"""Sparse vacancy × key-skill matrix built from the free-text ``skills`` column.
+
+hh.ru key skills ("Ключевые навыки") come as one comma-separated string per
+vacancy. ``build_key_skills`` splits and normalizes them with Arrow compute
+kernels (no per-row Python), assigns every distinct normalized skill a
+column of a global vocabulary ordered by frequency and stores which vacancy
+asks for which skill as a ``scipy.sparse`` CSR matrix. Frequency queries are
+then ``bincount`` / sparse products over the stored indices, and the whole
+structure is saved next to the feature Parquet as one ``.npz`` file.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+PathLike = Union[str, Path]
+SEPARATOR = ","
+
+
+def _tokens(skills: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Split and normalize every comma-separated token.
+
+    Returns the row of every token, its code in the vocabulary of normalized
+    skills (numbered in order of first appearance), that vocabulary and the
+    display spelling of each vocabulary entry (its first occurrence).
+    """
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    values = pa.array(skills, type=pa.large_string(), from_pandas=True)
+    if isinstance(values, pa.ChunkedArray):  # Arrow-backed string column
+        values = values.combine_chunks()
+    lists = pc.split_pattern(values, SEPARATOR)
+    rows = pc.list_parent_indices(lists)
+    display = pc.utf8_trim_whitespace(pc.list_flatten(lists))
+    # casefold and collapse inner whitespace: "Apache  Spark" and "apache spark" are one skill
+    normalized = pc.replace_substring_regex(pc.utf8_lower(display), r"[\s\p{Zs}]+", " ")
+    keep = pc.greater(pc.utf8_length(normalized), 0)
+    rows, display, normalized = (pc.filter(array, keep) for array in (rows, display, normalized))
+    encoded = pc.dictionary_encode(normalized)
+    codes = encoded.indices.to_numpy(zero_copy_only=False).astype(np.int64)
+    first_seen = np.empty(len(encoded.dictionary), dtype=np.int64)
+    # reversed fancy assignment: the last write (the first occurrence) wins
+    first_seen[codes[::-1]] = np.arange(len(codes) - 1, -1, -1)
+    return (
+        rows.to_numpy(zero_copy_only=False).astype(np.int64),
+        codes,
+        np.asarray(encoded.dictionary.to_pylist(), dtype=object),
+        np.asarray(pc.take(display, pa.array(first_seen)).to_pylist(), dtype=object),
+    )
+
+
+@dataclass
+class KeySkills:
+    """Vacancies × key skills as a binary CSR matrix.
+
+    Attributes
+    ----------
+    matrix : scipy.sparse.csr_matrix
+        ``uint8`` matrix, one row per vacancy and one column per skill.
+    vocabulary : numpy.ndarray
+        Normalized skill names (lower case, single spaces); column ``j`` of
+        ``matrix`` is ``vocabulary[j]``. Ordered by document frequency.
+    labels : numpy.ndarray
+        Display form of every skill (its first spelling in the data).
+    vacancy_id : numpy.ndarray
+        Vacancy id of every row of ``matrix``.
+    """
+
+    matrix: "scipy.sparse.csr_matrix"  # noqa: F821
+    vocabulary: np.ndarray
+    labels: np.ndarray
+    vacancy_id: np.ndarray
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def document_counts(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Number of vacancies (optionally inside the boolean ``rows`` mask) per skill."""
+
+        matrix = self.matrix if rows is None else self.matrix[np.asarray(rows, dtype=bool)]
+        return np.bincount(matrix.indices, minlength=len(self.vocabulary))
+
+    def top_skills(self, n: int = 20, rows: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """The ``n`` most requested skills with counts and shares of vacancies."""
+
+        counts = self.document_counts(rows)
+        total = len(self) if rows is None else int(np.count_nonzero(rows))
+        top = np.argsort(-counts, kind="stable")[:n]
+        top = top[counts[top] > 0]
+        return pd.DataFrame(
+            {
+                "skill": self.labels[top],
+                "count": counts[top],
+                "share": counts[top] / total if total else np.nan,
+            }
+        )
+
+    def segment_counts(self, codes: np.ndarray, n_groups: Optional[int] = None) -> "scipy.sparse.csr_matrix":  # noqa: F821
+        """Vacancies per segment (rows) and skill (columns) as a sparse matrix.
+
+        ``codes`` are segment numbers per vacancy (``pd.factorize`` /
+        ``GroupBy.ngroup``); negative codes are ignored.
+        """
+
+        from scipy import sparse
+
+        codes = np.asarray(codes, dtype=np.int64)
+        if codes.shape != (len(self),):
+            raise ValueError(f"expected {len(self)} segment codes")
+        if n_groups is None:
+            n_groups = int(codes.max()) + 1 if len(codes) else 0
+        rows = np.flatnonzero(codes >= 0)
+        membership = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (codes[rows], rows)), shape=(n_groups, len(self))
+        )
+        return (membership @ self.matrix.astype(np.int64)).tocsr()
+
+    def segment_top_skills(self, segments: pd.DataFrame, n: int = 10) -> pd.DataFrame:
+        """Top ``n`` skills inside every segment given by the columns of ``segments``.
+
+        ``segments`` holds one row per vacancy of this matrix, e.g.
+        ``features[["primary_role", "grade_final"]]`` aligned on ``vacancy_id``.
+        """
+
+        if len(segments) != len(self):
+            raise ValueError("segments must have one row per vacancy")
+        grouped = segments.groupby(list(segments.columns), observed=True)
+        codes = grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+        sizes = grouped.size()
+        counts = self.segment_counts(codes, len(sizes))
+        records = []
+        for code, (key, size) in enumerate(sizes.items()):
+            row = counts.getrow(code)
+            order = np.lexsort((row.indices, -row.data))[:n]
+            key = key if isinstance(key, tuple) else (key,)
+            for skill, count in zip(row.indices[order], row.data[order]):
+                records.append((*key, self.labels[skill], int(count), count / size))
+        return pd.DataFrame(records, columns=[*segments.columns, "skill", "count", "share"])
+
+    def rows_for(self, vacancy_id: Sequence) -> np.ndarray:
+        """Row positions of the given vacancy ids (``-1`` for unknown ids)."""
+
+        return pd.Index(self.vacancy_id).get_indexer(pd.Index(vacancy_id))
+
+    def save(self, path: PathLike) -> Path:
+        """Write the matrix, vocabulary and ids to one ``.npz`` file."""
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as handle:
+            np.savez_compressed(
+                handle,
+                indptr=self.matrix.indptr,
+                indices=self.matrix.indices,
+                shape=np.array(self.matrix.shape),
+                vocabulary=self.vocabulary.astype(str),
+                labels=self.labels.astype(str),
+                vacancy_id=self.vacancy_id if self.vacancy_id.dtype != object else self.vacancy_id.astype(str),
+            )
+        return path
+
+    @classmethod
+    def load(cls, path: PathLike) -> "KeySkills":
+        """Read a matrix written by :meth:`save`."""
+
+        from scipy import sparse
+
+        with np.load(path, allow_pickle=False) as stored:
+            indices = stored["indices"]
+            matrix = sparse.csr_matrix(
+                (np.ones(len(indices), dtype=np.uint8), indices, stored["indptr"]),
+                shape=tuple(stored["shape"]),
+            )
+            return cls(
+                matrix=matrix,
+                vocabulary=stored["vocabulary"].astype(object),
+                labels=stored["labels"].astype(object),
+                vacancy_id=stored["vacancy_id"],
+            )
+
+
+def build_key_skills(skills: pd.Series, vacancy_id: Optional[Sequence] = None) -> KeySkills:
+    """Tokenize comma-separated key skills into a :class:`KeySkills` matrix.
+
+    Parameters
+    ----------
+    skills : pandas.Series
+        ``skills`` column; missing values give vacancies without skills.
+    vacancy_id : Sequence, optional
+        Id of every row; the index of ``skills`` by default.
+    """
+
+    from scipy import sparse
+
+    rows, codes, vocabulary, display = _tokens(skills)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(codes), dtype=np.int32), (rows, codes)), shape=(len(skills), len(vocabulary))
+    )
+    # a skill listed twice in one vacancy still counts once
+    matrix.sum_duplicates()
+    matrix.data = np.ones(len(matrix.indices), dtype=np.uint8)
+
+    frequency = np.bincount(matrix.indices, minlength=len(vocabulary))
+    by_frequency = np.lexsort((vocabulary.astype(str), -frequency))
+    rank = np.empty_like(by_frequency)
+    rank[by_frequency] = np.arange(len(by_frequency))
+    matrix.indices = rank[matrix.indices].astype(matrix.indices.dtype)
+    matrix.has_sorted_indices = False
+    matrix.sort_indices()
+    ids = np.asarray(skills.index if vacancy_id is None else vacancy_id)
+    return KeySkills(
+        matrix=matrix,
+        vocabulary=vocabulary[by_frequency],
+        labels=display[by_frequency],
+        vacancy_id=ids,
+    )
+
+
+__all__ = ["KeySkills", "SEPARATOR", "build_key_skills"]
@@ -0,0 +1,107 @@
+"""Apply scalar normalizers once per distinct value instead of once per row.
+
+Columns such as ``city`` or ``lang_english_level`` have millions of rows but a
+few thousand distinct values. ``UniqueMapper`` factorizes its input columns,
+calls the wrapped scalar function for each distinct value combination only
+and broadcasts the results back through the integer codes. Results are
+memoized across calls, so mapping the next batch of vacancies only evaluates
+values that were not seen before.
+"""
+from __future__ import annotations
+
+from typing import Callable, Dict, Hashable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CACHE_SIZE = 100_000
+
+# memo key for float NaN: NaN != NaN and every .tolist() creates a new NaN
+# object, so NaN keys would never match (None, pd.NA and NaT are singletons)
+_NAN_KEY = object()
+
+
+def _memo_key(args: Tuple[object, ...]) -> Tuple[Hashable, ...]:
+    return tuple(_NAN_KEY if isinstance(arg, float) and arg != arg else arg for arg in args)
+
+
+def _factorize_rows(columns: Tuple[pd.Series, ...]) -> Tuple[np.ndarray, np.ndarray]:
+    """Codes of the distinct value combinations and the first row of each."""
+
+    codes = np.zeros(len(columns[0]), dtype=np.int64)
+    for i, column in enumerate(columns):
+        # missing values get their own code so that func sees them as before
+        col_codes, uniques = pd.factorize(column, use_na_sentinel=False)
+        codes = codes * max(len(uniques), 1) + col_codes
+        if i:
+            codes, _ = pd.factorize(codes)
+    n_unique = int(codes.max()) + 1 if len(codes) else 0
+    first_row = np.empty(n_unique, dtype=np.int64)
+    # reversed fancy assignment: the last write (the first occurrence) wins
+    first_row[codes[::-1]] = np.arange(len(codes) - 1, -1, -1)
+    return codes, first_row
+
+
+class UniqueMapper:
+    """Vectorize a scalar function of one or more columns over distinct values.
+
+    Parameters
+    ----------
+    func : Callable
+        Scalar function; receives one value per input column, boxed exactly as
+        when iterating over the Series (Python scalars, ``pd.NA``, ``NaN``).
+    cache_size : int, optional
+        Maximum number of memoized argument tuples; the memo is cleared when
+        it grows beyond this size.
+
+    Examples
+    --------
+    >>> to_tier = UniqueMapper(_city_to_tier)
+    >>> df["city_tier"] = to_tier(df["city"])
+    """
+
+    def __init__(self, func: Callable[..., object], cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self.func = func
+        self.cache_size = cache_size
+        self.cache: Dict[Tuple[Hashable, ...], object] = {}
+
+    def __call__(self, *columns: pd.Series) -> np.ndarray:
+        """Return ``func`` applied row-wise to ``columns`` as an object array."""
+
+        if not columns:
+            raise ValueError("UniqueMapper needs at least one column")
+        columns = tuple(pd.Series(column) if not isinstance(column, pd.Series) else column for column in columns)
+        if len({len(column) for column in columns}) > 1:
+            raise ValueError("UniqueMapper columns must have the same length")
+
+        codes, first_row = _factorize_rows(columns)
+        arguments = zip(*(column.take(first_row).tolist() for column in columns))
+        if len(self.cache) > self.cache_size:
+            self.cache.clear()
+        results: List[object] = []
+        for args in arguments:
+            key = _memo_key(args)
+            try:
+                result = self.cache[key]
+            except KeyError:
+                result = self.cache[key] = self.func(*args)
+            except TypeError:  # unhashable argument
+                result = self.func(*args)
+            results.append(result)
+        mapped = np.empty(len(results), dtype=object)
+        mapped[:] = results
+        return mapped[codes]
+
+    def cache_clear(self) -> None:
+        """Drop memoized results, e.g. after changing the rules of ``func``."""
+
+        self.cache.clear()
+
+
+def map_unique(func: Callable[..., object], *columns: pd.Series) -> np.ndarray:
+    """One-off ``UniqueMapper(func)(*columns)`` without a persistent memo."""
+
+    return UniqueMapper(func)(*columns)
+
+
+__all__ = ["DEFAULT_CACHE_SIZE", "UniqueMapper", "map_unique"]
@@ -3,8 +3,11 @@ from __future__ import annotations
 
 from typing import Iterable
 
+import numpy as np
 import pandas as pd
 
+from .skill_matrix import SkillMatrix
+
 
 def _derive_domain(df: pd.DataFrame, domain_cols: Iterable[str]) -> pd.Series:
     """Return the primary domain label from one-hot domain columns."""
@@ -12,15 +15,12 @@ def _derive_domain(df: pd.DataFrame, domain_cols: Iterable[str]) -> pd.Series:
     if not domain_cols:
         return pd.Series("unknown", index=df.index)
 
-    domain_flags = df[domain_cols].fillna(False).astype(bool)
-
-    def _first_domain(row: pd.Series) -> str:
-        for col in domain_cols:
-            if bool(row[col]):
-                return col.replace("domain_", "")
-        return "unknown"
-
-    return domain_flags.apply(_first_domain, axis=1)
+    matrix = SkillMatrix.from_frame(df, domain_cols)
+    flags = np.column_stack([matrix.column(col) for col in domain_cols])
+    labels = np.array([col.replace("domain_", "") for col in domain_cols] + ["unknown"], dtype=object)
+    # the first listed domain wins; rows without any domain fall to "unknown"
+    first = np.where(flags.any(axis=1), flags.argmax(axis=1), len(domain_cols))
+    return pd.Series(labels[first], index=df.index)
 
 
 def _format_top_skills(row: pd.Series) -> str:
@@ -56,6 +56,11 @@ def build_market_view(df: pd.DataFrame) -> pd.DataFrame:
 
     temp = df.copy()
     group_cols = required_cols.copy()
+    # primary_role lists every role; other keys may be categoricals from
+    # optimized files and must not expand to unobserved combinations
+    for col in group_cols[1:]:
+        if isinstance(temp[col].dtype, pd.CategoricalDtype):
+            temp[col] = temp[col].astype(temp[col].cat.categories.dtype)
 
     domain_cols = [col for col in df.columns if col.startswith("domain_")]
     if domain_cols:
@@ -93,14 +98,16 @@ def build_market_view(df: pd.DataFrame) -> pd.DataFrame:
 
     skill_cols = [col for col in df.columns if col.startswith("skill_") or col.startswith("has_")]
     if skill_cols:
-        skill_means = temp[group_cols + skill_cols].copy()
-        skill_means[skill_cols] = skill_means[skill_cols].fillna(False).astype(bool)
-        formatted = (
-            skill_means.groupby(group_cols, observed=False)[skill_cols]
-            .mean()
-            .apply(_format_top_skills, axis=1)
-            .reset_index(name="top_skills")
+        grouped = temp.groupby(group_cols, observed=True)
+        codes = grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+        sizes = grouped.size()
+        counts = SkillMatrix.from_frame(df, skill_cols).group_counts(codes, len(sizes))
+        skill_means = pd.DataFrame(
+            counts / sizes.to_numpy()[:, None], index=sizes.index, columns=skill_cols
         )
+        formatted = skill_means.apply(_format_top_skills, axis=1).reset_index(name="top_skills")
         summary = summary.merge(formatted, on=group_cols, how="left")
+        # groups without vacancies (unobserved roles) have no top skills
+        summary["top_skills"] = summary["top_skills"].fillna("")
 
     return summary.sort_values(by="vacancy_count", ascending=False)
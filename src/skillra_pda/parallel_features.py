@@ -0,0 +1,191 @@
+"""Partition-parallel feature assembly.
+
+``features.assemble_features`` runs every step on the whole frame in one
+process. Most steps are row-local (``FeatureStep.row_local``): a row's
+features depend on that row only, so the frame can be split into row
+partitions that worker processes assemble independently (map). The steps
+that need all rows — the salary bucket quantiles — run once on the gathered
+result (reduce):
+
+1. the input columns of the row-local steps are written once as an Arrow IPC
+   file with one record batch per partition, on ``/dev/shm`` where available;
+   every worker memory-maps the file and reads only its own batch, so no
+   partition is pickled on the way in;
+2. each worker runs the row-local steps on its batch and sends back only the
+   feature columns, plus a KLL sketch of its salaries with
+   ``salary_method="sketch"``;
+3. the parent concatenates the feature columns (categorical features get the
+   sorted union of the partitions' categories, as ``add_primary_role`` would
+   on the whole frame) and runs the global steps, with exact salary
+   quantiles or with boundaries from the merged partition sketches.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import features
+from .sketch import KLLSketch, merge_sketches, sketch_series
+
+# below this many rows per worker, starting a worker process (~1.5 s) costs more than it saves
+DEFAULT_MIN_PARTITION_ROWS = 50_000
+SALARY_BUCKETS = 3
+
+
+def _local_steps() -> List[features.FeatureStep]:
+    return [step for step in features.FEATURE_STEPS if step.row_local]
+
+
+def _check_steps() -> None:
+    for step in _local_steps():
+        if any(not upstream.row_local for upstream in step.upstream()):
+            raise ValueError(f"row-local feature step {step.name} reads the output of a global step")
+
+
+def _partition_columns(df: pd.DataFrame, salary_col: Optional[str]) -> List[str]:
+    """Columns of ``df`` read by the row-local steps (and the sketched salary), in frame order."""
+
+    needed = {col for step in _local_steps() for col in step.input_columns(df.columns)}
+    if salary_col is not None:
+        needed.add(salary_col)
+    return [col for col in df.columns if col in needed]
+
+
+def _assemble_partition(
+    path: str, batch: int, salary_col: Optional[str]
+) -> Tuple[pd.DataFrame, Optional[KLLSketch]]:
+    """Worker: run the row-local steps on record batch ``batch`` of the shared IPC file.
+
+    Returns the columns the steps added and, if ``salary_col`` is given, a
+    sketch of the partition's salaries.
+    """
+
+    import pyarrow as pa
+
+    reader = pa.ipc.open_file(pa.memory_map(path))
+    part = pa.Table.from_batches([reader.get_batch(batch)]).to_pandas()
+    inputs = set(part.columns)
+    sketch = sketch_series(part[salary_col]) if salary_col is not None and salary_col in inputs else None
+    for step in _local_steps():
+        part = step.func(part)
+    return part[[col for col in part.columns if col not in inputs]], sketch
+
+
+def _write_partitions(df: pd.DataFrame, columns: List[str], bounds: np.ndarray, path: Path) -> None:
+    import pyarrow as pa
+
+    frame = df[columns]
+    schema = pa.Schema.from_pandas(frame, preserve_index=False)
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            writer.write_batch(pa.RecordBatch.from_pandas(frame.iloc[start:stop], schema=schema, preserve_index=False))
+
+
+def _concat(parts: Iterable[pd.Series]) -> pd.Series:
+    parts = list(parts)
+    if all(isinstance(part.dtype, pd.CategoricalDtype) and not part.cat.ordered for part in parts):
+        return pd.Series(pd.api.types.union_categoricals([part.array for part in parts], sort_categories=True))
+    return pd.concat(parts, ignore_index=True)
+
+
+def _shared_memory_dir() -> Optional[str]:
+    shm = Path("/dev/shm")
+    return str(shm) if shm.is_dir() and os.access(shm, os.W_OK) else None
+
+
+def assemble_features_parallel(
+    df: pd.DataFrame,
+    workers: Optional[int] = None,
+    partitions: Optional[int] = None,
+    salary_bins: Optional[Iterable[float]] = None,
+    salary_method: str = "exact",
+    salary_col: str = "salary_mid_rub_capped",
+    min_partition_rows: int = DEFAULT_MIN_PARTITION_ROWS,
+) -> pd.DataFrame:
+    """``features.assemble_features`` with the row-local steps run on row partitions in parallel.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Clean frame; left unchanged. Its columns must convert to Arrow.
+    workers : int, optional
+        Worker processes; ``os.cpu_count()`` by default. With ``1``, or fewer
+        than ``min_partition_rows`` rows per worker, everything runs in this
+        process.
+    partitions : int, optional
+        Row partitions; one per worker by default.
+    salary_bins : Iterable[float], optional
+        Fixed salary bucket boundaries, as in ``assemble_features``.
+    salary_method : str, optional
+        ``"exact"`` computes bucket quantiles on all salaries, as
+        ``assemble_features`` does; ``"sketch"`` takes them from the merged
+        KLL sketches of the partitions.
+
+    Returns
+    -------
+    pandas.DataFrame
+        The same columns and values as ``features.assemble_features(df)``
+        with ``salary_method="exact"``. Frames assembled on partitions carry
+        no input fingerprints, so ``features.stale_features`` reports every
+        step of them as stale.
+    """
+
+    if salary_method not in ("exact", "sketch"):
+        raise ValueError(f"unknown quantile method: {salary_method}")
+    _check_steps()
+    workers = workers or os.cpu_count() or 1
+    partitions = partitions or workers
+    partitions = max(1, min(partitions, len(df) // max(min_partition_rows, 1)))
+    sketch_col = salary_col if salary_method == "sketch" and salary_bins is None else None
+
+    if workers == 1 or partitions == 1:
+        if sketch_col is not None and salary_col in df.columns:
+            sketch = sketch_series(df[salary_col])
+            salary_bins = features.salary_bucket_edges(sketch, SALARY_BUCKETS) if sketch.n >= SALARY_BUCKETS else None
+        return features.assemble_features(df, salary_bins=salary_bins)
+
+    bounds = np.linspace(0, len(df), partitions + 1).astype(np.int64)
+    with tempfile.TemporaryDirectory(dir=_shared_memory_dir()) as tmp:
+        path = Path(tmp) / "partitions.arrow"
+        _write_partitions(df, _partition_columns(df, sketch_col), bounds, path)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, partitions), mp_context=context) as executor:
+            futures = [
+                executor.submit(_assemble_partition, str(path), batch, sketch_col) for batch in range(partitions)
+            ]
+            parts = [future.result() for future in futures]
+
+    if sketch_col is not None:
+        merged = merge_sketches(sketch for _, sketch in parts if sketch is not None)
+        salary_bins = features.salary_bucket_edges(merged, SALARY_BUCKETS) if merged.n >= SALARY_BUCKETS else None
+    gathered = {}
+    for col in parts[0][0].columns:
+        values = _concat(frame[col] for frame, _ in parts)
+        values.index = df.index
+        gathered[col] = values
+
+    # add columns in registry order so that the column order matches assemble_features
+    result = features.derived_frame(df)
+    for step in features.FEATURE_STEPS:
+        if step.row_local:
+            for col in step.outputs:
+                if col in gathered:
+                    result[col] = gathered.pop(col)
+        else:
+            result = step.run(result, {"bins": salary_bins})
+    for col, values in gathered.items():
+        result[col] = values
+    result = features.ensure_expected_feature_columns(result)
+    result.attrs.pop(features.FINGERPRINT_ATTR, None)
+    result.attrs["features_source"] = features.features_source_hash()
+    return result
+
+
+__all__ = ["DEFAULT_MIN_PARTITION_ROWS", "assemble_features_parallel"]
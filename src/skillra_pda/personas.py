@@ -5,9 +5,11 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Dict, List, Mapping, Sequence
 
+import numpy as np
 import pandas as pd
 
 from . import config, eda
+from .skill_matrix import SkillMatrix
 from .viz import _format_filters, _humanize_skill_name
 
 
@@ -185,8 +187,13 @@ def build_skill_demand_profile(
     skill_cols: list[str] | None = None,
     min_market_n: int | None = None,
     filter_result: PersonaFilterResult | None = None,
+    skill_matrix: SkillMatrix | None = None,
 ) -> pd.DataFrame:
-    """Compute market demand for skills in the persona's target segment."""
+    """Compute market demand for skills in the persona's target segment.
+
+    ``skill_matrix`` may hold the skill flags of the segment or of the whole
+    ``df``; in the latter case the segment is counted inside it.
+    """
 
     result = filter_result or _filter_by_target(df, persona, min_market_n=min_market_n)
     df_filtered = result.filtered_df
@@ -204,13 +211,17 @@ def build_skill_demand_profile(
     )
     if not resolved_skill_cols:
         return pd.DataFrame(columns=["skill_name", "market_share"])
+    if skill_matrix is not None and skill_matrix.index.equals(df.index) and df.index.is_unique:
+        # count the segment inside the matrix of the whole frame
+        matrix = SkillMatrix.for_frame(df, resolved_skill_cols, skill_matrix, errors="ignore")
+        segment = np.zeros(len(df), dtype=bool)
+        segment[df.index.get_indexer(df_filtered.index)] = True
+        shares = matrix.shares(rows=segment)
+    else:
+        matrix = SkillMatrix.for_frame(df_filtered, resolved_skill_cols, skill_matrix, errors="ignore")
+        shares = matrix.shares()
     rows: list[dict[str, object]] = []
-    for col in resolved_skill_cols:
-        series = df_filtered[col].fillna(False)
-        try:
-            share = series.astype(bool).mean()
-        except Exception:
-            continue
+    for col, share in shares.items():
         if share < min_share:
             continue
         rows.append({"skill_name": col, "market_share": share})
@@ -229,6 +240,7 @@ def skill_gap_for_persona(
     top_n: int | None = 20,
     min_market_n: int | None = None,
     filter_result: PersonaFilterResult | None = None,
+    skill_matrix: SkillMatrix | None = None,
 ) -> pd.DataFrame:
     """
     Calculate market share of skills for persona targets and mark gaps.
@@ -245,6 +257,7 @@ def skill_gap_for_persona(
         skill_cols=skill_cols,
         min_market_n=min_market_n,
         filter_result=result,
+        skill_matrix=skill_matrix,
     )
     if skill_cols:
         demand = demand[demand["skill_name"].isin(skill_cols)]
@@ -317,12 +330,14 @@ def analyze_persona(df: pd.DataFrame, persona: Persona, top_k: int = 10) -> dict
             df_filtered["is_junior_friendly"].fillna(False).astype(bool).mean()
         )
 
+    skill_matrix = SkillMatrix.from_frame(df_filtered, eda.hard_skill_columns(df_filtered), errors="ignore")
     demand_df = build_skill_demand_profile(
         df,
         persona,
         skill_prefixes=("has_", "skill_"),
         min_share=0.05,
         filter_result=filter_result,
+        skill_matrix=skill_matrix,
     )
     top_demand = demand_df.head(top_k) if not demand_df.empty else pd.DataFrame()
 
@@ -332,6 +347,7 @@ def analyze_persona(df: pd.DataFrame, persona: Persona, top_k: int = 10) -> dict
         min_share=0.05,
         top_n=top_k,
         filter_result=filter_result,
+        skill_matrix=skill_matrix,
     )
     recommended_skills: list[str] = gap_df.loc[gap_df["gap"], "skill_name"].head(top_k).tolist()
 
@@ -0,0 +1,511 @@
+"""Stage graph and executor for the data pipeline.
+
+Each ``Stage`` declares the files it reads and writes; dependencies follow from
+matching an input path with another stage's output. ``Pipeline.run`` executes
+the selected stages in dependency order, sends independent ready stages to
+separate worker processes, skips stages whose ``StageCache`` entry is still
+valid and appends one record per stage (status, wall time, peak memory, rows)
+to a JSON-lines run log.
+"""
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import pandas as pd
+
+from . import (
+    chunked,
+    cleaning,
+    config,
+    eda,
+    features,
+    io,
+    key_skills,
+    lookup,
+    market,
+    parallel_features,
+    schema,
+    sketch,
+    skill_matrix,
+    viz,
+)
+from .stage_cache import StageCache
+
+try:  # resource is POSIX-only
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One pipeline step: ``func(**params)`` reads ``inputs`` and writes ``outputs``.
+
+    ``func`` must be a module-level function so it can run in a worker
+    process; it may return the number of rows it produced. ``modules`` are
+    the modules whose source is part of the stage's cache key.
+    """
+
+    name: str
+    func: Callable[..., int | None]
+    inputs: Tuple[Path, ...] = ()
+    outputs: Tuple[Path, ...] = ()
+    params: Mapping[str, object] = field(default_factory=dict)
+    modules: Tuple[ModuleType, ...] = ()
+
+
+@dataclass
+class StageRecord:
+    """Run-log entry for one stage."""
+
+    run_id: str
+    stage: str
+    status: str
+    seconds: float
+    peak_memory_mb: float | None = None
+    rows: int | None = None
+    error: str | None = None
+
+
+def _peak_memory_mb() -> float | None:
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _execute(func: Callable[..., int | None], params: Dict[str, object]) -> Tuple[int | None, float, float | None]:
+    # takes the function and parameters rather than the Stage: modules do not pickle
+    start = time.perf_counter()
+    rows = func(**params)
+    return rows, time.perf_counter() - start, _peak_memory_mb()
+
+
+def _make_executor(workers: int) -> ProcessPoolExecutor:
+    context = multiprocessing.get_context("spawn")
+    if sys.version_info >= (3, 11):
+        # a fresh process per stage keeps peak memory attributable to one stage
+        return ProcessPoolExecutor(max_workers=workers, mp_context=context, max_tasks_per_child=1)
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+
+class Pipeline:
+    """Dependency graph of ``Stage`` objects.
+
+    Parameters
+    ----------
+    stages : Iterable[Stage]
+        Stages in any order. Names and output paths must be unique.
+    """
+
+    def __init__(self, stages: Iterable[Stage]) -> None:
+        self.stages: Dict[str, Stage] = {}
+        producers: Dict[Path, str] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+            for output in stage.outputs:
+                if output in producers:
+                    raise ValueError(f"{output} is produced by both {producers[output]} and {stage.name}")
+                producers[output] = stage.name
+        self.dependencies: Dict[str, List[str]] = {
+            name: sorted({producers[path] for path in stage.inputs if path in producers})
+            for name, stage in self.stages.items()
+        }
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        order: List[str] = []
+        remaining = dict(self.dependencies)
+        while remaining:
+            ready = [name for name, deps in remaining.items() if all(dep in order for dep in deps)]
+            if not ready:
+                raise ValueError(f"dependency cycle among stages: {sorted(remaining)}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+        return order
+
+    def _closure(self, name: str, upstream: bool) -> set:
+        if name not in self.stages:
+            raise KeyError(f"unknown stage: {name}")
+        result = {name}
+        changed = True
+        while changed:
+            changed = False
+            for stage, deps in self.dependencies.items():
+                linked = stage in result if upstream else any(dep in result for dep in deps)
+                additions = set(deps) if upstream else {stage}
+                if linked and not additions <= result:
+                    result |= additions
+                    changed = True
+        return result
+
+    def select(
+        self,
+        only: Sequence[str] | None = None,
+        start: str | None = None,
+        until: str | None = None,
+    ) -> List[str]:
+        """Return stage names to run, in execution order.
+
+        ``only`` picks exact stages, ``start`` keeps a stage and everything
+        downstream of it, ``until`` keeps a stage and everything it needs. The
+        selections are intersected.
+        """
+
+        selected = set(self.stages)
+        if only:
+            unknown = sorted(set(only) - set(self.stages))
+            if unknown:
+                raise KeyError(f"unknown stages: {unknown}")
+            selected &= set(only)
+        if start:
+            selected &= self._closure(start, upstream=False)
+        if until:
+            selected &= self._closure(until, upstream=True)
+        return [name for name in self.order if name in selected]
+
+    def run(
+        self,
+        only: Sequence[str] | None = None,
+        start: str | None = None,
+        until: str | None = None,
+        cache: StageCache | None = None,
+        max_workers: int | None = None,
+        log_path: Path | None = None,
+    ) -> List[StageRecord]:
+        """Run the selected stages and return their run-log records.
+
+        With ``max_workers=1`` stages run in this process one by one. Otherwise
+        stages that become ready together run side by side, each in a fresh
+        worker process, so the recorded peak memory is that of the stage
+        alone; a stage that is the only one ready (e.g. along the
+        clean → features chain) runs in this process instead of paying the
+        start-up of a new interpreter for no parallelism. Stages outside the
+        selection are assumed to be up to date.
+        """
+
+        selected = self.select(only=only, start=start, until=until)
+        run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        records: List[StageRecord] = []
+        done: set = set()
+        pending = list(selected)
+        checks = {}
+        workers = max_workers or min(len(selected), os.cpu_count() or 1) or 1
+        executor = _make_executor(workers) if workers > 1 else None
+        running: Dict[Future, Tuple[str, float]] = {}
+        failed: StageRecord | None = None
+
+        def ready(name: str) -> bool:
+            return all(dep in done or dep not in selected for dep in self.dependencies[name])
+
+        try:
+            while (pending or running) and failed is None:
+                launch: List[Tuple[str, float]] = []
+                for name in [name for name in pending if ready(name)]:
+                    pending.remove(name)
+                    stage = self.stages[name]
+                    start_time = time.perf_counter()
+                    if cache is not None:
+                        checks[name] = cache.check(
+                            name, stage.func, stage.inputs, stage.outputs, stage.params, stage.modules
+                        )
+                        if checks[name].hit:
+                            records.append(StageRecord(run_id, name, "hit", time.perf_counter() - start_time))
+                            done.add(name)
+                            continue
+                    launch.append((name, start_time))
+                if executor is None or (len(launch) == 1 and not running):
+                    for name, start_time in launch:
+                        stage = self.stages[name]
+                        try:
+                            rows, seconds, peak = _execute(stage.func, dict(stage.params))
+                        except Exception as exc:
+                            failed = StageRecord(
+                                run_id, name, "failed", time.perf_counter() - start_time, error=repr(exc)
+                            )
+                            break
+                        self._finish(name, rows, seconds, peak, run_id, records, cache, checks)
+                        done.add(name)
+                else:
+                    for name, start_time in launch:
+                        stage = self.stages[name]
+                        running[executor.submit(_execute, stage.func, dict(stage.params))] = (name, start_time)
+                if not running:
+                    continue
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name, start_time = running.pop(future)
+                    try:
+                        rows, seconds, peak = future.result()
+                    except Exception as exc:
+                        failed = StageRecord(run_id, name, "failed", time.perf_counter() - start_time, error=repr(exc))
+                        continue
+                    self._finish(name, rows, seconds, peak, run_id, records, cache, checks)
+                    done.add(name)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+            if failed is not None:
+                records.append(failed)
+            if log_path is not None:
+                write_run_log(records, log_path)
+
+        if failed is not None:
+            raise RuntimeError(f"stage {failed.stage} failed: {failed.error}")
+        return records
+
+    def _finish(self, name, rows, seconds, peak, run_id, records, cache, checks) -> None:
+        stage = self.stages[name]
+        if cache is not None:
+            cache.record(name, checks[name], stage.outputs)
+        records.append(
+            StageRecord(run_id, name, "miss", seconds, peak_memory_mb=peak, rows=None if rows is None else int(rows))
+        )
+
+
+def write_run_log(records: Sequence[StageRecord], path: Path) -> None:
+    """Append run records to a JSON-lines log."""
+
+    log_path = Path(path)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with log_path.open("a", encoding="utf-8") as handle:
+        for record in records:
+            handle.write(json.dumps(asdict(record), ensure_ascii=False) + "\n")
+
+
+def format_records(records: Sequence[StageRecord]) -> str:
+    """Human-readable table of a run."""
+
+    lines = [f"{'stage':<10} {'status':<7} {'seconds':>8} {'peak MB':>8} {'rows':>8}"]
+    for record in records:
+        peak = f"{record.peak_memory_mb:.0f}" if record.peak_memory_mb is not None else "-"
+        rows = str(record.rows) if record.rows is not None else "-"
+        lines.append(f"{record.stage:<10} {record.status:<7} {record.seconds:8.2f} {peak:>8} {rows:>8}")
+    return "\n".join(lines)
+
+
+# --------------------------------------------------------------------------- stages
+def clean_stage(raw_path: Path, clean_path: Path, chunksize: int | None = None) -> int:
+    """Raw CSV → typed load → cleaning steps → deduplicated clean Parquet."""
+
+    if chunksize:
+        report = chunked.clean_csv_chunked(raw_path, clean_path, chunksize=chunksize)
+        return int(report["rows_written"])
+    df_raw = io.load_raw(raw_path)
+    df_clean = cleaning.handle_missingness(df_raw)
+    df_clean = cleaning.parse_dates(df_clean)
+    df_clean = cleaning.salary_prepare(df_clean)
+    df_clean = cleaning.deduplicate(df_clean)
+    io.save_processed(df_clean, clean_path)
+    return len(df_clean)
+
+
+def features_stage(
+    clean_path: Path,
+    feature_path: Path,
+    text_path: Path,
+    dataset_dir: Path | None = None,
+    incremental: bool = False,
+    workers: int = 1,
+) -> int:
+    """Clean Parquet → analytic feature table plus text table.
+
+    With ``incremental=True`` an existing feature table is extended with the
+    vacancies it does not contain yet (see ``features.update_features``).
+    ``workers > 1`` assembles the features on row partitions in that many
+    processes (see ``parallel_features.assemble_features_parallel``).
+    """
+
+    df_clean = pd.read_parquet(clean_path)
+    if incremental and Path(feature_path).exists():
+        existing = io.load_processed(feature_path)
+        df_features = features.update_features(df_clean, existing)
+        report = df_features.attrs["incremental_report"]
+        print(
+            f"update_features: {report['new_rows']} new rows, {report['reused_rows']} reused, "
+            f"salary buckets {'recomputed' if report['rebucketed'] else 'kept'}"
+        )
+    elif workers > 1:
+        df_features = parallel_features.assemble_features_parallel(df_clean, workers=workers)
+    else:
+        df_features = features.assemble_features(df_clean)
+    io.save_processed(df_features, feature_path, text_path=text_path, verbose=True)
+    if dataset_dir:
+        io.save_partitioned(df_features, dataset_dir, text_path=text_path)
+    return len(df_features)
+
+
+def market_stage(feature_path: Path, market_view_path: Path) -> int:
+    """Feature table → aggregated market view."""
+
+    market_view = market.build_market_view(pd.read_parquet(feature_path))
+    io.save_processed(market_view, market_view_path)
+    return len(market_view)
+
+
+def key_skills_stage(text_path: Path, key_skills_path: Path) -> int:
+    """Text table ``skills`` → sparse vacancy × key-skill matrix (``.npz``)."""
+
+    text = pd.read_parquet(text_path, columns=["vacancy_id", "skills"])
+    matrix = key_skills.build_key_skills(text["skills"], text["vacancy_id"])
+    matrix.save(key_skills_path)
+    return len(matrix)
+
+
+EDA_TABLES: Dict[str, Callable[[pd.DataFrame], pd.DataFrame]] = {
+    "salary_by_city_tier": eda.salary_by_city_tier,
+    "salary_by_grade": eda.salary_by_grade,
+    "salary_by_primary_role": eda.salary_by_primary_role,
+    "junior_friendly_share": eda.junior_friendly_share,
+    "salary_by_grade_and_city": eda.salary_summary_by_grade_and_city,
+}
+
+
+def eda_stage(feature_path: Path, tables_dir: Path) -> int:
+    """Feature table → EDA summary tables as CSV."""
+
+    df_features = pd.read_parquet(feature_path)
+    tables_dir = Path(tables_dir)
+    tables_dir.mkdir(parents=True, exist_ok=True)
+    for name, builder in EDA_TABLES.items():
+        builder(df_features).to_csv(tables_dir / f"{name}.csv", index=False)
+    return len(EDA_TABLES)
+
+
+FIGURES = {
+    "salary_by_grade_box": "fig_salary_by_grade_box.png",
+    "salary_by_role_box": "fig_salary_by_role_box.png",
+    "work_mode_share_by_city": "fig_work_mode_share_by_city.png",
+}
+
+
+def figures_stage(feature_path: Path, figures_dir: Path) -> int:
+    """Feature table → report figures in ``figures_dir``."""
+
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+    df_features = pd.read_parquet(feature_path)
+    for func_name in FIGURES:
+        getattr(viz, func_name)(df_features, output_dir=figures_dir)
+    return len(FIGURES)
+
+
+def default_stages(
+    chunksize: int | None = None,
+    partitioned: bool = False,
+    reports: bool = False,
+    incremental: bool = False,
+    feature_workers: int = 1,
+) -> List[Stage]:
+    """Stages of ``scripts/run_pipeline.py`` built from ``config`` paths.
+
+    The market view and the key-skill matrix are built in parallel once
+    features exist; ``reports=True`` adds the EDA table and figure stages,
+    which join them. ``incremental=True`` makes the features stage extend
+    the existing feature table, and ``feature_workers`` splits feature
+    assembly over that many processes.
+    """
+
+    raw_path = Path(config.RAW_DATA_FILE)
+    clean_path = Path(config.CLEAN_DATA_FILE)
+    feature_path = Path(config.FEATURE_DATA_FILE)
+    text_path = Path(config.FEATURE_TEXT_FILE)
+    dataset_dir = Path(config.FEATURE_DATASET_DIR) if partitioned else None
+    market_view_path = Path(config.PROCESSED_DATA_DIR) / "market_view.parquet"
+    key_skills_path = Path(config.KEY_SKILLS_FILE)
+
+    stages = [
+        Stage(
+            "clean",
+            clean_stage,
+            inputs=(raw_path,),
+            outputs=(clean_path,),
+            params={"raw_path": raw_path, "clean_path": clean_path, "chunksize": chunksize},
+            modules=(chunked, cleaning, io, schema, sketch),
+        ),
+        Stage(
+            "features",
+            features_stage,
+            inputs=(clean_path,),
+            outputs=(feature_path, text_path) + ((dataset_dir,) if dataset_dir else ()),
+            params={
+                "clean_path": clean_path,
+                "feature_path": feature_path,
+                "text_path": text_path,
+                "dataset_dir": dataset_dir,
+                "incremental": incremental,
+                "workers": feature_workers,
+            },
+            modules=(features, io, lookup, parallel_features, sketch, skill_matrix),
+        ),
+        Stage(
+            "market",
+            market_stage,
+            inputs=(feature_path,),
+            outputs=(market_view_path,),
+            params={"feature_path": feature_path, "market_view_path": market_view_path},
+            modules=(market, io, skill_matrix),
+        ),
+        Stage(
+            "key_skills",
+            key_skills_stage,
+            inputs=(text_path,),
+            outputs=(key_skills_path,),
+            params={"text_path": text_path, "key_skills_path": key_skills_path},
+            modules=(key_skills,),
+        ),
+    ]
+    if reports:
+        tables_dir = Path(config.REPORTS_DIR) / "tables"
+        figures_dir = Path(config.FIGURES_DIR)
+        stages += [
+            Stage(
+                "eda",
+                eda_stage,
+                inputs=(feature_path,),
+                outputs=tuple(tables_dir / f"{name}.csv" for name in EDA_TABLES),
+                params={"feature_path": feature_path, "tables_dir": tables_dir},
+                modules=(eda, lookup, skill_matrix),
+            ),
+            Stage(
+                "figures",
+                figures_stage,
+                inputs=(feature_path,),
+                outputs=tuple(figures_dir / filename for filename in FIGURES.values()),
+                params={"feature_path": feature_path, "figures_dir": figures_dir},
+                modules=(viz, eda, lookup, skill_matrix),
+            ),
+        ]
+    return stages
+
+
+__all__ = [
+    "Stage",
+    "StageRecord",
+    "Pipeline",
+    "default_stages",
+    "format_records",
+    "write_run_log",
+    "clean_stage",
+    "features_stage",
+    "market_stage",
+    "key_skills_stage",
+    "eda_stage",
+    "figures_stage",
+]
@@ -0,0 +1,289 @@
+"""Salary premium of skills computed over one sorted salary array.
+
+The salaries with a value are sorted once. For a skill flag taken in that
+order, the running count of flagged rows gives the rank of every flagged
+salary, so the median of the vacancies with the skill (and, from the
+complement count, without it) is found with a binary search instead of
+selecting and partitioning the salary column per skill.
+
+Bootstrap confidence intervals use the same arrays. A resample of ``m``
+salaries drawn with replacement from a sorted group has its median at the
+``k``-th smallest of ``m`` uniform draws, and that order statistic is
+``floor(m * U)`` with ``U ~ Beta(k, m + 1 - k)``. Each bootstrap median is
+therefore one Beta draw plus a rank lookup, and all skills and resamples are
+handled without materialising any resample. With- and without-skill groups
+are resampled independently (two-sample bootstrap).
+
+``stratified_skill_premium`` sorts by segment first and salary second, which
+turns every segment into a contiguous sorted run: the same running counts
+then give the medians of all segments at once.
+"""
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .skill_matrix import SkillMatrix
+
+DEFAULT_N_BOOT = 200
+DEFAULT_CI = 0.95
+
+
+def _sort_salaries(salary: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Positions of the rows with a salary in ascending salary order and the sorted values."""
+
+    values = salary.to_numpy(dtype="float64", na_value=np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    order = valid[np.argsort(values[valid], kind="stable")]
+    return order, values[order]
+
+
+def _values_at_ranks(sorted_values: np.ndarray, running: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+    """Salaries of the group members with the given 0-based ranks.
+
+    ``running`` is the cumulative member count along the sorted salaries.
+    """
+
+    return sorted_values[np.searchsorted(running, ranks + 1)]
+
+
+def _median(sorted_values: np.ndarray, running: np.ndarray, size: int) -> float:
+    if not size:
+        return np.nan
+    lower, upper = _values_at_ranks(sorted_values, running, np.array([(size - 1) // 2, size // 2]))
+    return (lower + upper) / 2
+
+
+def _bootstrap_median_ranks(size: int, n_boot: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """Ranks of the two middle values of ``n_boot`` resamples of a sorted group.
+
+    For odd ``size`` both ranks are the same.
+    """
+
+    k = (size + 1) // 2
+    lower_u = rng.beta(k, size + 1 - k, n_boot)
+    if size % 2:
+        upper_u = lower_u
+    else:
+        # the next order statistic is the minimum of the size - k draws above
+        upper_u = lower_u + (1 - lower_u) * rng.beta(1, size - k, n_boot)
+    lower = np.minimum((size * lower_u).astype(np.int64), size - 1)
+    upper = np.minimum((size * upper_u).astype(np.int64), size - 1)
+    return lower, upper
+
+
+def _bootstrap_medians(
+    sorted_values: np.ndarray, running: np.ndarray, size: int, n_boot: int, rng: np.random.Generator
+) -> np.ndarray:
+    if not size:
+        return np.full(n_boot, np.nan)
+    lower, upper = _bootstrap_median_ranks(size, n_boot, rng)
+    return (_values_at_ranks(sorted_values, running, lower) + _values_at_ranks(sorted_values, running, upper)) / 2
+
+
+def _pct(premium_abs: np.ndarray, median_without: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(median_without != 0, premium_abs / median_without, np.nan)
+
+
+def skill_premium(
+    salary: pd.Series,
+    matrix: SkillMatrix,
+    min_count: int = 30,
+    n_boot: int = DEFAULT_N_BOOT,
+    ci: float = DEFAULT_CI,
+    seed: Optional[int] = 0,
+) -> pd.DataFrame:
+    """Median salary with and without every skill of ``matrix``.
+
+    Parameters
+    ----------
+    salary : pandas.Series
+        Salary per row of ``matrix``; missing salaries are ignored.
+    matrix : SkillMatrix
+        Skill flags of the same rows.
+    min_count : int, optional
+        Skills on fewer vacancies (with or without a salary) are left out.
+    n_boot : int, optional
+        Bootstrap resamples for the confidence intervals; ``0`` skips them.
+    ci : float, optional
+        Coverage of the percentile intervals.
+    seed : int | None, optional
+        Seed of the bootstrap draws; fixed by default for reproducible tables.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per skill: ``skill``, ``median_with``, ``median_without``,
+        ``premium_abs``, ``premium_pct`` and ``count_with_skill``, plus
+        ``premium_abs_ci_low/high`` and ``premium_pct_ci_low/high`` when
+        ``n_boot > 0``.
+    """
+
+    if len(salary) != len(matrix):
+        raise ValueError("salary and skill matrix must have the same rows")
+    if not 0 < ci < 1:
+        raise ValueError("ci must be between 0 and 1")
+
+    order, sorted_values = _sort_salaries(salary)
+    n_salaries = len(order)
+    everyone = np.arange(1, n_salaries + 1)
+    counts = matrix.counts().to_numpy()
+    rng = np.random.default_rng(seed)
+    tails = [(1 - ci) / 2, (1 + ci) / 2]
+
+    result: Dict[str, list] = {key: [] for key in ("skill", "median_with", "median_without", "count_with_skill")}
+    intervals: Dict[str, list] = {
+        key: [] for key in ("premium_abs_ci_low", "premium_abs_ci_high", "premium_pct_ci_low", "premium_pct_ci_high")
+    }
+    for col, count in zip(matrix.columns, counts):
+        if count < min_count:
+            continue
+        with_running = np.cumsum(matrix.column(col)[order])
+        without_running = everyone - with_running
+        n_with = int(with_running[-1]) if n_salaries else 0
+        n_without = n_salaries - n_with
+        result["skill"].append(col)
+        result["median_with"].append(_median(sorted_values, with_running, n_with))
+        result["median_without"].append(_median(sorted_values, without_running, n_without))
+        result["count_with_skill"].append(int(count))
+        if n_boot:
+            boot_with = _bootstrap_medians(sorted_values, with_running, n_with, n_boot, rng)
+            boot_without = _bootstrap_medians(sorted_values, without_running, n_without, n_boot, rng)
+            boot_abs = boot_with - boot_without
+            boot_pct = _pct(boot_abs, boot_without)
+            with np.errstate(invalid="ignore"):
+                abs_low, abs_high = np.nanquantile(boot_abs, tails) if n_with and n_without else (np.nan, np.nan)
+                pct_low, pct_high = np.nanquantile(boot_pct, tails) if np.isfinite(boot_pct).any() else (np.nan, np.nan)
+            intervals["premium_abs_ci_low"].append(abs_low)
+            intervals["premium_abs_ci_high"].append(abs_high)
+            intervals["premium_pct_ci_low"].append(pct_low)
+            intervals["premium_pct_ci_high"].append(pct_high)
+
+    table = pd.DataFrame(
+        {
+            "skill": result["skill"],
+            "median_with": np.array(result["median_with"], dtype="float64"),
+            "median_without": np.array(result["median_without"], dtype="float64"),
+        }
+    )
+    table["premium_abs"] = table["median_with"] - table["median_without"]
+    table["premium_pct"] = _pct(table["premium_abs"].to_numpy(), table["median_without"].to_numpy())
+    table["count_with_skill"] = np.array(result["count_with_skill"], dtype=np.int64)
+    if n_boot:
+        for key, values in intervals.items():
+            table[key] = np.array(values, dtype="float64")
+    return table
+
+
+def _cell_medians(
+    sorted_values: np.ndarray, running: np.ndarray, starts: np.ndarray, sizes: np.ndarray
+) -> np.ndarray:
+    """Median of the group members inside every cell of the sorted salaries.
+
+    ``running`` is the cumulative member count with a leading zero, so the
+    members of a cell starting at ``s`` are numbered from ``running[s] + 1``.
+    """
+
+    base = running[starts]
+    lower = np.searchsorted(running, base + (sizes - 1) // 2 + 1) - 1
+    upper = np.searchsorted(running, base + sizes // 2 + 1) - 1
+    last = len(sorted_values) - 1
+    medians = (sorted_values[np.clip(lower, 0, last)] + sorted_values[np.clip(upper, 0, last)]) / 2
+    return np.where(sizes > 0, medians, np.nan)
+
+
+def stratified_skill_premium(
+    salary: pd.Series,
+    matrix: SkillMatrix,
+    cells: np.ndarray,
+    min_count: int = 30,
+    min_cell_count: int = 5,
+) -> pd.DataFrame:
+    """Skill premium within segments, averaged over segments.
+
+    Rows are sorted by cell and salary once, so every cell is a contiguous
+    sorted run and the with/without medians of all cells come from the same
+    running counts as in :func:`skill_premium`. A cell counts for a skill if
+    it has at least ``min_cell_count`` salaries both with and without the
+    skill; cell premiums are averaged with the number of salaries with the
+    skill as weights (the premium for the vacancies that ask for it).
+
+    Parameters
+    ----------
+    salary : pandas.Series
+        Salary per row of ``matrix``; missing salaries are ignored.
+    matrix : SkillMatrix
+        Skill flags of the same rows.
+    cells : numpy.ndarray
+        Segment code per row as returned by ``pd.factorize`` or
+        ``GroupBy.ngroup``; negative codes are ignored.
+    min_count : int, optional
+        Skills on fewer vacancies (with or without a salary) are left out.
+    min_cell_count : int, optional
+        Minimum salaries on each side of a cell for the cell to be used.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per skill: ``skill``, ``premium_abs``, ``premium_pct``,
+        ``count_with_skill``, ``cells_used`` and ``coverage`` (share of the
+        salaries with the skill that fall into used cells).
+    """
+
+    cells = np.asarray(cells, dtype=np.int64)
+    if len(salary) != len(matrix) or len(cells) != len(matrix):
+        raise ValueError("salary, cells and skill matrix must have the same rows")
+
+    values = salary.to_numpy(dtype="float64", na_value=np.nan)
+    rows = np.flatnonzero(~np.isnan(values) & (cells >= 0))
+    rows = rows[np.lexsort((values[rows], cells[rows]))]
+    sorted_values = values[rows]
+    sorted_cells = cells[rows]
+    n_cells = int(sorted_cells[-1]) + 1 if len(rows) else 0
+    starts = np.searchsorted(sorted_cells, np.arange(n_cells))
+    ends = np.searchsorted(sorted_cells, np.arange(n_cells), side="right")
+    everyone = np.arange(len(rows) + 1)
+    counts = matrix.counts().to_numpy()
+
+    result: Dict[str, list] = {
+        key: [] for key in ("skill", "premium_abs", "premium_pct", "count_with_skill", "cells_used", "coverage")
+    }
+    for col, count in zip(matrix.columns, counts):
+        if count < min_count:
+            continue
+        with_running = np.concatenate([[0], np.cumsum(matrix.column(col)[rows])])
+        without_running = everyone - with_running
+        n_with = with_running[ends] - with_running[starts]
+        n_without = (ends - starts) - n_with
+        median_with = _cell_medians(sorted_values, with_running, starts, n_with)
+        median_without = _cell_medians(sorted_values, without_running, starts, n_without)
+        used = (n_with >= min_cell_count) & (n_without >= min_cell_count)
+        weights = n_with[used]
+        cell_abs = (median_with - median_without)[used]
+        cell_pct = _pct(cell_abs, median_without[used])
+        has_pct = ~np.isnan(cell_pct)
+        result["skill"].append(col)
+        result["premium_abs"].append(np.average(cell_abs, weights=weights) if used.any() else np.nan)
+        result["premium_pct"].append(
+            np.average(cell_pct[has_pct], weights=weights[has_pct]) if has_pct.any() else np.nan
+        )
+        result["count_with_skill"].append(int(count))
+        result["cells_used"].append(int(used.sum()))
+        result["coverage"].append(weights.sum() / n_with.sum() if n_with.sum() else np.nan)
+
+    return pd.DataFrame(
+        {
+            "skill": result["skill"],
+            "premium_abs": np.array(result["premium_abs"], dtype="float64"),
+            "premium_pct": np.array(result["premium_pct"], dtype="float64"),
+            "count_with_skill": np.array(result["count_with_skill"], dtype=np.int64),
+            "cells_used": np.array(result["cells_used"], dtype=np.int64),
+            "coverage": np.array(result["coverage"], dtype="float64"),
+        }
+    )
+
+
+__all__ = ["DEFAULT_CI", "DEFAULT_N_BOOT", "skill_premium", "stratified_skill_premium"]
@@ -0,0 +1,232 @@
+"""Declared column types of the raw hh.ru CSV.
+
+``RAW_SCHEMA`` mirrors the field annotations of ``parser.hh_scraper.VacancyRecord``
+(``bool``/``Optional[bool]`` → ``"bool"``, ``int``/``Optional[int]`` → ``"int"``,
+floats → ``"float"``, ``str`` → ``"string"``) with two refinements from
+``docs/02_feature_dictionary_hh.md``: enumerations listed in the dictionary are
+``"category"`` and ``vacancy_id`` is the numeric id taken from the vacancy URL.
+``tests/test_schema.py`` fails when the dataclass and this mapping drift apart.
+
+Applying the schema at read time means booleans, counters and categoricals get
+their final dtypes straight from the CSV parser instead of being inferred as
+text and coerced value by value in ``cleaning``.
+"""
+from __future__ import annotations
+
+from typing import Dict
+
+# Logical types: "bool" (nullable boolean), "int", "float", "category", "string".
+# Integer columns with missing values stay float64, as with pandas inference.
+LOGICAL_TYPES = ("bool", "int", "float", "category", "string")
+
+# Closed enumerations from the feature dictionary. ``grade`` stays text: its
+# value list is open-ended and it is a group key of ``market.build_market_view``,
+# where a categorical would add every unobserved combination.
+CATEGORICAL_COLUMNS = [
+    "currency",
+    "experience",
+    "employment_type",
+    "work_format",
+    "employer_type",
+    "edu_level",
+    "lang_english_level",
+]
+
+# Timestamp columns. The CSV stores them as ISO 8601 text (dates for
+# ``published_at_iso``, UTC instants with offset for ``scraped_at_utc``);
+# ``cleaning.parse_dates`` turns them into tz-naive UTC ``datetime64`` once and
+# later steps take such columns as they are instead of parsing them again.
+DATETIME_COLUMNS = ["published_at_iso", "scraped_at_utc"]
+
+# Deviations from the VacancyRecord annotations, see the module docstring
+DICTIONARY_OVERRIDES: Dict[str, str] = {
+    "vacancy_id": "int",
+    **{col: "category" for col in CATEGORICAL_COLUMNS},
+}
+
+RAW_SCHEMA: Dict[str, str] = {
+    "vacancy_id": "int",
+    "title": "string",
+    "company": "string",
+    "salary_from": "int",
+    "salary_to": "int",
+    "currency": "category",
+    "salary_gross": "bool",
+    "salary_mid": "float",
+    "salary_range_width": "int",
+    "salary_is_exact": "bool",
+    "city": "string",
+    "address": "string",
+    "has_metro": "bool",
+    "metro_primary": "string",
+    "metro_count": "int",
+    "address_has_district": "bool",
+    "search_area_id": "int",
+    "experience": "category",
+    "exp_min_years": "int",
+    "exp_max_years": "int",
+    "exp_is_no_experience": "bool",
+    "employment_type": "category",
+    "schedule": "string",
+    "work_format_raw": "string",
+    "work_format": "category",
+    "is_remote": "bool",
+    "is_hybrid": "bool",
+    "description": "string",
+    "description_len_chars": "int",
+    "description_len_words": "int",
+    "description_bullets_count": "int",
+    "description_paragraphs_count": "int",
+    "requirements_count": "int",
+    "responsibilities_count": "int",
+    "optional_skills_count": "int",
+    "must_have_skills_count": "int",
+    "skills": "string",
+    "skills_count": "int",
+    "published_at_raw": "string",
+    "published_at_iso": "string",
+    "vacancy_age_days": "int",
+    "scraped_at_utc": "string",
+    "vacancy_code": "string",
+    "grade": "string",
+    "role_backend": "bool",
+    "role_frontend": "bool",
+    "role_fullstack": "bool",
+    "role_mobile": "bool",
+    "role_data": "bool",
+    "role_ml": "bool",
+    "role_devops": "bool",
+    "role_qa": "bool",
+    "role_manager": "bool",
+    "role_product": "bool",
+    "role_analyst": "bool",
+    "has_python": "bool",
+    "has_java": "bool",
+    "has_kotlin": "bool",
+    "has_csharp": "bool",
+    "has_cpp": "bool",
+    "has_go": "bool",
+    "has_php": "bool",
+    "has_javascript": "bool",
+    "has_typescript": "bool",
+    "has_scala": "bool",
+    "has_rust": "bool",
+    "has_ruby": "bool",
+    "has_django": "bool",
+    "has_flask": "bool",
+    "has_fastapi": "bool",
+    "has_dotnet": "bool",
+    "has_spring": "bool",
+    "has_nodejs": "bool",
+    "has_express": "bool",
+    "has_nestjs": "bool",
+    "has_react": "bool",
+    "has_vue": "bool",
+    "has_angular": "bool",
+    "has_nextjs": "bool",
+    "has_nuxt": "bool",
+    "has_svelte": "bool",
+    "has_pandas": "bool",
+    "has_numpy": "bool",
+    "has_sklearn": "bool",
+    "has_pytorch": "bool",
+    "has_tensorflow": "bool",
+    "has_airflow": "bool",
+    "has_spark": "bool",
+    "has_kafka": "bool",
+    "has_docker": "bool",
+    "has_kubernetes": "bool",
+    "has_terraform": "bool",
+    "has_ansible": "bool",
+    "has_jenkins": "bool",
+    "has_gitlab_ci": "bool",
+    "has_cicd": "bool",
+    "skill_sql": "bool",
+    "skill_excel": "bool",
+    "skill_powerbi": "bool",
+    "skill_tableau": "bool",
+    "skill_clickhouse": "bool",
+    "skill_bigquery": "bool",
+    "skill_r": "bool",
+    "skill_airflow": "bool",
+    "skill_ab_testing": "bool",
+    "skill_product_metrics": "bool",
+    "core_data_skills_count": "int",
+    "ml_stack_count": "int",
+    "tech_stack_size": "int",
+    "benefit_dms": "bool",
+    "benefit_insurance": "bool",
+    "benefit_sick_leave_paid": "bool",
+    "benefit_vacation_paid": "bool",
+    "benefit_relocation": "bool",
+    "benefit_sport": "bool",
+    "benefit_education": "bool",
+    "benefit_remote_compensation": "bool",
+    "benefit_stock": "bool",
+    "vacancy_url": "string",
+    "employer_url": "string",
+    "employer_rating": "float",
+    "employer_reviews_count": "int",
+    "employer_has_remote": "bool",
+    "employer_has_flexible_schedule": "bool",
+    "employer_has_med_insurance": "bool",
+    "employer_has_education": "bool",
+    "employer_accredited_it": "bool",
+    "employer_type": "category",
+    "edu_required": "bool",
+    "edu_level": "category",
+    "edu_technical": "bool",
+    "edu_math_or_cs": "bool",
+    "lang_english_required": "bool",
+    "lang_english_level": "category",
+    "lang_other_count": "int",
+    "is_for_juniors": "bool",
+    "allows_students": "bool",
+    "has_mentoring": "bool",
+    "has_test_task": "bool",
+    "soft_communication": "bool",
+    "soft_teamwork": "bool",
+    "soft_leadership": "bool",
+    "soft_result_oriented": "bool",
+    "soft_structured_thinking": "bool",
+    "soft_critical_thinking": "bool",
+    "domain_finance": "bool",
+    "domain_ecommerce": "bool",
+    "domain_telecom": "bool",
+    "domain_state": "bool",
+    "domain_retail": "bool",
+    "domain_it_product": "bool",
+}
+
+
+def arrow_column_types(schema: Dict[str, str] | None = None) -> Dict[str, "pa.DataType"]:
+    """Return pyarrow CSV ``column_types`` for a logical schema.
+
+    ``"int"`` columns are parsed as float64 because pandas writes integer
+    columns with missing values as ``77000.0``; ``io.load_raw`` casts the
+    complete ones back to int64.
+    """
+
+    import pyarrow as pa
+
+    mapping = {
+        "bool": pa.bool_(),
+        "int": pa.float64(),
+        "float": pa.float64(),
+        "category": pa.dictionary(pa.int32(), pa.string()),
+        "string": pa.string(),
+    }
+    schema = RAW_SCHEMA if schema is None else schema
+    unknown = sorted(set(schema.values()) - set(mapping))
+    if unknown:
+        raise ValueError(f"unknown logical types in schema: {unknown}")
+    return {col: mapping[kind] for col, kind in schema.items()}
+
+
+__all__ = [
+    "LOGICAL_TYPES",
+    "CATEGORICAL_COLUMNS",
+    "DICTIONARY_OVERRIDES",
+    "RAW_SCHEMA",
+    "arrow_column_types",
+]
@@ -0,0 +1,205 @@
+"""Mergeable quantile sketches for salary statistics.
+
+``KLLSketch`` implements the KLL streaming quantile sketch (Karnin, Lang,
+Liberty, 2016). It keeps a hierarchy of compactors: level ``h`` holds items of
+weight ``2**h``, and a full level is sorted and every other item (random
+offset) is promoted to the next level. Memory stays ``O(k)`` regardless of the
+stream length, sketches built on different partitions or snapshots can be
+merged, and quantile queries have a normalized rank error of roughly
+``rank_error`` with high probability.
+"""
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_K = 2000
+
+
+class KLLSketch:
+    """Mergeable quantile sketch over float values (NaN values are ignored).
+
+    Parameters
+    ----------
+    k : int, optional
+        Accuracy parameter: capacity of the top compactor. Larger ``k`` means
+        a smaller rank error and a proportionally larger sketch.
+    seed : int | None, optional
+        Seed for the compaction coin flips; fixed by default so that runs are
+        reproducible.
+    """
+
+    _C = 2.0 / 3.0
+
+    def __init__(self, k: int = DEFAULT_K, seed: int | None = 0) -> None:
+        if k < 8:
+            raise ValueError("KLLSketch requires k >= 8")
+        self.k = k
+        self.seed = seed
+        self._rng = np.random.default_rng(seed)
+        self._levels: List[np.ndarray] = [np.empty(0, dtype="float64")]
+        self.n = 0
+        self.min = math.nan
+        self.max = math.nan
+
+    # ------------------------------------------------------------------ sizing
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return int(math.ceil(self.k * self._C**depth)) + 1
+
+    @property
+    def _max_size(self) -> int:
+        return sum(self._capacity(level) for level in range(len(self._levels)))
+
+    @property
+    def _size(self) -> int:
+        return sum(len(level) for level in self._levels)
+
+    @property
+    def rank_error(self) -> float:
+        """Approximate normalized rank error bound (99% confidence)."""
+
+        return 2.296 / self.k**0.9723
+
+    # ----------------------------------------------------------------- updates
+    def update(self, values: Iterable[float] | float) -> "KLLSketch":
+        """Add one value or a batch of values to the sketch."""
+
+        arr = np.asarray(values, dtype="float64").ravel()
+        arr = arr[~np.isnan(arr)]
+        if not len(arr):
+            return self
+        self.n += len(arr)
+        self.min = float(np.nanmin([self.min, arr.min()]))
+        self.max = float(np.nanmax([self.max, arr.max()]))
+        self._levels[0] = np.concatenate([self._levels[0], arr])
+        self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """Merge another sketch into this one in place and return ``self``."""
+
+        if other.n == 0:
+            return self
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0, dtype="float64"))
+        for level, items in enumerate(other._levels):
+            self._levels[level] = np.concatenate([self._levels[level], items])
+        self.n += other.n
+        self.min = float(np.nanmin([self.min, other.min]))
+        self.max = float(np.nanmax([self.max, other.max]))
+        self._compress()
+        return self
+
+    def _compress(self) -> None:
+        while self._size >= self._max_size:
+            for level in range(len(self._levels)):
+                items = self._levels[level]
+                if len(items) < self._capacity(level):
+                    continue
+                if level + 1 == len(self._levels):
+                    self._levels.append(np.empty(0, dtype="float64"))
+                items = np.sort(items)
+                leftover = items[-1:] if len(items) % 2 else items[:0]
+                paired = items[: len(items) - len(leftover)]
+                promoted = paired[int(self._rng.integers(2)) :: 2]
+                self._levels[level] = leftover
+                self._levels[level + 1] = np.concatenate([self._levels[level + 1], promoted])
+                if self._size < self._max_size:
+                    break
+
+    # ----------------------------------------------------------------- queries
+    def _weighted_items(self) -> tuple[np.ndarray, np.ndarray]:
+        items = np.concatenate(self._levels)
+        weights = np.concatenate(
+            [np.full(len(level), 2**h, dtype="float64") for h, level in enumerate(self._levels)]
+        )
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs: Sequence[float] | float) -> np.ndarray:
+        """Return approximate quantiles for probabilities in ``[0, 1]``."""
+
+        probs = np.atleast_1d(np.asarray(qs, dtype="float64"))
+        if self.n == 0:
+            return np.full(len(probs), np.nan)
+        if len(self._levels) == 1:
+            # nothing compacted yet: answer exactly, interpolating like pandas
+            return np.quantile(self._levels[0], np.clip(probs, 0, 1))
+        items, cum_weights = self._weighted_items()
+        targets = probs * cum_weights[-1]
+        idx = np.clip(np.searchsorted(cum_weights, targets, side="left"), 0, len(items) - 1)
+        result = items[idx]
+        result[probs <= 0] = self.min
+        result[probs >= 1] = self.max
+        return result
+
+    def quantile(self, q: float) -> float:
+        return float(self.quantiles([q])[0])
+
+    def rank(self, values: Sequence[float] | float) -> np.ndarray:
+        """Return the approximate share of values ``<=`` each of ``values``."""
+
+        vals = np.atleast_1d(np.asarray(values, dtype="float64"))
+        if self.n == 0:
+            return np.full(len(vals), np.nan)
+        items, cum_weights = self._weighted_items()
+        idx = np.searchsorted(items, vals, side="right")
+        below = np.where(idx > 0, cum_weights[np.maximum(idx - 1, 0)], 0.0)
+        return below / cum_weights[-1]
+
+    # ----------------------------------------------------------- persistence
+    def to_dict(self) -> Dict[str, object]:
+        """Serialize the sketch into JSON-friendly primitives."""
+
+        return {
+            "k": self.k,
+            "seed": self.seed,
+            "n": self.n,
+            "min": self.min,
+            "max": self.max,
+            "levels": [level.tolist() for level in self._levels],
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, object]) -> "KLLSketch":
+        sketch = cls(k=int(payload["k"]), seed=payload.get("seed"))
+        sketch._levels = [np.asarray(level, dtype="float64") for level in payload["levels"]]
+        sketch.n = int(payload["n"])
+        sketch.min = float(payload["min"])
+        sketch.max = float(payload["max"])
+        return sketch
+
+    @classmethod
+    def from_values(cls, values: Iterable[float], k: int = DEFAULT_K, seed: int | None = 0) -> "KLLSketch":
+        return cls(k=k, seed=seed).update(np.asarray(values, dtype="float64"))
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __repr__(self) -> str:
+        return f"KLLSketch(k={self.k}, n={self.n}, retained={self._size})"
+
+
+def sketch_series(series: pd.Series, k: int = DEFAULT_K, seed: int | None = 0) -> KLLSketch:
+    """Build a sketch from a numeric series, ignoring missing values."""
+
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype="float64")
+    return KLLSketch.from_values(values, k=k, seed=seed)
+
+
+def merge_sketches(sketches: Iterable[KLLSketch]) -> KLLSketch:
+    """Merge several sketches (e.g. per partition or per snapshot) into a new one."""
+
+    merged: KLLSketch | None = None
+    for sketch in sketches:
+        if merged is None:
+            merged = KLLSketch(k=sketch.k, seed=sketch.seed)
+        merged.merge(sketch)
+    return merged if merged is not None else KLLSketch()
+
+
+__all__ = ["DEFAULT_K", "KLLSketch", "sketch_series", "merge_sketches"]
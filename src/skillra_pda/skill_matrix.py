@@ -0,0 +1,254 @@
+"""Bit-packed vacancy × flag matrix for skill and segment counts.
+
+Skill analyses only ever ask how many vacancies carry a flag, overall or
+inside a segment. ``SkillMatrix`` converts the flag columns once (``NA``
+counts as ``False``) and stores every flag as a bitset over the vacancies in
+``uint64`` words, one bit per row instead of the byte a ``bool`` column
+needs. Counts are popcounts of those words and segment counts are popcounts
+of ``flag & segment``.
+"""
+from __future__ import annotations
+
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+WORD_BITS = 64
+
+if hasattr(np, "bitwise_count"):  # numpy >= 2.0
+
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(words)
+
+else:
+    _BYTE_COUNTS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(words: np.ndarray) -> np.ndarray:
+        as_bytes = np.ascontiguousarray(words).view(np.uint8)
+        return _BYTE_COUNTS[as_bytes].reshape(words.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+
+def _flag_values(series: pd.Series) -> np.ndarray:
+    """``series.fillna(False).astype(bool)`` as a NumPy array."""
+
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return series.to_numpy(dtype=bool, na_value=False)
+    return series.fillna(False).astype(bool).to_numpy()
+
+
+def _pack(mask: np.ndarray, n_words: int) -> np.ndarray:
+    """Pack boolean row masks (last axis) into ``n_words`` little-endian ``uint64`` words."""
+
+    packed = np.zeros(mask.shape[:-1] + (n_words * 8,), dtype=np.uint8)
+    as_bytes = np.packbits(mask, axis=-1, bitorder="little")
+    packed[..., : as_bytes.shape[-1]] = as_bytes
+    return packed.view("<u8").astype(np.uint64, copy=False)
+
+
+class SkillMatrix:
+    """Vacancies × flags packed into ``uint64`` bitsets.
+
+    Build it once with :meth:`from_frame` and pass it to the skill analyses
+    (``features.compute_skill_premium``, ``eda.skill_share_by_grade``,
+    ``personas.build_skill_demand_profile``) that run on the same frame;
+    ``market.build_market_view`` counts its segments with one as well. The
+    matrix is a snapshot: rebuild it after changing the flag columns.
+
+    Parameters
+    ----------
+    bits : numpy.ndarray
+        ``uint64`` array of shape ``(len(columns), ceil(n_rows / 64))``; bit
+        ``i`` of word ``w`` is row ``64 * w + i``.
+    columns : Sequence[str]
+        Flag names, one per row of ``bits``.
+    index : pandas.Index
+        Row labels of the source frame.
+
+    Examples
+    --------
+    >>> matrix = SkillMatrix.from_frame(df, ["skill_sql", "skill_python"])
+    >>> matrix.shares(rows=(df["grade"] == "junior").to_numpy())
+    """
+
+    def __init__(self, bits: np.ndarray, columns: Sequence[str], index: pd.Index) -> None:
+        n_words = -(-len(index) // WORD_BITS)
+        if bits.shape != (len(columns), n_words):
+            raise ValueError(f"expected bits of shape {(len(columns), n_words)}, got {bits.shape}")
+        self.bits = bits
+        self.columns: List[str] = list(columns)
+        self.index = index
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: Iterable[str], errors: str = "raise") -> "SkillMatrix":
+        """Pack ``columns`` of ``df``, treating missing values as ``False``.
+
+        With ``errors="ignore"`` columns that are absent or cannot be cast to
+        ``bool`` are left out instead of raising.
+        """
+
+        if errors not in {"raise", "ignore"}:
+            raise ValueError("errors must be 'raise' or 'ignore'")
+        n_words = -(-len(df) // WORD_BITS)
+        packed: List[np.ndarray] = []
+        names: List[str] = []
+        for col in columns:
+            try:
+                values = _flag_values(df[col])
+            except (KeyError, TypeError, ValueError):
+                if errors == "raise":
+                    raise
+                continue
+            packed.append(_pack(values, n_words))
+            names.append(col)
+        bits = np.vstack(packed) if packed else np.zeros((0, n_words), dtype=np.uint64)
+        return cls(bits, names, df.index)
+
+    @classmethod
+    def for_frame(
+        cls,
+        df: pd.DataFrame,
+        columns: Sequence[str],
+        matrix: Optional["SkillMatrix"] = None,
+        errors: str = "raise",
+    ) -> "SkillMatrix":
+        """Reuse ``matrix`` if it was built for ``df`` and holds ``columns``, else pack them."""
+
+        if matrix is not None and matrix.index.equals(df.index) and set(columns) <= set(matrix.columns):
+            return matrix.select(columns=columns)
+        return cls.from_frame(df, columns, errors=errors)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __repr__(self) -> str:
+        return f"SkillMatrix({len(self)} rows x {len(self.columns)} flags, {self.nbytes} bytes)"
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.bits.nbytes)
+
+    def _positions(self, columns: Iterable[str]) -> List[int]:
+        lookup = {col: i for i, col in enumerate(self.columns)}
+        missing = [col for col in columns if col not in lookup]
+        if missing:
+            raise KeyError(f"flags not in the matrix: {missing}")
+        return [lookup[col] for col in columns]
+
+    def _row_words(self, rows: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        if rows is None:
+            return None
+        rows = np.asarray(rows, dtype=bool)
+        if rows.shape != (len(self),):
+            raise ValueError(f"expected a boolean row mask of length {len(self)}")
+        return _pack(rows, self.bits.shape[1])
+
+    def _unpack(self, words: np.ndarray) -> np.ndarray:
+        as_bytes = np.ascontiguousarray(words).astype("<u8", copy=False).view(np.uint8)
+        return np.unpackbits(as_bytes, count=len(self), bitorder="little").astype(bool)
+
+    def column(self, name: str) -> np.ndarray:
+        """Boolean row mask of one flag."""
+
+        return self._unpack(self.bits[self._positions([name])[0]])
+
+    def all_of(self, columns: Iterable[str]) -> np.ndarray:
+        """Rows that carry every flag in ``columns``."""
+
+        return self._unpack(np.bitwise_and.reduce(self.bits[self._positions(columns)], axis=0))
+
+    def any_of(self, columns: Iterable[str]) -> np.ndarray:
+        """Rows that carry at least one flag in ``columns``."""
+
+        return self._unpack(np.bitwise_or.reduce(self.bits[self._positions(columns)], axis=0))
+
+    def counts(self, rows: Optional[np.ndarray] = None) -> pd.Series:
+        """Number of rows with each flag, optionally only inside the ``rows`` mask."""
+
+        bits = self.bits
+        segment = self._row_words(rows)
+        if segment is not None:
+            bits = bits & segment
+        totals = _popcount(bits).sum(axis=1, dtype=np.int64)
+        return pd.Series(totals, index=pd.Index(self.columns), dtype="int64")
+
+    def shares(self, rows: Optional[np.ndarray] = None) -> pd.Series:
+        """Share of rows with each flag; ``NaN`` for an empty segment."""
+
+        total = len(self) if rows is None else int(np.count_nonzero(rows))
+        counts = self.counts(rows)
+        if not total:
+            return counts.astype(float) * np.nan
+        return counts / total
+
+    def cooccurrence(self) -> pd.DataFrame:
+        """Flag × flag counts of rows carrying both flags (diagonal: flag counts)."""
+
+        n_flags = len(self.columns)
+        result = np.zeros((n_flags, n_flags), dtype=np.int64)
+        for i in range(n_flags):
+            result[i, i:] = _popcount(self.bits[i:] & self.bits[i]).sum(axis=1, dtype=np.int64)
+            result[i:, i] = result[i, i:]
+        return pd.DataFrame(result, index=pd.Index(self.columns), columns=pd.Index(self.columns))
+
+    def select(
+        self, rows: Optional[np.ndarray] = None, columns: Optional[Sequence[str]] = None
+    ) -> "SkillMatrix":
+        """Sub-matrix of a boolean mask or integer positions of rows and of flags."""
+
+        bits = self.bits if columns is None else self.bits[self._positions(columns)]
+        names = self.columns if columns is None else list(columns)
+        if rows is None:
+            return SkillMatrix(bits, names, self.index)
+        rows = np.asarray(rows)
+        positions = np.flatnonzero(rows) if rows.dtype == bool else rows
+        n_words = -(-len(positions) // WORD_BITS)
+        selected = np.zeros((len(names), n_words), dtype=np.uint64)
+        for i in range(len(names)):
+            selected[i] = _pack(self._unpack(bits[i])[positions], n_words)
+        return SkillMatrix(selected, names, self.index[positions])
+
+    def split(self, codes: np.ndarray, n_groups: Optional[int] = None) -> List["SkillMatrix"]:
+        """One sub-matrix per group code (rows with a negative code are dropped).
+
+        The flags are unpacked once and sorted by group, so splitting into many
+        segments costs about as much as one :meth:`select`.
+        """
+
+        codes = np.asarray(codes, dtype=np.int64)
+        if codes.shape != (len(self),):
+            raise ValueError(f"expected {len(self)} group codes")
+        if n_groups is None:
+            n_groups = int(codes.max()) + 1 if len(codes) else 0
+        in_group = np.flatnonzero(codes >= 0)
+        order = in_group[np.argsort(codes[in_group], kind="stable")]
+        bounds = np.searchsorted(codes[order], np.arange(n_groups + 1))
+        dense = np.empty((len(self.columns), len(order)), dtype=bool)
+        for i in range(len(self.columns)):
+            dense[i] = self._unpack(self.bits[i])[order]
+        parts = []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            bits = _pack(dense[:, start:end], -(-(end - start) // WORD_BITS))
+            parts.append(SkillMatrix(bits, self.columns, self.index[order[start:end]]))
+        return parts
+
+    def group_counts(self, codes: np.ndarray, n_groups: Optional[int] = None) -> np.ndarray:
+        """Rows with each flag per group, shape ``(n_groups, flags)``.
+
+        ``codes`` are group numbers per row as returned by ``pd.factorize``;
+        rows with a negative code belong to no group.
+        """
+
+        codes = np.asarray(codes, dtype=np.int64)
+        if codes.shape != (len(self),):
+            raise ValueError(f"expected {len(self)} group codes")
+        if n_groups is None:
+            n_groups = int(codes.max()) + 1 if len(codes) else 0
+        in_group = codes >= 0
+        result = np.zeros((n_groups, len(self.columns)), dtype=np.int64)
+        for i in range(len(self.columns)):
+            result[:, i] = np.bincount(codes[self._unpack(self.bits[i]) & in_group], minlength=n_groups)
+        return result
+
+
+__all__ = ["SkillMatrix", "WORD_BITS"]
@@ -0,0 +1,161 @@
+"""Content-hash caching of pipeline stages.
+
+A stage is skipped when its key — a hash of the input files' contents, the
+source of the stage function and of the modules it depends on, and the stage
+parameters — matches the key recorded when its outputs were last written and
+those outputs still exist. Input files are re-hashed only when their size or
+mtime changed since the previous run.
+"""
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Dict, Iterable, List, Mapping, Sequence, Union
+
+PathLike = Union[str, Path]
+
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+def hash_file(path: PathLike) -> str:
+    """Return the SHA-256 of a file (or of all files under a directory)."""
+
+    source = Path(path)
+    digest = hashlib.sha256()
+    files = sorted(p for p in source.rglob("*") if p.is_file()) if source.is_dir() else [source]
+    for file_path in files:
+        digest.update(str(file_path.relative_to(source) if source.is_dir() else "").encode())
+        with file_path.open("rb") as handle:
+            for block in iter(lambda: handle.read(_HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def source_hash(func: Callable, modules: Iterable[ModuleType] = ()) -> str:
+    """Hash the source of ``func`` and of the modules it relies on."""
+
+    digest = hashlib.sha256(inspect.getsource(func).encode())
+    for module in sorted(modules, key=lambda m: m.__name__):
+        digest.update(module.__name__.encode())
+        digest.update(inspect.getsource(module).encode())
+    return digest.hexdigest()
+
+
+def _stat_signature(path: Path) -> List[int]:
+    if path.is_dir():
+        stats = [p.stat() for p in path.rglob("*") if p.is_file()]
+        return [len(stats), sum(s.st_size for s in stats), max((s.st_mtime_ns for s in stats), default=0)]
+    stat = path.stat()
+    return [1, stat.st_size, stat.st_mtime_ns]
+
+
+@dataclass
+class CacheCheck:
+    """Result of looking a stage up in the cache."""
+
+    key: str
+    hit: bool
+    input_hashes: Dict[str, Dict]
+
+
+class StageCache:
+    """Skip pipeline stages whose inputs, code and parameters did not change.
+
+    Parameters
+    ----------
+    cache_dir : PathLike
+        Directory for the per-stage manifests (small JSON files). The cached
+        data itself are the stage outputs, wherever the stage writes them.
+    enabled : bool, optional
+        With ``False`` every stage runs, but manifests are still refreshed.
+    """
+
+    def __init__(self, cache_dir: PathLike, enabled: bool = True) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+
+    def _manifest_path(self, name: str) -> Path:
+        return self.cache_dir / f"{name}.json"
+
+    def _read_manifest(self, name: str) -> Dict[str, object]:
+        path = self._manifest_path(name)
+        if not path.exists():
+            return {}
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return {}
+
+    def _input_hashes(self, inputs: Sequence[PathLike], previous: Mapping[str, object]) -> Dict[str, Dict]:
+        known = previous.get("inputs", {}) if isinstance(previous, dict) else {}
+        hashes: Dict[str, Dict] = {}
+        for item in inputs:
+            path = Path(item)
+            if not path.exists():
+                raise FileNotFoundError(path)
+            signature = _stat_signature(path)
+            cached = known.get(str(path))
+            if cached and cached.get("stat") == signature:
+                hashes[str(path)] = cached
+            else:
+                hashes[str(path)] = {"stat": signature, "sha256": hash_file(path)}
+        return hashes
+
+    def stage_key(
+        self,
+        name: str,
+        func: Callable,
+        input_hashes: Mapping[str, Mapping[str, object]],
+        params: Mapping[str, object] | None = None,
+        modules: Iterable[ModuleType] = (),
+    ) -> str:
+        """Combine stage name, code, input contents and parameters into one key."""
+
+        payload = {
+            "stage": name,
+            "code": source_hash(func, modules),
+            "inputs": sorted(str(entry["sha256"]) for entry in input_hashes.values()),
+            "params": {key: str(value) for key, value in sorted((params or {}).items())},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def check(
+        self,
+        name: str,
+        func: Callable,
+        inputs: Sequence[PathLike],
+        outputs: Sequence[PathLike],
+        params: Mapping[str, object] | None = None,
+        modules: Iterable[ModuleType] = (),
+    ) -> CacheCheck:
+        """Compute the stage key and whether the recorded outputs are still valid."""
+
+        previous = self._read_manifest(name)
+        input_hashes = self._input_hashes(inputs, previous)
+        key = self.stage_key(name, func, input_hashes, params=params, modules=modules)
+        hit = (
+            self.enabled
+            and previous.get("key") == key
+            and all(Path(path).exists() for path in outputs)
+        )
+        if hit and previous.get("inputs") != input_hashes:
+            # same contents under a new mtime: remember the stat to skip hashing next time
+            self._write_manifest(name, {**previous, "inputs": input_hashes})
+        return CacheCheck(key=key, hit=bool(hit), input_hashes=input_hashes)
+
+    def record(self, name: str, check: CacheCheck, outputs: Sequence[PathLike]) -> None:
+        """Store the manifest of a stage whose outputs were just written."""
+
+        manifest = {"key": check.key, "inputs": check.input_hashes, "outputs": [str(p) for p in outputs]}
+        self._write_manifest(name, manifest)
+
+    def _write_manifest(self, name: str, manifest: Mapping[str, object]) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._manifest_path(name).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+
+__all__ = ["CacheCheck", "StageCache", "hash_file", "source_hash"]
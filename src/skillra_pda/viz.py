@@ -27,10 +27,12 @@ def _ordered_categories(categories: Iterable[str], order: Sequence[str]) -> list
     return ordered + remaining
 
 
-def _save_fig(fig: plt.Figure, filename: str | Path, close: bool = True) -> Path:
-    FIGURES_DIR.mkdir(parents=True, exist_ok=True)
+def _save_fig(
+    fig: plt.Figure, filename: str | Path, close: bool = True, output_dir: str | Path | None = None
+) -> Path:
     filename_path = Path(filename)
-    output = filename_path if filename_path.is_absolute() else FIGURES_DIR / filename_path
+    output = filename_path if filename_path.is_absolute() else Path(output_dir or FIGURES_DIR) / filename_path
+    output.parent.mkdir(parents=True, exist_ok=True)
     fig.tight_layout()
     fig.savefig(output, dpi=200)
     if close:
@@ -71,8 +73,10 @@ def _format_filters(filters_used: dict[str, object] | None) -> str:
     return "Фильтры: " + "; ".join(parts)
 
 
-def _finalize_figure(fig: plt.Figure, filename: str | Path, return_fig: bool = False):
-    path = _save_fig(fig, filename, close=not return_fig)
+def _finalize_figure(
+    fig: plt.Figure, filename: str | Path, return_fig: bool = False, output_dir: str | Path | None = None
+):
+    path = _save_fig(fig, filename, close=not return_fig, output_dir=output_dir)
     if return_fig:
         return fig, path
     return path
@@ -85,7 +89,10 @@ def _require_columns(df: pd.DataFrame, cols: Iterable[str], func_name: str) -> N
 
 
 def salary_by_grade_box(
-    df: pd.DataFrame, salary_col: str = "salary_mid_rub_capped", return_fig: bool = False
+    df: pd.DataFrame,
+    salary_col: str = "salary_mid_rub_capped",
+    return_fig: bool = False,
+    output_dir: str | Path | None = None,
 ):
     _require_columns(df, ["grade", salary_col], "salary_by_grade_box")
     df_local = df.copy()
@@ -98,7 +105,7 @@ def salary_by_grade_box(
     ax.set_xlabel("Грейд")
     ax.set_ylabel("Зарплата (RUB, с каппингом)")
     fig.suptitle("")
-    return _finalize_figure(fig, "fig_salary_by_grade_box.png", return_fig)
+    return _finalize_figure(fig, "fig_salary_by_grade_box.png", return_fig, output_dir)
 
 
 def salary_by_role_box(
@@ -106,6 +113,7 @@ def salary_by_role_box(
     salary_col: str = "salary_mid_rub_capped",
     top_n: int = 8,
     return_fig: bool = False,
+    output_dir: str | Path | None = None,
 ):
     _require_columns(df, ["primary_role", salary_col], "salary_by_role_box")
     top_roles = df["primary_role"].value_counts().head(top_n).index
@@ -116,7 +124,7 @@ def salary_by_role_box(
     ax.set_xlabel("Роль")
     ax.set_ylabel("Зарплата (RUB, с каппингом)")
     fig.suptitle("")
-    return _finalize_figure(fig, "fig_salary_by_role_box.png", return_fig)
+    return _finalize_figure(fig, "fig_salary_by_role_box.png", return_fig, output_dir)
 
 
 def salary_by_grade_city_heatmap(
@@ -143,7 +151,9 @@ def salary_by_grade_city_heatmap(
     return _finalize_figure(fig, "fig_salary_by_grade_city_heatmap.png", return_fig)
 
 
-def work_mode_share_by_city(df: pd.DataFrame, return_fig: bool = False):
+def work_mode_share_by_city(
+    df: pd.DataFrame, return_fig: bool = False, output_dir: str | Path | None = None
+):
     _require_columns(df, ["city_tier", "work_mode"], "work_mode_share_by_city")
     df_local = df.copy()
     df_local["work_mode"] = pd.Categorical(
@@ -157,7 +167,7 @@ def work_mode_share_by_city(df: pd.DataFrame, return_fig: bool = False):
     ax.set_xlabel("Тип города")
     ax.set_title("Формат работы по типу города")
     ax.legend(title="Формат", bbox_to_anchor=(1.05, 1), loc="upper left")
-    return _finalize_figure(fig, "fig_work_mode_share_by_city.png", return_fig)
+    return _finalize_figure(fig, "fig_work_mode_share_by_city.png", return_fig, output_dir)
 
 
 def salary_by_role_work_mode_heatmap(
@@ -0,0 +1,56 @@
+"""Unit tests for skill co-occurrence and association rules."""
+
+import pandas as pd
+
+from src.skillra_pda import associations
+
+
+def _frame():
+    return pd.DataFrame(
+        {
+            "primary_role": ["de"] * 4 + ["ds"] * 4,
+            "skill_airflow": [True, True, True, False, False, False, True, False],
+            "skill_spark": [True, True, False, False, False, False, True, True],
+            "has_python": [True, True, True, True, True, True, True, pd.NA],
+        }
+    ).astype({"has_python": "boolean"})
+
+
+def test_skill_pairs_metrics_and_segments():
+    df = _frame()
+
+    pairs = associations.skill_pairs(df).set_index(["antecedent", "consequent"])
+
+    airflow_spark = pairs.loc[("skill_airflow", "skill_spark")]
+    assert airflow_spark["n_both"] == 3
+    assert airflow_spark["support"] == 3 / 8
+    assert airflow_spark["confidence"] == 3 / 4
+    assert airflow_spark["lift"] == (3 / 4) / (4 / 8)
+    assert airflow_spark["jaccard"] == 3 / 5
+    assert pairs.loc[("skill_spark", "skill_airflow"), "confidence"] == 3 / 4
+
+    by_role = associations.skill_pairs(df, by="primary_role", min_rows=1)
+    ds = by_role[(by_role["primary_role"] == "ds") & (by_role["antecedent"] == "skill_spark")]
+    assert ds.set_index("consequent").loc["skill_airflow", "confidence"] == 1 / 2
+    assert associations.skill_pairs(df, by="primary_role", min_rows=5).empty
+
+
+def test_skill_rules_mine_bundles_above_thresholds():
+    df = _frame()
+
+    rules = associations.skill_rules(df, min_support=0.25, min_confidence=0.9)
+
+    bundle = rules[rules["antecedent"] == ("skill_airflow", "skill_spark")].iloc[0]
+    assert bundle["consequent"] == "has_python"
+    assert bundle["n_rule"] == 3 and bundle["confidence"] == 1.0
+    assert rules["confidence"].min() >= 0.9
+    assert rules["support"].min() >= 0.25
+
+
+def test_skill_rules_keep_bundles_exactly_at_min_support():
+    together = [True] * 7 + [False] * 93  # support 0.07, and 0.07 * 100 > 7 in floating point
+    df = pd.DataFrame({"skill_sql": together, "skill_python": together})
+
+    rules = associations.skill_rules(df, min_support=0.07, min_confidence=0.5)
+
+    assert len(rules) == 2 and (rules["n_rule"] == 7).all()
@@ -0,0 +1,48 @@
+"""Unit tests for out-of-core chunked cleaning."""
+
+import pandas as pd
+
+from src.skillra_pda import chunked, cleaning
+
+
+def test_clean_csv_chunked_matches_in_memory_cleaning(tmp_path):
+    raw = pd.DataFrame(
+        {
+            "vacancy_id": [1, 2, 3, 1, 4, 5],
+            "salary_mid": [100000, 250000, None, 120000, 90000, 5000],
+            "currency": ["RUB", "RUB", None, "RUB", "USD", "RUB"],
+            "salary_gross": ["True", "unknown", "False", "True", None, "no"],
+            "has_python": [True, False, True, True, None, False],
+            "grade": ["junior", None, "senior", "junior", "не указано", "middle"],
+            "mostly_empty": [None, None, None, None, None, "x"],
+            "scraped_at_utc": [
+                "2025-11-01T10:00:00+00:00",
+                "2025-11-01T10:00:00+00:00",
+                "2025-11-01T10:00:00+00:00",
+                "2025-11-05T10:00:00+00:00",
+                "2025-11-05T10:00:00+00:00",
+                "2025-11-05T10:00:00+00:00",
+            ],
+            "published_at_iso": ["2025-10-30"] * 6,
+        }
+    )
+    raw_path = tmp_path / "raw.csv"
+    raw.to_csv(raw_path, index=False)
+
+    expected = cleaning.handle_missingness(pd.read_csv(raw_path), drop_threshold=0.8)
+    expected = cleaning.deduplicate(cleaning.salary_prepare(cleaning.parse_dates(expected)))
+
+    report = chunked.clean_csv_chunked(
+        raw_path, tmp_path / "clean.parquet", chunksize=2, drop_threshold=0.8, salary_method="exact"
+    )
+    result = pd.read_parquet(tmp_path / "clean.parquet")
+
+    assert report["deduplicated_rows"] == 1
+    assert report["dropped_cols"] == ["mostly_empty"]
+    assert sorted(result["vacancy_id"]) == sorted(expected["vacancy_id"])
+    assert result.loc[result["vacancy_id"] == 1, "salary_mid"].item() == 120000
+    assert str(result["salary_gross"].dtype) == "boolean"
+    pd.testing.assert_series_equal(
+        result.sort_values("vacancy_id")["salary_mid_rub_capped"].reset_index(drop=True),
+        expected.sort_values("vacancy_id")["salary_mid_rub_capped"].reset_index(drop=True),
+    )
@@ -19,3 +19,51 @@ def test_ensure_salary_gross_boolean_converts_and_preserves_columns():
     assert str(result["salary_gross"].dtype) == "boolean"
     pd.testing.assert_series_equal(result["salary_from"], df["salary_from"], check_names=False)
     assert list(result["salary_gross"].astype(object)) == [True, False, pd.NA, True, False]
+
+
+def test_profile_columns_counts_nulls_markers_and_bool_likeness():
+    df = pd.DataFrame(
+        {
+            "flag": pd.Series(["yes", "no", "unknown", None, "True"], dtype=object),
+            "city": pd.Series(["Москва", "не указано", "Казань", None, "Москва"], dtype=object),
+            "metro_count": [0, 1, 1, 0, None],
+        }
+    )
+
+    profiles = cleaning.profile_columns(df, n_jobs=2)
+
+    assert profiles["flag"].null_count == 1
+    assert profiles["flag"].marker_count == 1
+    assert profiles["flag"].kind == "bool_like"
+    assert profiles["city"].bool_like is False
+    assert profiles["city"].kind == "text"
+    assert profiles["city"].markers_as_null().null_count == 2
+    assert profiles["metro_count"].n_unique == 2
+
+    cleaned = cleaning.handle_missingness(df, profiles=profiles)
+    assert str(cleaned["flag"].dtype) == "boolean"
+    assert cleaned["city"].isna().sum() == 2
+
+
+def test_parse_dates_matches_to_datetime_and_keeps_parsed_columns():
+    df = pd.DataFrame(
+        {
+            "published_at_iso": ["2025-11-26", None, "2025-11-29"],
+            "scraped_at_utc": ["2025-11-29T23:22:44.665661+00:00", "2025-11-30T01:00:00.5+03:00", None],
+        }
+    )
+    expected = {col: pd.to_datetime(df[col], errors="coerce", utc=True).dt.tz_convert(None) for col in df.columns}
+
+    parsed = cleaning.parse_dates(df.copy())
+
+    for col, values in expected.items():
+        pd.testing.assert_series_equal(parsed[col], values)
+    assert parsed["vacancy_age_days"].tolist()[0] == 3
+    # already-parsed columns are passed through untouched
+    scraped = parsed["scraped_at_utc"]
+    assert cleaning.to_utc_naive(scraped) is scraped
+    # text that is not ISO 8601 takes the pd.to_datetime fallback
+    fallback = pd.Series(["Nov 29 2025 10:00", "not a date"])
+    pd.testing.assert_series_equal(
+        cleaning.to_utc_naive(fallback), pd.to_datetime(fallback, errors="coerce", utc=True).dt.tz_convert(None)
+    )
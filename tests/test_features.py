@@ -1,5 +1,8 @@
 """Unit tests for key feature engineering helpers."""
 
+import re
+import sys
+
 import pandas as pd
 
 from src.skillra_pda import features
@@ -35,3 +38,229 @@ def test_add_primary_role_chooses_priority_role_and_keeps_other_columns():
     assert set(result.columns) == set(df.columns) | {"primary_role"}
     assert result["city"].tolist() == df["city"].tolist()
     assert list(result["primary_role"]) == ["analyst", "ml", "backend"]
+
+
+def test_add_grade_from_experience_matches_rowwise_rules():
+    df = pd.DataFrame(
+        {
+            "exp_min_years": [0.0, 1.0, None, None, 3.0, None, 8.0, None],
+            "exp_max_years": [1.0, 3.0, 6.0, None, 6.0, None, None, None],
+            "exp_is_no_experience": pd.array([True, False, False, None, True, False, False, None], dtype="boolean"),
+            "experience": ["не требуется", "1–3 года", None, "3–6 лет", "3–6 лет", "более 6 лет", None, None],
+        }
+    )
+
+    result = features.add_grade_from_experience(df)
+
+    expected = [
+        features._experience_to_grade(
+            row.exp_min_years if pd.notna(row.exp_min_years) else row.exp_max_years,
+            row.exp_is_no_experience,
+            row.experience,
+        )
+        for row in df.astype(object).itertuples()
+    ]
+    assert result["grade_from_experience"].tolist() == expected
+    assert expected == ["intern", "junior", "senior", "middle", "intern", "senior", "lead", "unknown"]
+
+
+def test_add_work_mode_prefers_format_then_flags():
+    df = pd.DataFrame(
+        {
+            "work_format": pd.Categorical(["office", "unknown", None, "remote", "hybrid", None]),
+            "is_remote": pd.array([True, True, None, False, True, False], dtype="boolean"),
+            "is_hybrid": pd.array([False, True, True, True, False, None], dtype="boolean"),
+        }
+    )
+
+    result = features.add_work_mode(df)
+
+    assert result["work_mode"].tolist() == ["office", "remote", "hybrid", "remote", "hybrid", "unknown"]
+    assert "work_mode" not in df.columns
+
+
+def test_add_primary_role_categories_match_observed_roles():
+    df = pd.DataFrame(
+        {
+            "role_analyst": [True, False, False],
+            "role_qa": [True, False, True],
+            "role_ml": pd.array([False, None, False], dtype="boolean"),
+        }
+    )
+
+    result = features.add_primary_role(df)
+
+    expected = pd.Categorical(["qa", "other", "qa"])
+    pd.testing.assert_series_equal(result["primary_role"], pd.Series(expected, name="primary_role"))
+
+
+def test_text_features_count_like_str_split():
+    df = pd.DataFrame(
+        {
+            "description": ["SQL и  Python", "\xa0lead\u3000trail\x0b", None, "", "одно"],
+            "requirements": ["a b c", None, " ", "x", "y z"],
+            "optional_skills": ["git", 3, None, "a\tb", ""],  # not only strings
+        }
+    )
+
+    result = features.add_structured_text_features(df)
+
+    for col, target in [("requirements", "requirements_count"), ("optional_skills", "optional_skills_count")]:
+        expected = df[col].fillna("").str.split().str.len()
+        pd.testing.assert_series_equal(result[target], expected, check_names=False)
+    desc = df["description"].fillna("")
+    pd.testing.assert_series_equal(result["description_len_chars"], desc.str.len(), check_names=False)
+    pd.testing.assert_series_equal(result["description_len_words"], desc.str.split().str.len(), check_names=False)
+    assert result["description_len_words"].tolist() == [3, 2, 0, 0, 1]
+
+
+def test_whitespace_class_lists_every_isspace_code_point():
+    listed = set()
+    for first, last in re.findall(r"\\x\{([0-9a-f]+)\}(?:-\\x\{([0-9a-f]+)\})?", features._WHITESPACE_CLASS):
+        listed.update(range(int(first, 16), int(last or first, 16) + 1))
+
+    assert listed == {code for code in range(sys.maxunicode + 1) if chr(code).isspace()}
+
+
+def test_assemble_features_leaves_input_untouched():
+    df = pd.DataFrame(
+        {
+            "city": ["Москва", "Казань"],
+            "published_at_iso": ["2025-11-01", "2025-11-02"],
+            "skill_sql": [True, False],
+            "has_python": pd.array([True, None], dtype="boolean"),
+            "role_qa": [False, True],
+            "salary_mid_rub_capped": [100000.0, 200000.0],
+        }
+    )
+    before = df.copy()
+
+    result = features.assemble_features(df)
+
+    pd.testing.assert_frame_equal(df, before)
+    assert result["skills_count"].tolist() == [1, 0]
+    assert str(result["hard_stack_count"].dtype) == "Int64"
+    assert result["tech_stack_size"].tolist() == [2, 0]
+
+
+def test_update_features_computes_only_new_vacancies():
+    df = pd.DataFrame(
+        {
+            "vacancy_id": [1, 2, 3, 4, 5, 6],
+            "city": ["Москва", "Казань", "Москва", "Омск", "Санкт-Петербург", "Москва"],
+            "skill_sql": [True, False, True, True, False, True],
+            "role_qa": [False, True, False, False, True, False],
+            "salary_mid_rub_capped": [100000.0, 150000.0, 200000.0, 120000.0, 180000.0, 210000.0],
+        }
+    )
+    existing = features.assemble_features(df.iloc[:4])
+    existing.loc[0, "city_tier"] = "stored"
+
+    result = features.update_features(df, existing)
+
+    full = features.assemble_features(df)
+    assert list(result.columns) == list(full.columns)
+    assert result["city_tier"].tolist() == ["stored"] + full["city_tier"].tolist()[1:]
+    assert result["salary_bucket"].tolist() == full["salary_bucket"].tolist()
+    report = result.attrs["incremental_report"]
+    assert (report["new_rows"], report["reused_rows"], report["rebucketed"]) == (2, 4, True)
+
+    kept = features.update_features(df, existing, tolerance=1.0)
+    assert kept.attrs["salary_bucket_edges"] == existing.attrs["salary_bucket_edges"]
+    assert not kept.attrs["incremental_report"]["rebucketed"]
+
+    stale = existing.copy()
+    stale.attrs["features_source"] = "other"
+    assert features.update_features(df, stale).attrs["incremental_report"]["reused_rows"] == 0
+
+
+def test_compute_skill_premium_matches_group_medians_with_intervals():
+    df = pd.DataFrame(
+        {
+            "salary_mid_rub_capped": [100.0, 120.0, None, 200.0, 260.0, 90.0, 300.0, 150.0],
+            "skill_sql": [False, False, True, True, True, False, True, pd.NA],
+            "has_python": [True, False, False, True, False, False, True, False],
+        }
+    )
+    df["skill_sql"] = df["skill_sql"].astype("boolean")
+
+    premium = features.compute_skill_premium(df, ["skill_sql", "has_python", "skill_missing"], min_count=3)
+
+    salary = df["salary_mid_rub_capped"]
+    for col in ["skill_sql", "has_python"]:
+        has_skill = df[col].fillna(False).astype(bool)
+        row = premium.set_index("skill").loc[col]
+        assert row["median_with"] == salary[has_skill].median()
+        assert row["median_without"] == salary[~has_skill].median()
+        assert row["count_with_skill"] == has_skill.sum()
+        assert row["premium_abs_ci_low"] <= row["premium_abs"] <= row["premium_abs_ci_high"]
+    assert premium["premium_pct"].is_monotonic_decreasing
+
+    again = features.compute_skill_premium(df, ["skill_sql", "has_python"], min_count=3)
+    pd.testing.assert_frame_equal(premium, again)
+    plain = features.compute_skill_premium(df, ["skill_sql", "has_python"], min_count=3, n_boot=0)
+    assert "premium_abs_ci_low" not in plain.columns
+
+
+def test_stratified_skill_premium_removes_segment_mix():
+    # python is asked for mostly in the better paid senior cell, but within
+    # each cell it pays the same as without it
+    senior = [300.0] * 8
+    junior = [100.0] * 8
+    df = pd.DataFrame(
+        {
+            "salary_mid_rub_capped": senior + junior,
+            "has_python": [True] * 5 + [False] * 3 + [True] * 2 + [False] * 6,
+            "primary_role": "data",
+            "grade_final": ["senior"] * 8 + ["junior"] * 8,
+            "city_tier": "Moscow",
+        }
+    )
+    df.loc[15, "salary_mid_rub_capped"] = 130.0
+
+    raw = features.compute_skill_premium(df, ["has_python"], min_count=1, n_boot=0)
+    stratified = features.compute_stratified_skill_premium(df, ["has_python"], min_count=1, min_cell_count=2)
+
+    assert raw["premium_abs"].iloc[0] == 200.0
+    row = stratified.iloc[0]
+    assert row["premium_abs"] == 0.0
+    assert row["cells_used"] == 2
+    assert row["coverage"] == 1.0
+
+    # junior cell needs three salaries on each side now and drops out
+    strict = features.compute_stratified_skill_premium(df, ["has_python"], min_count=1, min_cell_count=3)
+    assert strict.iloc[0]["cells_used"] == 1
+    assert strict.iloc[0]["coverage"] == 5 / 7
+
+
+def test_compute_runs_requested_steps_and_reports_stale_ones():
+    df = pd.DataFrame(
+        {
+            "city": ["Москва", "Казань", "Омск"],
+            "exp_min_years": [0.0, 4.0, None],
+            "grade": ["unknown", "senior", "unknown"],
+            "skill_sql": [True, False, True],
+            "role_qa": [False, True, False],
+            "role_analyst": [True, False, False],
+        }
+    )
+
+    partial = features.compute(df, ["primary_role", "tech_stack_size"])
+
+    assert partial.attrs["feature_report"]["computed"] == ["stack_aggregates", "primary_role"]
+    assert "city_tier" not in partial.columns
+    assert list(partial["primary_role"]) == ["analyst", "qa", "other"]
+
+    full = features.compute(partial)
+    assert full.attrs["feature_report"]["reused"] == ["stack_aggregates", "primary_role"]
+    assert features.stale_features(full) == []
+
+    edited = full.copy()
+    edited.loc[2, "exp_min_years"] = 9.0
+    assert features.stale_features(edited) == ["grade_from_experience", "grade_final"]
+    assert features.stale_features(edited, ["city_tier"]) == []
+
+    updated = features.compute(edited)
+    assert updated.attrs["feature_report"]["computed"] == ["grade_from_experience", "grade_final"]
+    assert updated["grade_final"].tolist() == ["intern", "senior", "lead"]
+    pd.testing.assert_frame_equal(updated, features.compute(edited[df.columns], reuse=False), check_like=True)
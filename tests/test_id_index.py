@@ -0,0 +1,39 @@
+"""Unit tests for the persistent vacancy-id index."""
+
+import pandas as pd
+
+from src.skillra_pda.id_index import VacancyIndex, deduplicate_against_index
+
+
+def _snapshot(ids, scraped_at):
+    return pd.DataFrame(
+        {
+            "vacancy_id": ids,
+            "scraped_at_utc": pd.to_datetime(scraped_at),
+            "title": [f"v{i}" for i in range(len(ids))],
+        }
+    )
+
+
+def test_deduplicate_against_index_keeps_latest_across_snapshots(tmp_path):
+    index_path = tmp_path / "ids.sqlite"
+    day1 = _snapshot([1, 2, 2], ["2025-11-01", "2025-11-01", "2025-11-02"])
+    day2 = _snapshot([2, 3, 1], ["2025-11-03", "2025-11-03", "2025-10-30"])
+
+    with VacancyIndex(index_path) as index:
+        first = deduplicate_against_index(day1, index)
+        assert sorted(first["vacancy_id"]) == [1, 2]
+        assert first.attrs["deduplicated_rows"] == 1
+
+    with VacancyIndex(index_path) as index:
+        second = deduplicate_against_index(day2, index)
+        replay = deduplicate_against_index(day1, index)
+        latest = index.latest(pd.Series([1, 2, 3, 4]))
+        assert len(index) == 3
+
+    assert sorted(second["vacancy_id"]) == [2, 3]
+    assert second.attrs["history_duplicate_rows"] == 1
+    assert replay.empty
+    assert latest.loc["2"] == pd.Timestamp("2025-11-03")
+    assert latest.loc["1"] == pd.Timestamp("2025-11-01")
+    assert pd.isna(latest.loc["4"])
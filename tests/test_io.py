@@ -0,0 +1,159 @@
+"""Unit tests for processed dataset persistence."""
+
+import pandas as pd
+
+from src.skillra_pda import io
+
+
+def _features_frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "vacancy_id": [1, 2, 3, 4],
+            "city_tier": ["Moscow", "SPb", "Moscow", "Moscow"],
+            "scraped_at_utc": pd.to_datetime(
+                ["2025-11-01 10:00", "2025-11-01 11:00", "2025-11-02 09:00", "2025-11-20 09:00"]
+            ),
+            "salary_mid_rub": [150000.0, 90000.0, None, 300000.0],
+            "skill_sql": pd.array([True, False, None, True], dtype="boolean"),
+            "grade": pd.Categorical(["junior", "middle", "junior", "senior"]),
+        }
+    )
+
+
+def test_partitioned_dataset_round_trip(tmp_path):
+    df = _features_frame()
+    dataset_dir = tmp_path / "features"
+    io.save_partitioned(df, dataset_dir)
+
+    partitions = sorted(p.parent.relative_to(dataset_dir).as_posix() for p in dataset_dir.rglob("*.parquet"))
+    assert partitions == [
+        "scrape_date=2025-11-01/city_tier=Moscow",
+        "scrape_date=2025-11-01/city_tier=SPb",
+        "scrape_date=2025-11-02/city_tier=Moscow",
+        "scrape_date=2025-11-20/city_tier=Moscow",
+    ]
+
+    loaded = io.load_processed(dataset_dir, optimize=False).sort_values("vacancy_id").reset_index(drop=True)
+    expected = df.assign(scrape_date=df["scraped_at_utc"].dt.strftime("%Y-%m-%d"))
+    pd.testing.assert_frame_equal(loaded[expected.columns], expected, check_dtype=False)
+    assert str(loaded["skill_sql"].dtype) == "boolean"
+    assert str(loaded["grade"].dtype) == "category"
+
+
+def test_load_processed_prunes_partitions_and_columns(tmp_path):
+    io.save_partitioned(_features_frame(), tmp_path / "features")
+
+    result = io.load_processed(
+        tmp_path / "features",
+        filters=[("city_tier", "==", "Moscow"), ("scrape_date", ">=", "2025-11-02")],
+        columns=["vacancy_id", "skill_sql"],
+    )
+
+    assert list(result.columns) == ["vacancy_id", "skill_sql"]
+    assert sorted(result["vacancy_id"]) == [3, 4]
+
+
+def test_load_processed_filters_single_file(tmp_path):
+    path = tmp_path / "features.parquet"
+    io.save_processed(_features_frame(), path)
+
+    result = io.load_processed(path, filters=[("salary_mid_rub", ">", 100000)], columns=["vacancy_id"])
+
+    assert sorted(result["vacancy_id"]) == [1, 4]
+
+
+def test_text_columns_are_split_and_joined_on_demand(tmp_path):
+    df = _features_frame().assign(
+        title=["Analyst", "QA", "ML Engineer", "DE"],
+        description=["a b", "c", "d e f", "g"],
+    )
+    path, text_path = tmp_path / "features.parquet", tmp_path / "text.parquet"
+    io.save_processed(df, path, text_path=text_path)
+
+    narrow = io.load_processed(path)
+    assert "description" not in narrow.columns and "title" not in narrow.columns
+    assert list(pd.read_parquet(text_path).columns) == ["vacancy_id", "title", "description"]
+
+    result = io.load_processed(
+        path,
+        filters=[("city_tier", "==", "Moscow")],
+        columns=["title", "skill_sql"],
+        text_path=text_path,
+    )
+    assert list(result.columns) == ["title", "skill_sql"]
+    assert sorted(result["title"]) == sorted(["Analyst", "ML Engineer", "DE"])
+
+    full = io.load_processed(path, text_path=text_path).sort_values("vacancy_id")
+    assert full["description"].tolist() == df["description"].tolist()
+
+
+def test_feature_cache_is_memory_mapped_and_rebuilt_when_stale(tmp_path):
+    import os
+
+    import pyarrow as pa
+
+    df = _features_frame()
+    path, cache_path = tmp_path / "features.parquet", tmp_path / "features.arrow"
+    io.save_processed(df, path)
+
+    loaded = io.load_features_cached(path, cache_path)
+    pd.testing.assert_frame_equal(loaded, pd.read_parquet(path))
+
+    allocated = pa.total_allocated_bytes()
+    table = io.read_feature_cache(cache_path, columns=["vacancy_id", "salary_mid_rub"], as_table=True)
+    assert table.num_rows == len(df)
+    assert pa.total_allocated_bytes() == allocated
+
+    io.save_processed(df.assign(salary_mid_rub=1.0), path)
+    stat = cache_path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    assert io.load_features_cached(path, cache_path)["salary_mid_rub"].eq(1.0).all()
+
+
+def test_optimize_dtypes_compacts_without_changing_values():
+    df = pd.DataFrame(
+        {
+            "vacancy_id": [10, 11, 12, 13],
+            "has_python": pd.array([True, False, True, True], dtype="boolean"),
+            "edu_required": pd.array([True, None, False, True], dtype="boolean"),
+            "skills_count": [0, 3, 12, 5],
+            "employer_reviews_count": [0.0, 2.0, None, 40.0],
+            "work_mode": ["remote", "office", "remote", "remote"],
+            "title": ["a", "b", "c", "d"],
+        }
+    )
+
+    result = io.optimize_dtypes(df)
+
+    assert result["vacancy_id"].dtype == "int64"
+    assert result["has_python"].dtype == bool
+    assert str(result["edu_required"].dtype) == "boolean"
+    assert result["skills_count"].dtype == "int8"
+    assert str(result["employer_reviews_count"].dtype) == "Int8"
+    assert str(result["work_mode"].dtype) == "category"
+    assert str(result["title"].dtype) != "category"
+    report = result.attrs["memory_report"]
+    assert report["after_mb"] < report["before_mb"] and report["converted_cols"] == 4
+    for col in df.columns:
+        assert result[col].isna().tolist() == df[col].isna().tolist()
+        assert result[col].dropna().tolist() == df[col].dropna().tolist()
+
+
+def test_save_processed_optimizes_but_keeps_group_keys_as_text(tmp_path):
+    df = pd.DataFrame(
+        {
+            "vacancy_id": [1, 2, 3, 4],
+            "grade": ["junior", "senior", "junior", "junior"],
+            "schedule": ["full", "full", "shift", "full"],
+            "has_python": pd.array([True, False, True, True], dtype="boolean"),
+        }
+    )
+    path = tmp_path / "features.parquet"
+
+    io.save_processed(df, path)
+    loaded = pd.read_parquet(path)
+
+    assert str(loaded["grade"].dtype) != "category"
+    assert str(loaded["schedule"].dtype) == "category"
+    assert loaded["has_python"].dtype == bool
+    assert loaded["grade"].tolist() == df["grade"].tolist()
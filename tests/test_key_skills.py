@@ -0,0 +1,40 @@
+"""Unit tests for the sparse key-skill matrix."""
+
+import pandas as pd
+
+from src.skillra_pda.key_skills import KeySkills, build_key_skills
+
+
+def test_build_key_skills_normalizes_and_roundtrips(tmp_path):
+    skills = pd.Series(
+        [
+            "Python, SQL, Apache  Spark",
+            "python, sql,SQL",
+            None,
+            "Apache\xa0Spark, Airflow, ",
+        ]
+    )
+    segments = pd.DataFrame({"primary_role": ["data", "data", "data", "de"]})
+
+    key_skills = build_key_skills(skills, vacancy_id=[10, 11, 12, 13])
+
+    assert list(key_skills.vocabulary) == ["apache spark", "python", "sql", "airflow"]
+    assert list(key_skills.labels) == ["Apache  Spark", "Python", "SQL", "Airflow"]
+    assert key_skills.matrix.sum(axis=1).A1.tolist() == [3, 2, 0, 2]
+
+    top = key_skills.top_skills(2)
+    assert top["skill"].tolist() == ["Apache  Spark", "Python"]
+    assert top["share"].tolist() == [0.5, 0.5]
+    in_segment = key_skills.top_skills(10, rows=(segments["primary_role"] == "de").to_numpy())
+    assert in_segment["skill"].tolist() == ["Apache  Spark", "Airflow"]
+
+    by_role = key_skills.segment_top_skills(segments, n=1)
+    assert by_role.to_dict("records") == [
+        {"primary_role": "data", "skill": "Python", "count": 2, "share": 2 / 3},
+        {"primary_role": "de", "skill": "Apache  Spark", "count": 1, "share": 1.0},
+    ]
+
+    loaded = KeySkills.load(key_skills.save(tmp_path / "key_skills.npz"))
+    assert (loaded.matrix != key_skills.matrix).nnz == 0
+    assert list(loaded.vocabulary) == list(key_skills.vocabulary)
+    assert loaded.rows_for([13, 99]).tolist() == [3, -1]
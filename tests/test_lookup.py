@@ -0,0 +1,42 @@
+"""Unit tests for unique-value mapping of scalar normalizers."""
+
+import pandas as pd
+
+from src.skillra_pda.lookup import UniqueMapper
+
+
+def test_unique_mapper_calls_func_once_per_distinct_combination():
+    calls = []
+
+    def describe(city, remote):
+        calls.append((city, remote))
+        return f"{city}:{remote}"
+
+    mapper = UniqueMapper(describe)
+    city = pd.Series(pd.Categorical(["Moscow", "Kazan", None, "Moscow", "Moscow"]))
+    remote = pd.Series(pd.array([True, False, None, True, False], dtype="boolean"))
+
+    result = mapper(city, remote)
+
+    expected = [describe(c, r) for c, r in zip(city, remote)]
+    assert result.tolist() == expected
+    assert len(calls) == 4 + len(expected)
+
+    calls.clear()
+    assert mapper(city.iloc[:2], remote.iloc[:2]).tolist() == expected[:2]
+    assert calls == []
+
+
+def test_unique_mapper_memoizes_nan_arguments():
+    calls = []
+
+    def label(value):
+        calls.append(value)
+        return "missing" if pd.isna(value) else str(value)
+
+    mapper = UniqueMapper(label)
+    values = pd.Series([1.5, None, 2.5])  # float column: tolist() boxes a new NaN each time
+
+    assert mapper(values).tolist() == ["1.5", "missing", "2.5"]
+    assert mapper(values).tolist() == ["1.5", "missing", "2.5"]
+    assert len(calls) == 3 and len(mapper.cache) == 3
@@ -0,0 +1,37 @@
+"""Unit tests for partition-parallel feature assembly."""
+
+import numpy as np
+import pandas as pd
+
+from src.skillra_pda import features
+from src.skillra_pda.parallel_features import assemble_features_parallel
+
+
+def test_parallel_assembly_matches_serial():
+    rng = np.random.default_rng(0)
+    rows = 60
+    df = pd.DataFrame(
+        {
+            "vacancy_id": np.arange(rows),
+            "city": rng.choice(["Москва", "Казань", "Омск", None], rows),
+            "published_at_iso": pd.to_datetime("2025-11-01") + pd.to_timedelta(rng.integers(0, 30, rows), unit="D"),
+            "exp_min_years": np.where(rng.random(rows) < 0.3, np.nan, rng.integers(0, 9, rows)),
+            "skill_sql": rng.random(rows) < 0.5,
+            "has_python": pd.array(rng.random(rows) < 0.4, dtype="boolean"),
+            # role_ml only appears in the last partition
+            "role_ml": np.arange(rows) >= 50,
+            "role_qa": rng.random(rows) < 0.3,
+            "description": rng.choice(["SQL и Python", "", None, "много  слов в описании"], rows),
+            "salary_mid_rub_capped": np.where(rng.random(rows) < 0.2, np.nan, rng.integers(50, 400, rows) * 1000.0),
+        }
+    )
+
+    expected = features.assemble_features(df)
+    result = assemble_features_parallel(df, workers=2, partitions=3, min_partition_rows=1)
+
+    pd.testing.assert_frame_equal(result, expected)
+    assert list(result["primary_role"].cat.categories) == ["ml", "other", "qa"]
+
+    sketched = assemble_features_parallel(df, workers=2, partitions=3, min_partition_rows=1, salary_method="sketch")
+    # small partitions keep every value in the sketch, so the quantiles are exact
+    assert sketched["salary_bucket"].tolist() == expected["salary_bucket"].tolist()
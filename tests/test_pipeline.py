@@ -0,0 +1,103 @@
+"""Unit tests for the stage graph executor."""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from src.skillra_pda.pipeline import Pipeline, Stage
+from src.skillra_pda.stage_cache import StageCache
+
+
+def _concat(sources, target) -> int:
+    text = "".join(Path(src).read_text(encoding="utf-8") for src in sources)
+    Path(target).write_text(text, encoding="utf-8")
+    return len(text)
+
+
+def _write_pid(target) -> None:
+    Path(target).write_text(str(os.getpid()), encoding="utf-8")
+
+
+def _fail() -> None:
+    raise RuntimeError("boom")
+
+
+def _diamond(tmp_path):
+    raw, left, right, joined = (tmp_path / name for name in ["raw.txt", "left.txt", "right.txt", "joined.txt"])
+    raw.write_text("ab", encoding="utf-8")
+
+    def stage(name, inputs, output):
+        params = {"sources": inputs, "target": output}
+        # modules are not picklable; workers must get only func and params
+        return Stage(name, _concat, inputs=tuple(inputs), outputs=(output,), params=params, modules=(json,))
+
+    return Pipeline(
+        [
+            stage("join", [left, right], joined),
+            stage("left", [raw], left),
+            stage("right", [raw], right),
+        ]
+    ), joined
+
+
+def test_dependencies_and_selection(tmp_path):
+    pipeline, _ = _diamond(tmp_path)
+
+    assert pipeline.dependencies["join"] == ["left", "right"]
+    assert pipeline.order.index("join") == 2
+    assert pipeline.select(until="left") == ["left"]
+    assert pipeline.select(start="right") == ["right", "join"]
+    assert pipeline.select(only=["join", "left"]) == ["left", "join"]
+    with pytest.raises(KeyError):
+        pipeline.select(only=["missing"])
+
+    cyclic = [
+        Stage("a", _fail, inputs=(tmp_path / "b",), outputs=(tmp_path / "a",)),
+        Stage("b", _fail, inputs=(tmp_path / "a",), outputs=(tmp_path / "b",)),
+    ]
+    with pytest.raises(ValueError, match="cycle"):
+        Pipeline(cyclic)
+
+
+def test_run_in_workers_uses_cache_and_writes_log(tmp_path):
+    pipeline, joined = _diamond(tmp_path)
+    cache = StageCache(tmp_path / "cache")
+    log_path = tmp_path / "runs.jsonl"
+
+    first = pipeline.run(cache=cache, max_workers=2, log_path=log_path)
+    assert joined.read_text(encoding="utf-8") == "abab"
+    assert {r.stage: r.status for r in first} == {"left": "miss", "right": "miss", "join": "miss"}
+    assert first[-1].stage == "join" and first[-1].rows == 4
+
+    second = pipeline.run(cache=cache, max_workers=1, log_path=log_path)
+    assert [r.status for r in second] == ["hit", "hit", "hit"]
+
+    entries = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+    assert len(entries) == 6 and len({entry["run_id"] for entry in entries}) == 2
+
+
+def test_lone_ready_stage_runs_in_process(tmp_path):
+    first, second = tmp_path / "first.txt", tmp_path / "second.txt"
+    pipeline = Pipeline(
+        [
+            Stage("first", _write_pid, outputs=(first,), params={"target": first}),
+            Stage("second", _write_pid, inputs=(first,), outputs=(second,), params={"target": second}),
+        ]
+    )
+
+    pipeline.run(max_workers=2)
+
+    assert first.read_text(encoding="utf-8") == second.read_text(encoding="utf-8") == str(os.getpid())
+
+
+def test_failed_stage_is_logged_and_raised(tmp_path):
+    log_path = tmp_path / "runs.jsonl"
+    pipeline = Pipeline([Stage("broken", _fail)])
+
+    with pytest.raises(RuntimeError, match="broken"):
+        pipeline.run(max_workers=1, log_path=log_path)
+
+    entry = json.loads(log_path.read_text(encoding="utf-8"))
+    assert entry["status"] == "failed" and "boom" in entry["error"]
@@ -0,0 +1,60 @@
+"""Unit tests for the declared raw schema and typed loading."""
+
+import ast
+from pathlib import Path
+
+import pandas as pd
+
+from src.skillra_pda import io, schema
+
+SCRAPER_PATH = Path(__file__).resolve().parents[1] / "parser" / "hh_scraper.py"
+
+
+def _vacancy_record_types():
+    tree = ast.parse(SCRAPER_PATH.read_text(encoding="utf-8"))
+    record = next(
+        node for node in tree.body if isinstance(node, ast.ClassDef) and node.name == "VacancyRecord"
+    )
+    logical = {"bool": "bool", "int": "int", "float": "float", "str": "string"}
+    types = {}
+    for stmt in record.body:
+        if isinstance(stmt, ast.AnnAssign):
+            annotation = ast.unparse(stmt.annotation)
+            base = annotation.removeprefix("Optional[").removesuffix("]")
+            types[stmt.target.id] = logical[base]
+    return types
+
+
+def test_raw_schema_matches_vacancy_record():
+    expected = {**_vacancy_record_types(), **schema.DICTIONARY_OVERRIDES}
+    assert schema.RAW_SCHEMA == expected
+    assert list(schema.RAW_SCHEMA) == list(_vacancy_record_types())
+
+
+def test_load_raw_applies_declared_dtypes(tmp_path):
+    raw = pd.DataFrame(
+        {
+            "vacancy_id": [1, 2, 3],
+            "salary_from": [100000, None, 50000],
+            "metro_count": [0, 2, 1],
+            "currency": ["RUB", "USD", "RUB"],
+            "has_python": [True, False, True],
+            "edu_required": [None, True, None],
+            "title": ["Data Analyst", "", "QA"],
+            "extra": ["a", "b", "c"],
+        }
+    )
+    raw_path = tmp_path / "raw.csv"
+    raw.to_csv(raw_path)
+
+    loaded = io.load_raw(raw_path)
+
+    assert loaded.columns[0] == "Unnamed: 0"
+    assert str(loaded["vacancy_id"].dtype) == "int64"
+    assert str(loaded["metro_count"].dtype) == "int64"
+    assert str(loaded["salary_from"].dtype) == "float64"
+    assert str(loaded["currency"].dtype) == "category"
+    assert str(loaded["has_python"].dtype) == "boolean"
+    assert loaded["edu_required"].tolist() == [pd.NA, True, pd.NA]
+    assert loaded["title"].isna().tolist() == [False, True, False]
+    assert io.load_raw(raw_path, schema=None)["has_python"].dtype == bool
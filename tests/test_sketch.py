@@ -0,0 +1,35 @@
+"""Unit tests for mergeable quantile sketches."""
+
+import numpy as np
+import pandas as pd
+
+from src.skillra_pda import cleaning, features
+from src.skillra_pda.sketch import KLLSketch, merge_sketches
+
+
+def test_merged_kll_sketch_quantiles_within_rank_error():
+    rng = np.random.default_rng(7)
+    values = rng.lognormal(11.5, 0.6, 200_000)
+    parts = [KLLSketch(k=400, seed=i).update(chunk) for i, chunk in enumerate(np.array_split(values, 8))]
+
+    merged = merge_sketches(parts)
+    restored = KLLSketch.from_dict(merged.to_dict())
+
+    probs = [0.01, 0.25, 0.5, 0.75, 0.99]
+    true_ranks = [(values <= est).mean() for est in restored.quantiles(probs)]
+    assert merged.n == len(values)
+    assert np.max(np.abs(np.array(true_ranks) - probs)) <= merged.rank_error
+    assert restored.quantile(0) == values.min()
+    assert restored.quantile(1) == values.max()
+
+
+def test_sketch_mode_matches_exact_mode_on_small_samples():
+    df = pd.DataFrame({"salary_mid_rub_capped": [50_000, 80_000, np.nan, 120_000, 200_000, 95_000]})
+
+    exact = features.add_salary_bucket(df)
+    sketched = features.add_salary_bucket(df, method="sketch")
+
+    assert exact["salary_bucket"].astype(object).equals(sketched["salary_bucket"].astype(object))
+    assert cleaning.salary_caps(df["salary_mid_rub_capped"], method="sketch") == tuple(
+        cleaning.salary_caps(df["salary_mid_rub_capped"])
+    )
@@ -0,0 +1,43 @@
+"""Unit tests for the bit-packed skill matrix."""
+
+import numpy as np
+import pandas as pd
+
+from src.skillra_pda.skill_matrix import SkillMatrix
+
+
+def test_skill_matrix_counts_match_boolean_columns():
+    rng = np.random.default_rng(0)
+    rows = 150  # spans three words, the last one partial
+    flags = pd.DataFrame(
+        {
+            "skill_sql": rng.random(rows) < 0.5,
+            "skill_python": pd.array(np.where(rng.random(rows) < 0.1, None, rng.random(rows) < 0.3), dtype="boolean"),
+            "has_docker": rng.random(rows) < 0.05,
+        },
+        index=pd.RangeIndex(10, 10 + rows),
+    )
+    dense = flags.fillna(False).astype(bool)
+    matrix = SkillMatrix.from_frame(flags, flags.columns)
+
+    assert matrix.nbytes == 3 * 3 * 8
+    assert (matrix.counts() == dense.sum()).all()
+    segment = rng.random(rows) < 0.4
+    pd.testing.assert_series_equal(matrix.shares(segment), dense[segment].mean(), check_names=False)
+    assert matrix.column("skill_python").tolist() == dense["skill_python"].tolist()
+    assert matrix.all_of(["skill_sql", "skill_python"]).tolist() == (dense["skill_sql"] & dense["skill_python"]).tolist()
+    assert matrix.any_of(["skill_sql", "has_docker"]).tolist() == (dense["skill_sql"] | dense["has_docker"]).tolist()
+    assert (matrix.cooccurrence().to_numpy() == dense.T.astype(int).dot(dense.astype(int)).to_numpy()).all()
+
+    subset = matrix.select(rows=segment, columns=["has_docker", "skill_sql"])
+    assert subset.index.equals(flags.index[segment])
+    assert subset.counts().tolist() == dense.loc[segment, ["has_docker", "skill_sql"]].sum().tolist()
+
+    codes = rng.integers(-1, 4, rows)
+    expected = dense[codes >= 0].groupby(codes[codes >= 0]).sum().to_numpy()
+    assert (matrix.group_counts(codes, 4) == expected).all()
+
+    parts = matrix.split(codes, 4)
+    for code, part in enumerate(parts):
+        assert part.index.equals(flags.index[codes == code])
+        assert part.counts().tolist() == expected[code].tolist()
@@ -0,0 +1,48 @@
+"""Unit tests for content-hash stage caching."""
+
+import os
+
+from src.skillra_pda.stage_cache import StageCache
+
+
+def _copy_upper(src: str, dst: str, suffix: str = "") -> None:
+    with open(src, encoding="utf-8") as handle:
+        text = handle.read()
+    with open(dst, "w", encoding="utf-8") as handle:
+        handle.write(text.upper() + suffix)
+
+
+def test_stage_is_skipped_until_inputs_or_params_change(tmp_path):
+    src, dst = tmp_path / "in.txt", tmp_path / "out.txt"
+    src.write_text("abc", encoding="utf-8")
+    cache = StageCache(tmp_path / "cache")
+
+    hits = []
+
+    def run(suffix: str = ""):
+        params = {"src": str(src), "dst": str(dst), "suffix": suffix}
+        check = cache.check("upper", _copy_upper, inputs=[src], outputs=[dst], params=params)
+        if not check.hit:
+            _copy_upper(**params)
+            cache.record("upper", check, [dst])
+        hits.append(check.hit)
+        return check
+
+    assert not run().hit
+    assert run().hit
+
+    # new mtime, same bytes: still a hit
+    stat = src.stat()
+    os.utime(src, (stat.st_atime, stat.st_mtime + 5))
+    assert run().hit
+
+    src.write_text("abd", encoding="utf-8")
+    assert not run().hit
+    assert dst.read_text(encoding="utf-8") == "ABD"
+
+    assert not run(suffix="!").hit
+    dst.unlink()
+    assert not run(suffix="!").hit
+    assert dst.read_text(encoding="utf-8") == "ABD!"
+
+    assert hits == [False, True, True, False, False, False]